@@ -0,0 +1,10 @@
+"""
+python -m address_parser で実行するためのエントリポイント
+"""
+import sys
+
+from .cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
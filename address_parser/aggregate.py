@@ -0,0 +1,381 @@
+"""
+都道府県・市区町村・町域ごとの件数を、1回の走査で集計するためのモジュール
+
+aggregate は住所を解析しながら件数を数え、解析結果は保持しない。件数はキーの種類数に
+上限のある SpillingCounter で数え、上限を超えた場合はキー順に並べた一時ファイルに書き出す。
+集計結果はすべての一時ファイルをキー順にマージしながら読むため、メモリに載るのは上限までの
+キーと、上位 N 件のみである。複数のワーカーで解析する場合は、チャンクごとの件数をワーカーで数え、
+呼び出し元で足し合わせる。
+
+使用例:
+    with aggregate(open("export.txt", encoding="utf-8"), workers=4) as result:
+        for (prefecture, city), count in result.top("city", 10):
+            print(prefecture, city, count)
+"""
+import collections
+import functools
+import heapq
+import itertools
+import tempfile
+from types import MappingProxyType
+
+from . import batch, patterns
+from .parser import AddressParser
+
+
+# 集計の単位と、キーに含む要素の数（都道府県 / 都道府県・市区町村 / 都道府県・市区町村・町域）
+LEVELS = ("prefecture", "city", "town")
+LEVEL_FIELDS = MappingProxyType({"prefecture": 1, "city": 2, "town": 3})
+
+# 一時ファイルに書き出すまでにメモリに保持するキーの種類数の既定値
+DEFAULT_MAX_KEYS = 100000
+
+# 同時に開いておく一時ファイルの数の既定値（達した場合は1つのファイルにマージする）
+DEFAULT_MAX_RUNS = 64
+
+# 一時ファイル中のキーの要素の区切り（キーの要素からは除く）
+_SEPARATOR = "\t"
+
+
+def _encode_key(key):
+    return _SEPARATOR.join(field.replace(_SEPARATOR, " ").replace("\n", " ") for field in key)
+
+
+def _decode_key(text):
+    return tuple(text.split(_SEPARATOR))
+
+
+class SpillingCounter:
+    """
+    キーの種類数に上限があり、上限を超えた分を一時ファイルに書き出すカウンター
+
+    キーは文字列のタプルとする。一時ファイルはキー順に並べた「キー<TAB>件数」の行からなり、
+    items() ではメモリ上の件数とすべての一時ファイルをキー順にマージして、同じキーの件数を足し合わせる。
+    一時ファイルの数が max_runs に達した場合は1つのファイルにマージし、開いておくファイルの数を抑える。
+    """
+
+    def __init__(self, max_keys=DEFAULT_MAX_KEYS, directory=None, max_runs=DEFAULT_MAX_RUNS):
+        """
+        SpillingCounterクラスの初期化
+
+        Args:
+            max_keys (int): メモリに保持するキーの種類数の上限（update ではチャンク1つ分まで超えることがある）
+            directory (str): 一時ファイルを作成するディレクトリ（None の場合はシステムの既定）
+            max_runs (int): 同時に開いておく一時ファイルの数の上限（2以上）
+        """
+        if max_keys < 1:
+            raise ValueError("max_keys には1以上を指定してください")
+        if max_runs < 2:
+            raise ValueError("max_runs には2以上を指定してください")
+        self.max_keys = max_keys
+        self.directory = directory
+        self.max_runs = max_runs
+        self.total = 0
+        self.spilled = 0
+        self._counts = collections.Counter()
+        self._runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def runs(self):
+        """
+        開いている一時ファイルの数（spilled は一時ファイルに書き出した回数）
+        """
+        return len(self._runs)
+
+    def add(self, key, count=1):
+        """
+        キーの件数を加える
+
+        Args:
+            key (tuple): キー（文字列のタプル）
+            count (int): 加える件数
+        """
+        self._counts[_encode_key(key)] += count
+        self.total += count
+        if len(self._counts) > self.max_keys:
+            self._spill()
+
+    def update(self, counts):
+        """
+        複数のキーの件数を加える（ワーカーが数えたチャンクごとの件数など）
+
+        Args:
+            counts (Mapping): {キー: 件数}
+        """
+        for key, count in counts.items():
+            self._counts[_encode_key(key)] += count
+            self.total += count
+        if len(self._counts) > self.max_keys:
+            self._spill()
+
+    def merge(self, other):
+        """
+        別のカウンターの件数を加える（other の一時ファイルはキー順に読むのみで、メモリには載せない）
+
+        Args:
+            other (SpillingCounter): 加えるカウンター
+        """
+        for key, count in other.items():
+            self.add(key, count)
+
+    def _spill(self):
+        """
+        メモリ上の件数をキー順に一時ファイルへ書き出す
+        """
+        self._runs.append(self._write_run((key, self._counts[key]) for key in sorted(self._counts)))
+        self._counts.clear()
+        self.spilled += 1
+        if len(self._runs) >= self.max_runs:
+            # すべての一時ファイルを1つにマージする
+            merged = self._write_run(self._merge(self._read_run(f) for f in self._runs))
+            for f in self._runs:
+                f.close()
+            self._runs = [merged]
+
+    def _write_run(self, items):
+        f = tempfile.TemporaryFile("w+", encoding="utf-8", newline="\n", dir=self.directory)
+        for key, count in items:
+            f.write(f"{key}\t{count}\n")
+        f.seek(0)
+        return f
+
+    def _read_run(self, f):
+        f.seek(0)
+        for line in f:
+            key, count = line.rstrip("\n").rsplit("\t", 1)
+            yield key, int(count)
+
+    @staticmethod
+    def _merge(runs):
+        """
+        キー順のイテラブルをマージし、同じキーの件数を足し合わせる
+        """
+        merged = heapq.merge(*runs, key=lambda item: item[0])
+        for key, group in itertools.groupby(merged, key=lambda item: item[0]):
+            yield key, sum(count for _, count in group)
+
+    def items(self):
+        """
+        キーと件数をキー順に返す
+
+        Yields:
+            tuple: (キー, 件数)
+        """
+        runs = [self._read_run(f) for f in self._runs]
+        runs.append(iter(sorted(self._counts.items())))
+        for key, count in self._merge(runs):
+            yield _decode_key(key), count
+
+    def __len__(self):
+        """
+        キーの種類数（一時ファイルに書き出した場合はマージして数える）
+        """
+        if not self._runs:
+            return len(self._counts)
+        return sum(1 for _ in self.items())
+
+    def most_common(self, n):
+        """
+        件数の多い順に n 件のキーと件数を返す（件数が同じ場合はキー順）
+
+        Args:
+            n (int): 件数
+
+        Returns:
+            list: (キー, 件数) のリスト
+        """
+        return heapq.nsmallest(n, self.items(), key=lambda item: (-item[1], item[0]))
+
+    def close(self):
+        """
+        一時ファイルを削除する
+        """
+        for f in self._runs:
+            f.close()
+        self._runs = []
+        self.spilled = 0
+        self._counts.clear()
+
+
+def aggregation_keys(parser, parsed, levels=LEVELS):
+    """
+    解析結果から各集計単位のキーを作成する
+
+    町域名は町域の辞書（town_index）がある場合は辞書と照合し、ない場合は最初の数字の前までとする。
+
+    Args:
+        parser (AddressParser): 解析に使用したパーサー
+        parsed (ParsedAddress): 解析結果
+        levels (tuple): 集計の単位
+
+    Returns:
+        dict: {集計の単位: キー}
+    """
+    town = ""
+    if "town" in levels:
+        if parser.town_index is not None:
+            town = parser.split_town_street(parsed).town
+        else:
+            town = patterns.TOWN_BLOCK.match(patterns.WHITESPACE.sub("", parsed.town_street)).group(1)
+    fields = (parsed.prefecture, parsed.city, town)
+    return {level: fields[:LEVEL_FIELDS[level]] for level in levels}
+
+
+def count_chunk(parser, start, addresses, levels=LEVELS):
+    """
+    住所のチャンクを解析し、集計の単位ごとの件数を数える（ワーカーで実行する）
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+        start (int): チャンク先頭の入力中の位置
+        addresses (list): 住所文字列のリスト
+        levels (tuple): 集計の単位
+
+    Returns:
+        tuple: (住所の件数, {集計の単位: Counter}, 解析に失敗したレコード（ParseFailure）のリスト)
+    """
+    counts = {level: collections.Counter() for level in levels}
+    failures = []
+    for result in batch.parse_chunk(parser, start, addresses):
+        if isinstance(result, batch.ParseFailure):
+            failures.append(result)
+            continue
+        for level, key in aggregation_keys(parser, result, levels).items():
+            counts[level][key] += 1
+    return len(addresses), counts, failures
+
+
+class Aggregation:
+    """
+    集計結果
+
+    Attributes:
+        counters (dict): {集計の単位: SpillingCounter}
+        total (int): 入力の件数
+        failures (list): 解析に失敗したレコード（ParseFailure）のリスト
+    """
+
+    def __init__(self, levels=LEVELS, max_keys=DEFAULT_MAX_KEYS, directory=None):
+        """
+        Aggregationクラスの初期化
+
+        Args:
+            levels (tuple): 集計の単位（LEVELS のいずれか）
+            max_keys (int): 集計の単位ごとにメモリに保持するキーの種類数の上限
+            directory (str): 一時ファイルを作成するディレクトリ
+        """
+        if not levels:
+            raise ValueError("集計の単位を1つ以上指定してください")
+        for level in levels:
+            if level not in LEVEL_FIELDS:
+                raise ValueError(f"集計の単位には {', '.join(LEVELS)} のいずれかを指定してください: {level}")
+        self.counters = {level: SpillingCounter(max_keys, directory) for level in levels}
+        self.total = 0
+        self.failures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def levels(self):
+        """
+        集計の単位
+        """
+        return tuple(self.counters)
+
+    @property
+    def parsed(self):
+        """
+        解析できた件数
+        """
+        return self.total - len(self.failures)
+
+    def add_counts(self, size, counts, failures=()):
+        """
+        チャンクごとの件数を加える
+
+        Args:
+            size (int): チャンクの住所の件数（解析に失敗したものを含む）
+            counts (dict): {集計の単位: {キー: 件数}}
+            failures (list): 解析に失敗したレコード
+        """
+        for level, level_counts in counts.items():
+            self.counters[level].update(level_counts)
+        self.failures.extend(failures)
+        self.total += size
+
+    def merge(self, other):
+        """
+        別の集計結果（別のファイルやマシンで集計したものなど）を加える
+
+        Args:
+            other (Aggregation): 加える集計結果（同じ集計の単位を含むこと）
+        """
+        for level, counter in self.counters.items():
+            counter.merge(other.counters[level])
+        self.total += other.total
+        self.failures.extend(other.failures)
+
+    def top(self, level, n=10):
+        """
+        集計の単位ごとに、件数の多い順に n 件のキーと件数を返す
+
+        Args:
+            level (str): 集計の単位
+            n (int): 件数
+
+        Returns:
+            list: (キー, 件数) のリスト
+        """
+        return self.counters[level].most_common(n)
+
+    def close(self):
+        """
+        一時ファイルを削除する
+        """
+        for counter in self.counters.values():
+            counter.close()
+
+
+def aggregate(addresses, parser=None, levels=LEVELS, workers=1, chunksize=batch.DEFAULT_CHUNKSIZE,
+              use_threads=None, max_keys=DEFAULT_MAX_KEYS, directory=None):
+    """
+    住所を解析しながら、都道府県・市区町村・町域ごとの件数を数える
+
+    入力は1回だけ先頭から読み進め、解析結果は保持しない。
+
+    Args:
+        addresses (iterable): 住所文字列のイテラブル
+        parser (AddressParser): 解析に使用するパーサー（None の場合は既定のパーサー）
+        levels (tuple): 集計の単位（LEVELS のいずれか）
+        workers (int): ワーカー数（1の場合は同じプロセスで解析、None の場合はCPU数）
+        chunksize (int): 1つのワーカーに一度に送る住所の件数
+        use_threads (bool): プロセスではなくスレッドのプールで解析するかどうか
+        max_keys (int): 集計の単位ごとにメモリに保持するキーの種類数の上限（超えた分は一時ファイルに書き出す）
+        directory (str): 一時ファイルを作成するディレクトリ（None の場合はシステムの既定）
+
+    Returns:
+        Aggregation: 集計結果（使用後は close で一時ファイルを削除する）
+    """
+    if parser is None:
+        parser = AddressParser()
+    levels = tuple(levels)
+
+    result = Aggregation(levels, max_keys, directory)
+    function = functools.partial(count_chunk, levels=levels)
+    try:
+        for size, counts, failures in batch.map_chunks(parser, function, addresses, workers, chunksize, use_threads):
+            result.add_counts(size, counts, failures)
+    except BaseException:
+        result.close()
+        raise
+    return result
@@ -0,0 +1,288 @@
+"""
+asyncio のイベントループから住所を解析するためのモジュール
+
+解析はイベントループのスレッドではなくエグゼキューター（スレッドまたはプロセスのプール）で行う。
+同時に届いた要求は小さなバッチにまとめて送り、処理中のバッチ数と待ち行列の長さに上限を設けて、
+上限に達した場合は呼び出し側を待たせる（背圧）。
+
+使用例:
+    async with AsyncAddressParser(AddressParser(), workers=4) as async_parser:
+        result = await async_parser.aparse("東京都新宿区西新宿1-2-3")
+        async for result in async_parser.aparse_stream(addresses):
+            ...
+"""
+import asyncio
+import collections
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import batch
+from .parser import AddressParser
+
+
+def _parse_batch(parser, addresses):
+    """
+    住所のバッチを解析する（失敗した住所は例外オブジェクトをそのまま返す）
+    """
+    results = []
+    for address in addresses:
+        try:
+            results.append(parser.parse_address(address))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _parse_batch_in_worker(addresses):
+    """
+    ワーカープロセスで住所のバッチを解析する
+    """
+    return _parse_batch(batch._worker_parser, addresses)
+
+
+class AsyncAddressParser:
+    """
+    AddressParser を asyncio から利用するためのクラス
+
+    aparse は同時に呼び出された要求を最大 batch_size 件のバッチにまとめてエグゼキューターへ送る。
+    エグゼキューターで処理中のバッチは max_in_flight 個まで、送信待ちの要求は queue_limit 件までとし、
+    それを超える要求は空きができるまで待たせる。結果は同期の parse_address と同じになる。
+    """
+
+    def __init__(self, parser=None, workers=1, use_processes=False, executor=None,
+                 batch_size=16, batch_delay=0.0, queue_limit=1024, max_in_flight=None, shared_tables=False):
+        """
+        AsyncAddressParserクラスの初期化
+
+        Args:
+            parser (AddressParser): 解析に使用するパーサー（None の場合は既定のパーサー）
+            workers (int): エグゼキューターのワーカー数（executor を指定しない場合）
+            use_processes (bool): スレッドではなくプロセスのプールで解析するかどうか
+                （解析がイベントループと GIL を奪い合わないが、結果の受け渡しにコストがかかる）
+            executor (Executor): 使用するエグゼキューター（指定した場合は終了時に停止しない）
+            batch_size (int): 1つのバッチにまとめる要求の最大件数
+            batch_delay (float): バッチに要求が集まるのを待つ秒数（0の場合は待たずに送る）
+            queue_limit (int): 送信待ちの要求の上限件数（aparse_stream では処理中の件数の上限）
+            max_in_flight (int): エグゼキューターで処理中のバッチの上限（None の場合は workers の2倍）
+            shared_tables (bool): プロセスのプールで、辞書をワーカー間で共有するかどうか（batch.share_tables を参照）
+        """
+        if batch_size < 1 or queue_limit < 1:
+            raise ValueError("batch_size と queue_limit には1以上を指定してください")
+        self.parser = parser if parser is not None else AddressParser()
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue_limit = queue_limit
+        self.max_in_flight = max_in_flight or workers * 2
+
+        self._owns_executor = executor is None
+        self._use_processes = use_processes
+        if executor is None:
+            if use_processes:
+                parser = batch.share_tables(self.parser) if shared_tables else self.parser
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=batch._init_worker, initargs=(parser,))
+            else:
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="address_parser")
+        self.executor = executor
+
+        # aparse の要求をまとめて送ったバッチの数と、バッチに含めた要求の件数
+        self.batch_count = 0
+        self.batched_requests = 0
+
+        # イベントループ上のオブジェクトは初回の使用時に作成する
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _start(self):
+        """
+        待ち行列とバッチを送るタスクを作成する（2回目以降は何もしない）
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_limit)
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        if self._batcher is None or self._batcher.done():
+            self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    def _submit(self, function, *args):
+        """
+        エグゼキューターに処理を送る（処理中のバッチの枠は呼び出し側で確保済み）
+        """
+        future = asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _submit_batch(self, addresses):
+        if self._use_processes and self._owns_executor:
+            return self._submit(_parse_batch_in_worker, addresses)
+        return self._submit(_parse_batch, self.parser, addresses)
+
+    def _submit_chunk(self, start, addresses):
+        if self._use_processes and self._owns_executor:
+            return self._submit(batch._parse_chunk, start, addresses)
+        return self._submit(batch.parse_chunk, self.parser, start, addresses)
+
+    async def aparse(self, address_string):
+        """
+        住所文字列を解析する
+
+        Args:
+            address_string (str): 解析する住所文字列
+
+        Returns:
+            ParsedAddress: 解析結果（parse_address と同じ）
+        """
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        # 待ち行列が上限に達している場合はここで待つ
+        await self._queue.put((address_string, future))
+        return await future
+
+    async def _run_batches(self):
+        """
+        待ち行列の要求をバッチにまとめてエグゼキューターへ送り続ける
+        """
+        queue = self._queue
+        requests = []
+        try:
+            while True:
+                requests = [await queue.get()]
+                # 同時に届いた要求がそろうまで一度だけ制御を戻す
+                await asyncio.sleep(self.batch_delay)
+                while len(requests) < self.batch_size and not queue.empty():
+                    requests.append(queue.get_nowait())
+
+                await self._slots.acquire()
+                try:
+                    future = self._submit_batch([address for address, _ in requests])
+                except Exception as e:
+                    # エグゼキューターが停止済み、またはプロセスのプールが壊れている場合など
+                    self._slots.release()
+                    self._fail(requests, e)
+                    requests = []
+                    continue
+                self.batch_count += 1
+                self.batched_requests += len(requests)
+                future.add_done_callback(lambda done, requests=requests: self._deliver(done, requests))
+                requests = []
+        finally:
+            # 停止する場合は、取り出し済みの要求と送信待ちの要求を待たせたままにしない
+            error = RuntimeError("AsyncAddressParser のバッチの送信が停止しました")
+            self._fail(requests, error)
+            while not queue.empty():
+                self._fail([queue.get_nowait()], error)
+
+    @staticmethod
+    def _fail(requests, error):
+        """
+        要求を例外で失敗させる（呼び出し側が待つのをやめた要求は除く）
+        """
+        for _, future in requests:
+            if not future.done():
+                future.set_exception(error)
+
+    @staticmethod
+    def _deliver(done, requests):
+        """
+        バッチの結果を各要求に受け渡す
+        """
+        if done.cancelled() or done.exception() is not None:
+            error = done.exception() if not done.cancelled() else asyncio.CancelledError()
+            results = [error] * len(requests)
+        else:
+            results = done.result()
+        for (_, future), result in zip(requests, results):
+            if future.done():
+                # 呼び出し側が待つのをやめた要求
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def aparse_stream(self, addresses):
+        """
+        住所のイテラブル（非同期イテラブルも可）を順に解析し、入力と同じ順序で結果を返す
+
+        入力は必要な分だけ読み進め、処理中の住所は queue_limit 件程度までに制限する。
+
+        Args:
+            addresses (iterable or async iterable): 住所文字列のイテラブル
+
+        Yields:
+            ParsedAddress or ParseFailure: 解析結果。失敗したレコードは ParseFailure となり、処理は継続する
+        """
+        self._start()
+        max_pending = max(1, self.queue_limit // self.batch_size)
+        pending = collections.deque()
+        try:
+            async for start, chunk in _iter_chunks(addresses, self.batch_size):
+                await self._slots.acquire()
+                try:
+                    future = self._submit_chunk(start, chunk)
+                except BaseException:
+                    # エグゼキューターが停止済み、またはプロセスのプールが壊れている場合など
+                    self._slots.release()
+                    raise
+                pending.append(future)
+                while len(pending) >= max_pending or (pending and pending[0].done()):
+                    for result in await pending.popleft():
+                        yield result
+            while pending:
+                for result in await pending.popleft():
+                    yield result
+        finally:
+            # 途中で打ち切られた場合は未着手のバッチを取り消す
+            for future in pending:
+                future.cancel()
+
+    async def aclose(self):
+        """
+        バッチを送るタスクを停止し、作成したエグゼキューターを停止する
+
+        送信待ちの要求は RuntimeError で失敗させる。
+        """
+        if self._queue is not None:
+            # バッチを送るタスクより先に失敗させ、終了したことを伝える
+            error = RuntimeError("AsyncAddressParser は終了しました")
+            while not self._queue.empty():
+                self._fail([self._queue.get_nowait()], error)
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _iter_chunks(addresses, chunksize):
+    """
+    イテラブルまたは非同期イテラブルを先頭から順にチャンクへ分割する
+
+    Yields:
+        tuple: (チャンク先頭の位置, 要素のリスト)
+    """
+    if not hasattr(addresses, "__aiter__"):
+        for start, chunk in batch.iter_chunks(addresses, chunksize):
+            yield start, chunk
+            # 同期のイテラブルでもイベントループを止めないよう、チャンクごとに制御を戻す
+            await asyncio.sleep(0)
+        return
+
+    start = 0
+    chunk = []
+    async for address in addresses:
+        chunk.append(address)
+        if len(chunk) == chunksize:
+            yield start, chunk
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk
@@ -0,0 +1,399 @@
+"""
+住所入力の補完のためのインクリメンタルな解析モジュール
+
+入力欄の1文字ごとに住所全体を解析し直す代わりに、IncrementalParser が追加された文字の分だけ
+都道府県・市区町村のプレフィックス木をたどり、解決済みの状態を保持する。各ノードには
+補完候補の上位を事前に計算しておくため、1文字あたりの処理は入力の長さに関係なく一定である。
+
+使用例:
+    session = IncrementalParser()
+    session.feed("東京都新")
+    session.completions()  # [Completion(text='新宿区', start=3, ...), ...]
+"""
+import collections
+import functools
+import heapq
+
+from .municipality import PREFECTURE_ALIASES, PREFECTURES, load_municipalities, municipality_keys
+from .normalizer import DEFAULT_NORMALIZER
+
+
+# 補完候補の種類と表示順
+KINDS = ("prefecture", "city", "ward", "town", "village")
+
+# 市区町村名の末尾の文字と種類
+_KIND_BY_SUFFIX = {"市": "city", "区": "ward", "町": "town", "村": "village"}
+
+
+class Completion(collections.namedtuple("Completion", ["text", "start", "kind", "prefecture", "name"])):
+    """
+    補完候補
+
+    Attributes:
+        text (str): 入力の start 以降を置き換える文字列
+        start (int): 置き換えを始める入力中の位置
+        kind (str): 種類（KINDS のいずれか）
+        prefecture (str): 都道府県名
+        name (str): 辞書上の名称（郡名を省略した表記の場合は郡名を含む名称）
+    """
+
+    __slots__ = ()
+
+
+class _Node:
+    """
+    補完用のプレフィックス木のノード
+    """
+
+    __slots__ = ("children", "value", "completions")
+
+    def __init__(self):
+        self.children = {}
+        self.value = None
+        self.completions = ()
+
+
+def _insert(root, key, value):
+    node = root
+    for char in key:
+        child = node.children.get(char)
+        if child is None:
+            child = node.children[char] = _Node()
+        node = child
+    node.value = value
+    return node
+
+
+def _fill_completions(root, entries, top_k):
+    """
+    各ノードの配下にある補完候補のうち、順位の高いものを top_k 件まで事前に計算する
+
+    Args:
+        root (_Node): プレフィックス木の根
+        entries (dict): {キー: {都道府県名: (順位のキー, Completion)}}
+        top_k (int): ノードごとに保持する件数
+    """
+    # 帰りがけ順にたどり、子の候補を親にまとめる
+    stack = [(root, "", False)]
+    while stack:
+        node, key, visited = stack.pop()
+        if not visited:
+            stack.append((node, key, True))
+            for char, child in node.children.items():
+                stack.append((child, key + char, False))
+            continue
+        candidates = list(entries[key].values()) if key in entries else []
+        for child in node.children.values():
+            candidates.extend(child.completions)
+        candidates.sort(key=lambda entry: entry[0])
+        node.completions = tuple(candidates[:top_k])
+
+
+class AutocompleteIndex:
+    """
+    都道府県名・市区町村名の補完のためのプレフィックス木
+
+    都道府県名（省略形を含む）、都道府県ごとの市区町村名、都道府県を省略した場合の
+    全国の市区町村名の木を持ち、各ノードに補完候補の上位を保持する。
+    候補は種類（都道府県、市、区、町、村の順）、重み、名称の短さ、辞書の順に並べる。
+    """
+
+    def __init__(self, municipalities=None, weights=None, top_k=10):
+        """
+        AutocompleteIndexクラスの初期化
+
+        Args:
+            municipalities (list): (都道府県名, 市区町村名) のリスト（None の場合は同梱の辞書）
+            weights (dict): 名称ごとの重み（大きいほど上位。利用頻度などを指定する）
+            top_k (int): ノードごとに保持する補完候補の件数
+        """
+        if municipalities is None:
+            municipalities = load_municipalities()
+        weights = weights or {}
+        self.top_k = top_k
+
+        def rank(kind, name, key, order):
+            return (KINDS.index(kind), -weights.get(name, 0), len(key), order)
+
+        # 都道府県名（省略形は補完候補にせず、正式名の候補を返す）
+        self.prefecture_root = _Node()
+        entries = {}
+        for order, prefecture in enumerate(PREFECTURES):
+            _insert(self.prefecture_root, prefecture, prefecture)
+            entries[prefecture] = {prefecture: (
+                rank("prefecture", prefecture, prefecture, order),
+                Completion(prefecture, 0, "prefecture", prefecture, prefecture),
+            )}
+        for alias, prefecture in PREFECTURE_ALIASES.items():
+            _insert(self.prefecture_root, alias, prefecture)
+        _fill_completions(self.prefecture_root, entries, top_k)
+
+        # 都道府県ごとの市区町村名と、全国の市区町村名
+        self.city_names = frozenset(name for _, name in municipalities)
+        self.city_roots = {}
+        self.city_root = _Node()
+        city_entries = {}
+        global_entries = {}
+        for order, (prefecture, name) in enumerate(municipalities):
+            root = self.city_roots.setdefault(prefecture, _Node())
+            entries = city_entries.setdefault(prefecture, {})
+            kind = _KIND_BY_SUFFIX.get(name[-1], "city")
+            for key in municipality_keys(name):
+                _insert(root, key, name)
+                _insert(self.city_root, key, name)
+                entry = (rank(kind, name, key, order), Completion(key, 0, kind, prefecture, name))
+                entries.setdefault(key, {}).setdefault(prefecture, entry)
+                # 同じ名称の市区町村が複数の都道府県にある場合（例: 伊達市）は都道府県ごとに候補にする
+                global_entries.setdefault(key, {}).setdefault(prefecture, entry)
+        for prefecture, root in self.city_roots.items():
+            _fill_completions(root, city_entries[prefecture], top_k)
+        _fill_completions(self.city_root, global_entries, top_k)
+
+    def session(self):
+        """
+        この索引を使用する IncrementalParser を作成する
+        """
+        return IncrementalParser(self)
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_autocomplete_index():
+    """
+    同梱の辞書から作成した既定の補完用の索引を返す（初回呼び出し時に作成し、以降は共有）
+
+    Returns:
+        AutocompleteIndex: 既定の索引
+    """
+    return AutocompleteIndex()
+
+
+# 入力の各位置での状態
+#   prefecture_node: 先頭からの都道府県名の木のノード（外れた場合は None）
+#   city_node: 先頭からの全国の市区町村名の木のノード（都道府県を省略した場合）
+#   prefecture_match: 最長一致した (都道府県名, 終了位置)
+#   city_match: 全国の市区町村名で最長一致した (市区町村名, 終了位置)
+#   cursors: 都道府県名に一致した位置ごとの、その都道府県の市区町村名の木をたどるカーソル
+#   origin: 先頭の空白と郵便番号を除いた入力の開始位置
+_State = collections.namedtuple(
+    "_State", ["prefecture_node", "city_node", "prefecture_match", "city_match", "cursors", "origin"]
+)
+
+# 都道府県の市区町村名の木をたどるカーソル
+#   prefecture, start: 都道府県名とその終了位置（市区町村名の開始位置。空白は読み飛ばす）
+#   node: 市区町村名の木のノード（外れた場合は None）
+#   match: 最長一致した (市区町村名, 終了位置)
+_Cursor = collections.namedtuple("_Cursor", ["prefecture", "start", "node", "match"])
+
+_NO_MATCH = ("", 0)
+
+# 入力の先頭で読み飛ばす文字（空白と郵便番号）
+_LEADING_CHARS = frozenset("〒0123456789-")
+
+
+class IncrementalParser:
+    """
+    1文字ずつ追加される住所の入力を解析し、補完候補を返すクラス
+
+    追加された文字の分だけ木をたどり、各位置の状態を保持するため、文字の追加・削除の処理は
+    入力全体の長さに依存しない。都道府県・市区町村の判定は parse_address と同じく最長一致で、
+    「大阪市」のように省略形を含む市区町村名が続く場合は都道府県名とみなさない。
+    """
+
+    def __init__(self, index=None):
+        """
+        IncrementalParserクラスの初期化
+
+        Args:
+            index (AutocompleteIndex): 使用する索引（None の場合は既定の索引）
+        """
+        self.index = index if index is not None else get_default_autocomplete_index()
+        self.reset()
+
+    def reset(self):
+        """
+        入力を空にする
+        """
+        self._chars = []
+        self._states = [_State(self.index.prefecture_root, self.index.city_root, _NO_MATCH, _NO_MATCH, (), 0)]
+
+    @property
+    def text(self):
+        """
+        現在の入力（正規化済み）
+        """
+        return "".join(self._chars)
+
+    def __len__(self):
+        return len(self._chars)
+
+    def feed(self, text):
+        """
+        入力の末尾に文字を追加する
+
+        Args:
+            text (str): 追加する文字列
+        """
+        for char in DEFAULT_NORMALIZER.normalize(text):
+            self._states.append(self._advance(self._states[-1], char, len(self._chars)))
+            self._chars.append(char)
+
+    def backspace(self, count=1):
+        """
+        入力の末尾から文字を削除する（保持している状態に戻すのみで、再解析はしない）
+
+        Args:
+            count (int): 削除する文字数
+        """
+        count = min(count, len(self._chars))
+        if count > 0:
+            del self._chars[-count:]
+            del self._states[-count:]
+
+    def update(self, text):
+        """
+        入力欄の値全体を受け取り、前回の入力との差分だけを処理する
+
+        Args:
+            text (str): 入力欄の現在の値
+        """
+        text = DEFAULT_NORMALIZER.normalize(text)
+        common = 0
+        limit = min(len(text), len(self._chars))
+        while common < limit and text[common] == self._chars[common]:
+            common += 1
+        self.backspace(len(self._chars) - common)
+        self.feed(text[common:])
+
+    def _advance(self, state, char, position):
+        """
+        1文字を追加した後の状態を返す
+        """
+        end = position + 1
+        if state.origin == position and (char.isspace() or char in _LEADING_CHARS):
+            # 先頭の空白と郵便番号は読み飛ばす
+            return state._replace(origin=end)
+
+        prefecture_node = state.prefecture_node
+        prefecture_match = state.prefecture_match
+        cursors = state.cursors
+        if cursors:
+            cursors = tuple(self._advance_cursor(cursor, char, end) for cursor in cursors)
+        if prefecture_node is not None:
+            prefecture_node = prefecture_node.children.get(char)
+            if prefecture_node is not None and prefecture_node.value is not None:
+                prefecture_match = (prefecture_node.value, end)
+                root = self.index.city_roots.get(prefecture_node.value)
+                cursors = cursors + (_Cursor(prefecture_node.value, end, root, _NO_MATCH),)
+
+        city_node = state.city_node
+        city_match = state.city_match
+        if city_node is not None:
+            city_node = city_node.children.get(char)
+            if city_node is not None and city_node.value is not None:
+                city_match = (city_node.value, end)
+        return _State(prefecture_node, city_node, prefecture_match, city_match, cursors, state.origin)
+
+    def _advance_cursor(self, cursor, char, end):
+        node = cursor.node
+        if node is None:
+            return cursor
+        if char.isspace() and cursor.start == end - 1 and cursor.match is _NO_MATCH:
+            # 都道府県名と市区町村名の間の空白は読み飛ばす
+            return cursor._replace(start=end)
+        node = node.children.get(char)
+        if node is not None and node.value is not None:
+            return cursor._replace(node=node, match=(node.value, end))
+        return cursor._replace(node=node)
+
+    def _typed(self, start, text):
+        """
+        候補が入力済みの文字列と同じかどうかを返す
+        """
+        if len(self._chars) - start != len(text):
+            return False
+        return "".join(self._chars[start:]) == text
+
+    def _resolution(self):
+        """
+        現在の入力で確定している (都道府県名, 市区町村のカーソルまたは None) を返す
+        """
+        state = self._states[-1]
+        prefecture, prefecture_end = state.prefecture_match
+        if not prefecture or state.city_match[1] > prefecture_end:
+            return "", None
+        for cursor in state.cursors:
+            if cursor.prefecture == prefecture and cursor.match is not _NO_MATCH and cursor.start >= prefecture_end:
+                return prefecture, cursor
+        for cursor in state.cursors:
+            if cursor.start >= prefecture_end:
+                return prefecture, cursor
+        return prefecture, None
+
+    @property
+    def prefecture(self):
+        """
+        現在の入力で一致している都道府県名（正式名。ない場合は空文字列）
+        """
+        return self._resolution()[0]
+
+    @property
+    def city(self):
+        """
+        現在の入力で一致している市区町村名（辞書上の名称。ない場合は空文字列）
+        """
+        prefecture, cursor = self._resolution()
+        if prefecture:
+            return cursor.match[0] if cursor is not None else ""
+        return self._states[-1].city_match[0]
+
+    @property
+    def city_end(self):
+        """
+        市区町村名の入力中の終了位置（一致していない場合は0）
+        """
+        prefecture, cursor = self._resolution()
+        if prefecture:
+            return cursor.match[1] if cursor is not None else 0
+        return self._states[-1].city_match[1]
+
+    def completions(self, limit=10):
+        """
+        現在の入力の補完候補を順位の高い順に返す
+
+        入力の途中にある都道府県名・市区町村名の候補を返す。市区町村名を入力し終えて
+        町名以降に進んだ場合は空のリストを返す。同じ文字列・都道府県の候補は、置き換えを始める
+        位置が異なっても順位の高い方を1回だけ返す（例: 「大阪」に対する全国の市区町村名の「大阪市」と、
+        省略形の都道府県名に続く「大阪市」）。
+
+        Args:
+            limit (int): 返す件数の上限
+
+        Returns:
+            list: Completion のリスト
+        """
+        if not self._chars:
+            return []
+        state = self._states[-1]
+        # 各ノードの候補は順位順に並んでいるため、先頭から必要な分だけ併合する
+        sources = []
+        if state.origin < len(self._chars):
+            for node in (state.prefecture_node, state.city_node):
+                if node is not None and node.completions:
+                    sources.append(((rank, state.origin, completion) for rank, completion in node.completions))
+        for cursor in state.cursors:
+            if cursor.node is not None and cursor.node.completions:
+                sources.append(((rank, cursor.start, completion) for rank, completion in cursor.node.completions))
+
+        completions = []
+        seen = set()
+        for _, start, completion in heapq.merge(*sources, key=lambda entry: entry[0]):
+            # 入力済みのものと同じ候補と、返した候補と同じ文字列・都道府県の候補は返さない
+            key = (completion.text, completion.prefecture)
+            if key in seen or self._typed(start, completion.text):
+                continue
+            seen.add(key)
+            text, _, kind, prefecture, name = completion
+            completions.append(Completion(text, start, kind, prefecture, name))
+            if len(completions) == limit:
+                break
+        return completions
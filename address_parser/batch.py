@@ -0,0 +1,244 @@
+"""
+複数の住所をまとめて解析するためのモジュール
+"""
+import collections
+import functools
+import itertools
+import os
+import sys
+
+
+# 1つのワーカーに一度に送る住所の既定件数
+DEFAULT_CHUNKSIZE = 1000
+
+
+class ParseFailure(collections.namedtuple("ParseFailure", ["index", "address", "error"])):
+    """
+    解析に失敗したレコード
+
+    Attributes:
+        index (int): 入力中の位置（0始まり）
+        address: 解析しようとした入力
+        error (str): 例外の種類とメッセージ
+    """
+
+    __slots__ = ()
+
+
+def free_threading():
+    """
+    GIL が無効な状態で実行しているか（free-threaded ビルドの CPython 3.13 以降か）を返す
+
+    Returns:
+        bool: GIL が無効な場合は True
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+# ワーカープロセスで使用するパーサー（_init_worker で設定）
+_worker_parser = None
+
+
+def _init_worker(parser):
+    """
+    ワーカープロセスの初期化（パーサーはプロセスごとに1回だけ受け渡す）
+    """
+    global _worker_parser
+    _worker_parser = parser
+
+
+def share_tables(parser):
+    """
+    ワーカープロセスに渡すパーサーを返す（辞書はプロセス間で共有するスナップショットを参照する）
+
+    スナップショットを指定していないパーサーは、同梱の辞書からワーカーごとに Python のオブジェクトの
+    インデックスを作成するため、ワーカー数に比例してメモリを使用する。そのようなパーサーは
+    get_shared_snapshot のスナップショットを指定した複製に置き換え、各ワーカーがメモリマップした
+    同じファイルを参照するようにする。解析結果は変わらない。
+
+    スナップショットのトライは配列を二分探索でたどるため、辞書のトライより解析が遅く（合成住所で3割程度）、
+    初回は同梱の辞書のスナップショットを一時ファイルに書き出す。ワーカー数が多くメモリが問題になる場合に使用する
+    （benchmarks/bench_memory.py --workers で両方のメモリと解析時間を比較できる）。
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+
+    Returns:
+        AddressParser: スナップショットを参照するパーサー（すでに指定している場合は parser そのもの）
+    """
+    if parser.snapshot is not None:
+        return parser
+    from .snapshot import get_shared_snapshot
+
+    state = parser.__getstate__()
+    state["snapshot"] = get_shared_snapshot()
+    shared = type(parser).__new__(type(parser))
+    shared.__setstate__(state)
+    return shared
+
+
+def _parse_one(parser, index, address):
+    """
+    1件の住所を解析する（失敗した場合は ParseFailure を返す）
+    """
+    try:
+        return parser.parse_address(address)
+    except Exception as e:
+        return ParseFailure(index, address, f"{type(e).__name__}: {e}")
+
+
+def _parse_chunk(start, addresses):
+    """
+    ワーカープロセスで住所のチャンクを解析する
+    """
+    return parse_chunk(_worker_parser, start, addresses)
+
+
+def _run_chunk(function, start, addresses):
+    """
+    ワーカープロセスで住所のチャンクに function を適用する
+    """
+    return function(_worker_parser, start, addresses)
+
+
+def parse_chunk(parser, start, addresses):
+    """
+    住所のチャンクを解析する（失敗したレコードは ParseFailure とする）
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+        start (int): チャンク先頭の入力中の位置
+        addresses (list): 住所文字列のリスト
+
+    Returns:
+        list: ParsedAddress または ParseFailure のリスト
+    """
+    return [_parse_one(parser, start + offset, address) for offset, address in enumerate(addresses)]
+
+
+def iter_chunks(iterable, chunksize):
+    """
+    イテラブルを先頭から順にチャンクへ分割する（全体をリストにはしない）
+
+    Args:
+        iterable (iterable): 分割する要素
+        chunksize (int): 1チャンクあたりの件数
+
+    Yields:
+        tuple: (チャンク先頭の位置, 要素のリスト)
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize には1以上を指定してください")
+    iterator = iter(iterable)
+    start = 0
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def parse_many(parser, addresses, workers=1, chunksize=DEFAULT_CHUNKSIZE, use_threads=None, shared_tables=False):
+    """
+    複数の住所を解析し、入力と同じ順序で結果を返す
+
+    workers が2以上の場合はチャンク単位でワーカーのプールに送る。入力は必要な分だけ
+    読み進め、処理中のチャンクは workers の2倍までに制限するため、入力全体を
+    メモリに載せることはない。
+
+    スレッドのプールではパーサーを pickle せず、1つのインスタンスをすべてのスレッドで共有する。
+    GIL が無効な free-threaded ビルドではワーカー数に応じて速くなるが、GIL がある場合は
+    同時に解析できるのは1スレッドのみのため、CPU数に応じて速くするにはプロセスのプールを使用する。
+    プロセスのプールでは各ワーカーが辞書のインデックスを作成する。shared_tables を指定すると、
+    辞書をメモリマップしたスナップショットとしてすべてのワーカーで共有する（share_tables を参照）。
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+        addresses (iterable): 住所文字列のイテラブル
+        workers (int): ワーカー数（1の場合は同じスレッドで解析、None の場合はCPU数）
+        chunksize (int): 1つのワーカーに一度に送る住所の件数
+        use_threads (bool): プロセスではなくスレッドのプールで解析するかどうか
+            （None の場合、GIL が無効な場合のみスレッドを使用する）
+        shared_tables (bool): プロセスのプールで、辞書をワーカー間で共有するかどうか（share_tables を参照。
+            ワーカーのメモリは減るが、解析は遅くなる）
+
+    Yields:
+        ParsedAddress or ParseFailure: 解析結果。失敗したレコードは ParseFailure となり、処理は継続する
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers には1以上を指定してください")
+
+    if workers == 1:
+        for index, address in enumerate(addresses):
+            yield _parse_one(parser, index, address)
+        return
+
+    for results in map_chunks(parser, parse_chunk, addresses, workers, chunksize, use_threads, shared_tables):
+        yield from results
+
+
+def map_chunks(parser, function, addresses, workers=1, chunksize=DEFAULT_CHUNKSIZE, use_threads=None,
+               shared_tables=False):
+    """
+    住所をチャンクに分け、各チャンクに function(parser, start, addresses) を適用した結果を入力と同じ順序で返す
+
+    parse_many と同じく入力は必要な分だけ読み進め、処理中のチャンクは workers の2倍までに制限する。
+    解析結果ではなくチャンクごとの集計結果などを返す処理を、ワーカーで並列に実行するために使用する。
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+        function (callable): チャンクに適用する関数（プロセスのプールで実行する場合は pickle できること）
+        addresses (iterable): 住所文字列のイテラブル
+        workers (int): ワーカー数（1の場合は同じスレッドで実行、None の場合はCPU数）
+        chunksize (int): 1つのワーカーに一度に送る住所の件数
+        use_threads (bool): プロセスではなくスレッドのプールで実行するかどうか
+            （None の場合、GIL が無効な場合のみスレッドを使用する）
+        shared_tables (bool): プロセスのプールで、辞書をワーカー間で共有するかどうか（share_tables を参照。
+            ワーカーのメモリは減るが、解析は遅くなる）
+
+    Yields:
+        チャンクごとの function の戻り値
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers には1以上を指定してください")
+
+    chunks = iter_chunks(addresses, chunksize)
+    if workers == 1:
+        for start, chunk in chunks:
+            yield function(parser, start, chunk)
+        return
+
+    if use_threads is None:
+        use_threads = free_threading()
+
+    # concurrent.futures と multiprocessing の import は時間がかかるため、並列に実行する場合のみ行う
+    if use_threads:
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="address_parser")
+        submit = functools.partial(executor.submit, function, parser)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        if shared_tables:
+            parser = share_tables(parser)
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(parser,))
+        submit = functools.partial(executor.submit, _run_chunk, function)
+
+    pending = collections.deque()
+    with executor:
+        try:
+            for start, chunk in chunks:
+                pending.append(submit(start, chunk))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # 途中で打ち切られた場合は未着手のチャンクを取り消す
+            for future in pending:
+                future.cancel()
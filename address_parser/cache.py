@@ -0,0 +1,121 @@
+"""
+解析結果をキャッシュするためのモジュール
+"""
+import collections
+import threading
+
+
+class CacheStats(collections.namedtuple("CacheStats", ["hits", "misses", "evictions", "size", "maxsize"])):
+    """
+    キャッシュの統計情報
+
+    Attributes:
+        hits (int): ヒット数
+        misses (int): ミス数
+        evictions (int): 上限を超えたため破棄したエントリ数
+        size (int): 現在のエントリ数
+        maxsize (int): エントリ数の上限
+    """
+
+    __slots__ = ()
+
+    @property
+    def hit_rate(self):
+        """
+        ヒット率（参照がない場合は0.0）
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache:
+    """
+    エントリ数に上限があり、最も長く参照されていないエントリから破棄するキャッシュ
+
+    すべての操作はロックで保護されており、複数のスレッドから共有できる。
+    """
+
+    def __init__(self, maxsize):
+        """
+        LRUCacheクラスの初期化
+
+        Args:
+            maxsize (int): エントリ数の上限
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize には1以上を指定してください")
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        キーに対応する値を返し、そのエントリを最近参照したものとして扱う
+
+        Args:
+            key: キー
+            default: 見つからない場合の戻り値
+
+        Returns:
+            キーに対応する値
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        キーと値を登録し、上限を超えた場合は最も長く参照されていないエントリを破棄する
+
+        Args:
+            key: キー
+            value: 値
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """
+        すべてのエントリと統計情報を消去する
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self):
+        """
+        統計情報を返す
+
+        Returns:
+            CacheStats: 統計情報
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self.maxsize)
+
+    def __getstate__(self):
+        # ロックは pickle できないため、エントリのみを受け渡す（統計情報は引き継がない）
+        with self._lock:
+            return {"maxsize": self.maxsize, "entries": list(self._entries.items())}
+
+    def __setstate__(self, state):
+        self.__init__(state["maxsize"])
+        self._entries.update(state["entries"])
@@ -0,0 +1,505 @@
+"""
+コマンドラインから住所を解析するためのモジュール
+
+使用例:
+    python -m address_parser addresses.csv --column 住所 -o parsed.csv
+    cat addresses.tsv | python -m address_parser --format tsv --column 2 --workers 4
+    python -m address_parser build-postal KEN_ALL.CSV -o postal.bin
+    python -m address_parser build-towns KEN_ALL.CSV -o towns.bin
+    python -m address_parser dedupe customers.txt --workers 4 -o duplicates.tsv
+    python -m address_parser aggregate export.txt --level city --top 20 --workers 4
+    python -m address_parser serve --port 8080 --cache-size 100000
+    python -m address_parser build-snapshot -o dictionary.snap --postal-table postal.bin --town-table towns.bin
+"""
+import argparse
+import collections
+import contextlib
+import csv
+import json
+import os
+import sys
+
+from . import __version__
+from .aggregate import DEFAULT_MAX_KEYS, LEVELS, aggregate
+from .batch import DEFAULT_CHUNKSIZE, ParseFailure, free_threading
+from .dedupe import dedupe
+from .municipality import MUNICIPALITIES_PATH
+from .parser import AddressParser
+from .postal import PostalIndex, build_postal_table
+from .snapshot import Snapshot, build_snapshot
+from .towns import TownIndex, build_town_table
+
+
+# 出力に追加する列
+FIELDS = ("prefecture", "city", "town_street", "other")
+
+# 対応している入出力形式と拡張子
+FORMATS = ("csv", "tsv", "jsonl")
+EXTENSIONS = {".csv": "csv", ".tsv": "tsv", ".txt": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# サブコマンド（先頭の引数がいずれでもない場合は parse とみなす）
+COMMANDS = ("parse", "build-postal", "build-towns", "build-snapshot", "dedupe", "aggregate", "serve")
+
+# 出力バッファのサイズ
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def detect_format(path, default="csv"):
+    """
+    ファイル名の拡張子から入力形式を判定する
+
+    Args:
+        path (str): ファイルのパス（標準入力の場合は None または "-"）
+        default (str): 判定できない場合の形式
+
+    Returns:
+        str: 入力形式
+    """
+    if not path or path == "-":
+        return default
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), default)
+
+
+@contextlib.contextmanager
+def open_input(path, encoding):
+    """
+    入力ファイル（"-" または None の場合は標準入力）を開く
+    """
+    if not path or path == "-":
+        with open(sys.stdin.fileno(), encoding=encoding, newline="", closefd=False) as f:
+            yield f
+    else:
+        with open(path, encoding=encoding, newline="") as f:
+            yield f
+
+
+@contextlib.contextmanager
+def open_output(path, encoding):
+    """
+    出力ファイル（"-" または None の場合は標準出力）をバッファ付きで開く
+    """
+    if not path or path == "-":
+        sys.stdout.flush()
+        with open(sys.stdout.fileno(), "w", encoding=encoding, newline="",
+                  buffering=OUTPUT_BUFFER_SIZE, closefd=False) as f:
+            yield f
+    else:
+        with open(path, "w", encoding=encoding, newline="", buffering=OUTPUT_BUFFER_SIZE) as f:
+            yield f
+
+
+class DelimitedRecords:
+    """
+    CSV・TSV形式のレコードの読み書き
+    """
+
+    def __init__(self, delimiter, column, header=True):
+        """
+        DelimitedRecordsクラスの初期化
+
+        Args:
+            delimiter (str): 区切り文字
+            column (str): 住所の列（列名、または0始まりの列番号）
+            header (bool): 1行目がヘッダーかどうか
+        """
+        self.delimiter = delimiter
+        self.column = column
+        self.header = header
+
+    def read(self, f, writer_f):
+        """
+        レコードを読み込み、(行番号, レコード, 住所) を順に返す（ヘッダーはそのまま出力する）
+
+        行番号はレコードの最後の行の入力中の番号（1始まり）。住所の列がない行の住所は None とする。
+        """
+        reader = csv.reader(f, delimiter=self.delimiter)
+        self.writer = csv.writer(writer_f, delimiter=self.delimiter, lineterminator="\n")
+        if self.header:
+            header = next(reader, None)
+            if header is None:
+                return
+            index = self._column_index(self.column, header)
+            self.writer.writerow(header + list(FIELDS))
+        else:
+            index = self._column_index(self.column, None)
+        for row in reader:
+            yield reader.line_num, row, row[index] if index < len(row) else None
+
+    def write(self, row, result):
+        """
+        レコードの末尾に解析結果の列を追加して出力する
+        """
+        self.writer.writerow(row + [result[field] if result else "" for field in FIELDS])
+
+    @staticmethod
+    def _column_index(column, header):
+        if column.isdigit():
+            return int(column)
+        if header is None:
+            raise ValueError(f"ヘッダーがない場合は列番号を指定してください: {column}")
+        if column not in header:
+            raise ValueError(f"列が見つかりません: {column}")
+        return header.index(column)
+
+
+class InvalidRecord(collections.namedtuple("InvalidRecord", ["line_number", "error"])):
+    """
+    読み込めなかったレコード（解析せず、出力もしない）
+
+    Attributes:
+        line_number (int): 入力中の行番号（1始まり）
+        error (str): 読み込めなかった理由
+    """
+
+    __slots__ = ()
+
+
+class JsonLinesRecords:
+    """
+    JSON Lines形式のレコードの読み書き
+    """
+
+    def __init__(self, column):
+        """
+        JsonLinesRecordsクラスの初期化
+
+        Args:
+            column (str): 住所のキー
+        """
+        self.column = column
+
+    def read(self, f, writer_f):
+        """
+        レコードを読み込み、(行番号, レコード, 住所) を順に返す
+
+        住所のキーがないレコードの住所は None とする。JSON として読み込めない行や、
+        JSON のオブジェクトではない行は InvalidRecord とし、処理を続ける。
+        """
+        self.f = writer_f
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, InvalidRecord(line_number, f"JSON として読み込めません: {e}"), None
+                continue
+            if not isinstance(record, dict):
+                error = f"JSON のオブジェクトではありません: {type(record).__name__}"
+                yield line_number, InvalidRecord(line_number, error), None
+                continue
+            yield line_number, record, record.get(self.column)
+
+    def write(self, record, result):
+        """
+        レコードに解析結果のキーを追加して出力する
+        """
+        for field in FIELDS:
+            record[field] = result[field] if result else ""
+        self.f.write(json.dumps(record, ensure_ascii=False))
+        self.f.write("\n")
+
+
+def make_records(fmt, column, header=True):
+    """
+    入力形式に応じたレコードの読み書きオブジェクトを作成する
+    """
+    if fmt == "jsonl":
+        return JsonLinesRecords(column or "address")
+    return DelimitedRecords("\t" if fmt == "tsv" else ",", column or "0", header)
+
+
+def run_parse(args):
+    """
+    parse コマンド: 入力の住所列を解析し、結果の列を追加して出力する
+
+    入力は1行ずつ読み進め、処理中のレコードだけを保持するため、
+    入力の大きさに関係なくメモリ使用量は一定となる。読み込めないレコードは行番号とともに
+    報告して出力せず、処理を続ける。住所の列がないレコードと解析に失敗したレコードは
+    行番号とともに報告し、解析結果の列を空にして出力する。
+    """
+    fmt = args.format or detect_format(args.input)
+    records = make_records(fmt, args.column, header=not args.no_header)
+    postal_index = PostalIndex(args.postal_index) if args.postal_index else None
+    snapshot = Snapshot(args.snapshot) if args.snapshot else None
+    parser = AddressParser(cache_size=args.cache_size, postal_index=postal_index, snapshot=snapshot)
+    if args.prewarm:
+        if parser.cache is None:
+            raise ValueError("--prewarm を使用するには --cache-size を指定してください")
+        with open(args.prewarm, encoding=args.encoding) as f:
+            parser.prewarm(f)
+    failures = 0
+    invalid_records = 0
+
+    with open_input(args.input, args.encoding) as input_f, open_output(args.output, args.encoding) as output_f:
+        # parse_many が先読みした分のレコードを、(行番号, レコード, 住所の列があるか) として
+        # 結果と対応づけるまで保持する
+        pending = collections.deque()
+
+        def addresses():
+            nonlocal invalid_records
+            for line_number, record, address in records.read(input_f, output_f):
+                if isinstance(record, InvalidRecord):
+                    invalid_records += 1
+                    print(f"{record.line_number}行目を読み込めませんでした: {record.error}", file=sys.stderr)
+                    continue
+                pending.append((line_number, record, address is not None))
+                # 住所の列がないレコードは解析せず、順序を保つために空の住所を送る
+                yield address if address is not None else ""
+
+        results = parser.parse_many(
+            addresses(), workers=args.workers, chunksize=args.chunksize, use_threads=args.threads
+        )
+        for result in results:
+            line_number, record, has_address = pending.popleft()
+            if not has_address:
+                failures += 1
+                print(f"{line_number}行目に住所の列がありません: {records.column}", file=sys.stderr)
+                result = None
+            elif isinstance(result, ParseFailure):
+                failures += 1
+                print(f"{line_number}行目の解析に失敗しました: {result.error}", file=sys.stderr)
+                result = None
+            records.write(record, result)
+
+    if args.cache_stats and parser.cache is not None:
+        use_threads = args.threads if args.threads is not None else free_threading()
+        if args.workers != 1 and not use_threads:
+            # ワーカープロセスはそれぞれ複製したキャッシュを使用し、統計は呼び出し元に戻らない
+            print("キャッシュ: ワーカープロセスごとのキャッシュの統計は集計できません"
+                  "（--threads を指定すると、共有したキャッシュの統計を表示します）", file=sys.stderr)
+        else:
+            stats = parser.cache_stats()
+            print(f"キャッシュ: ヒット {stats.hits} / ミス {stats.misses} / 破棄 {stats.evictions} "
+                  f"(ヒット率 {stats.hit_rate:.1%})", file=sys.stderr)
+
+    return 1 if failures or invalid_records else 0
+
+
+def run_build_postal(args):
+    """
+    build-postal コマンド: KEN_ALL.CSV 形式のファイルから郵便番号テーブルを作成する
+    """
+    count = build_postal_table(args.source, args.output, encoding=args.encoding)
+    print(f"{count}件の郵便番号を {args.output} に書き出しました", file=sys.stderr)
+    return 0
+
+
+def run_build_towns(args):
+    """
+    build-towns コマンド: KEN_ALL.CSV 形式のファイルから町域テーブルを作成する
+    """
+    count = build_town_table(args.source, args.output, encoding=args.encoding)
+    print(f"{count}件の町域を {args.output} に書き出しました", file=sys.stderr)
+    return 0
+
+
+def run_build_snapshot(args):
+    """
+    build-snapshot コマンド: 辞書のスナップショットを作成する
+    """
+    sections = build_snapshot(args.output, municipalities_path=args.municipalities,
+                              postal_table=args.postal_table, town_table=args.town_table)
+    print(f"辞書のスナップショット（{', '.join(sections)}）を {args.output} に書き出しました", file=sys.stderr)
+    return 0
+
+
+def run_dedupe(args):
+    """
+    dedupe コマンド: 1行に1件の住所を正規化キーごとにまとめ、重複しているクラスターを出力する
+
+    出力は TSV（件数、最初に現れた行番号、都道府県、市区町村、正規化した町名番地、その他、最初に現れた住所）で、
+    件数の多い順に並べる。
+    """
+    postal_index = PostalIndex(args.postal_index) if args.postal_index else None
+    parser = AddressParser(postal_index=postal_index)
+    with open_input(args.input, args.encoding) as input_f:
+        addresses = (line.rstrip("\r\n") for line in input_f)
+        result = dedupe(addresses, parser=parser, workers=args.workers, chunksize=args.chunksize)
+
+    duplicates = result.duplicates(min_size=args.min_size)
+    with open_output(args.output, args.encoding) as output_f:
+        writer = csv.writer(output_f, delimiter="\t", lineterminator="\n")
+        writer.writerow(("size", "line") + FIELDS + ("address",))
+        for cluster in duplicates:
+            writer.writerow((cluster.size, cluster.index + 1) + tuple(cluster.key) + (cluster.address,))
+
+    for failure in result.failures:
+        print(f"{failure.index + 1}行目の解析に失敗しました: {failure.error}", file=sys.stderr)
+    sizes = {size: count for size, count in result.cluster_sizes().items() if size > 1}
+    print(f"{result.total}件を{len(result)}件のクラスターにまとめました"
+          f"（重複のあるクラスター {sum(sizes.values())}件、住所 {sum(s * c for s, c in sizes.items())}件）",
+          file=sys.stderr)
+    return 1 if result.failures else 0
+
+
+def run_aggregate(args):
+    """
+    aggregate コマンド: 1行に1件の住所を解析しながら、都道府県・市区町村・町域ごとの件数を数える
+
+    出力は TSV（集計の単位、順位、件数、割合、都道府県、市区町村、町域）で、集計の単位ごとに
+    件数の多い順に --top 件を出力し、最後に順位を total とした合計の行を出力する。
+    """
+    postal_index = PostalIndex(args.postal_index) if args.postal_index else None
+    town_index = TownIndex(args.town_table) if args.town_table else None
+    parser = AddressParser(postal_index=postal_index, town_index=town_index)
+    levels = tuple(args.level) if args.level else LEVELS
+    with open_input(args.input, args.encoding) as input_f:
+        addresses = (line.rstrip("\r\n") for line in input_f)
+        result = aggregate(addresses, parser=parser, levels=levels, workers=args.workers, chunksize=args.chunksize,
+                           use_threads=args.threads, max_keys=args.max_keys, directory=args.temp_dir)
+
+    with result, open_output(args.output, args.encoding) as output_f:
+        writer = csv.writer(output_f, delimiter="\t", lineterminator="\n")
+        writer.writerow(("level", "rank", "count", "share") + LEVELS)
+        for level in result.levels:
+            counter = result.counters[level]
+            for rank, (key, count) in enumerate(result.top(level, args.top), 1):
+                share = f"{count / counter.total:.4f}"
+                writer.writerow((level, rank, count, share) + key + ("",) * (len(LEVELS) - len(key)))
+            writer.writerow((level, "total", counter.total, "1.0000") + ("",) * len(LEVELS))
+        distinct = "、".join(f"{level} {len(result.counters[level])}種類" for level in result.levels)
+
+    for failure in result.failures:
+        print(f"{failure.index + 1}行目の解析に失敗しました: {failure.error}", file=sys.stderr)
+    print(f"{result.total}件を集計しました（解析に失敗 {len(result.failures)}件、{distinct}）", file=sys.stderr)
+    return 1 if result.failures else 0
+
+
+def run_serve(args):
+    """
+    serve コマンド: 住所を解析する HTTP サーバーを起動する
+    """
+    # asyncio の import には時間がかかるため、serve コマンドの場合のみ行う
+    from .server import serve
+
+    postal_index = PostalIndex(args.postal_index) if args.postal_index else None
+    snapshot = Snapshot(args.snapshot) if args.snapshot else None
+    parser = AddressParser(cache_size=args.cache_size, postal_index=postal_index, snapshot=snapshot)
+    # 指定しなかったオプションはサーバーの既定値とする
+    options = {
+        name: getattr(args, name)
+        for name in ("host", "port", "workers", "batch_size", "batch_delay", "idle_timeout")
+        if getattr(args, name) is not None
+    }
+    serve(parser, **options)
+    return 0
+
+
+def build_arg_parser():
+    """
+    コマンドライン引数のパーサーを作成する
+    """
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m address_parser",
+        description="日本語住所正規化ツール",
+    )
+    arg_parser.add_argument("--version", action="version", version=__version__)
+    commands = arg_parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    parse = commands.add_parser("parse", help="住所の列を解析して結果の列を追加する（既定のコマンド）")
+    parse.add_argument("input", nargs="?", default="-", help="入力ファイル（省略または - の場合は標準入力）")
+    parse.add_argument("-o", "--output", default="-", help="出力ファイル（省略または - の場合は標準出力）")
+    parse.add_argument("-f", "--format", choices=FORMATS, help="入出力形式（省略時は拡張子から判定、判定できない場合はcsv）")
+    parse.add_argument("-c", "--column", help="住所の列名または0始まりの列番号（JSON Linesの場合はキー、既定: 0 / address）")
+    parse.add_argument("--no-header", action="store_true", help="CSV・TSVの1行目をヘッダーとして扱わない")
+    parse.add_argument("--encoding", default="utf-8", help="入出力の文字コード（既定: utf-8）")
+    parse.add_argument("-w", "--workers", type=int, default=1, help="ワーカー数（既定: 1）")
+    parse.add_argument(
+        "--threads", action="store_true", default=None,
+        help="ワーカープロセスではなく、パーサーを共有するスレッドで解析する（GIL が無効なビルドでは既定）",
+    )
+    parse.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="1つのワーカーに一度に送る件数")
+    parse.add_argument("--cache-size", type=int, help="解析結果をキャッシュする件数の上限（既定: キャッシュしない）")
+    parse.add_argument("--prewarm", help="あらかじめキャッシュに登録する住所のファイル（1行に1件）")
+    parse.add_argument("--cache-stats", action="store_true", help="終了時にキャッシュの統計を標準エラー出力に表示する（ワーカープロセスで解析する場合は表示しない）")
+    parse.add_argument("--postal-index", help="build-postal で作成した郵便番号テーブル（郵便番号から都道府県・市区町村を照合する）")
+    parse.add_argument("--snapshot", help="build-snapshot で作成した辞書のスナップショット")
+    parse.set_defaults(handler=run_parse)
+
+    build_postal = commands.add_parser("build-postal", help="KEN_ALL.CSV 形式のファイルから郵便番号テーブルを作成する")
+    build_postal.add_argument("source", help="KEN_ALL.CSV 形式のファイル")
+    build_postal.add_argument("-o", "--output", required=True, help="作成する郵便番号テーブルのパス")
+    build_postal.add_argument("--encoding", default="cp932", help="入力の文字コード（既定: cp932）")
+    build_postal.set_defaults(handler=run_build_postal)
+
+    build_towns = commands.add_parser("build-towns", help="KEN_ALL.CSV 形式のファイルから町域テーブルを作成する")
+    build_towns.add_argument("source", help="KEN_ALL.CSV 形式のファイル")
+    build_towns.add_argument("-o", "--output", required=True, help="作成する町域テーブルのパス")
+    build_towns.add_argument("--encoding", default="cp932", help="入力の文字コード（既定: cp932）")
+    build_towns.set_defaults(handler=run_build_towns)
+
+    build_snapshot_command = commands.add_parser("build-snapshot", help="辞書のスナップショットを作成する")
+    build_snapshot_command.add_argument("-o", "--output", required=True, help="作成するスナップショットのパス")
+    build_snapshot_command.add_argument("--municipalities", default=MUNICIPALITIES_PATH, help="市区町村辞書（既定: 同梱の辞書）")
+    build_snapshot_command.add_argument("--postal-table", help="埋め込む郵便番号テーブル（build-postal で作成したもの）")
+    build_snapshot_command.add_argument("--town-table", help="埋め込む町域テーブル（build-towns で作成したもの）")
+    build_snapshot_command.set_defaults(handler=run_build_snapshot)
+
+    dedupe_command = commands.add_parser("dedupe", help="1行に1件の住所を正規化キーごとにまとめ、重複を出力する")
+    dedupe_command.add_argument("input", nargs="?", default="-", help="入力ファイル（省略または - の場合は標準入力）")
+    dedupe_command.add_argument("-o", "--output", default="-", help="出力ファイル（省略または - の場合は標準出力）")
+    dedupe_command.add_argument("--encoding", default="utf-8", help="入出力の文字コード（既定: utf-8）")
+    dedupe_command.add_argument("--min-size", type=int, default=2, help="出力するクラスターの最小の件数（既定: 2）")
+    dedupe_command.add_argument("-w", "--workers", type=int, default=1, help="ワーカープロセス数（既定: 1）")
+    dedupe_command.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="1つのワーカーに一度に送る件数")
+    dedupe_command.add_argument("--postal-index", help="build-postal で作成した郵便番号テーブル")
+    dedupe_command.set_defaults(handler=run_dedupe)
+
+    aggregate_command = commands.add_parser("aggregate", help="1行に1件の住所を都道府県・市区町村・町域ごとに集計する")
+    aggregate_command.add_argument("input", nargs="?", default="-", help="入力ファイル（省略または - の場合は標準入力）")
+    aggregate_command.add_argument("-o", "--output", default="-", help="出力ファイル（省略または - の場合は標準出力）")
+    aggregate_command.add_argument("--encoding", default="utf-8", help="入出力の文字コード（既定: utf-8）")
+    aggregate_command.add_argument(
+        "--level", choices=LEVELS, action="append", help="集計の単位（複数指定可、既定: すべて）"
+    )
+    aggregate_command.add_argument("--top", type=int, default=20, help="集計の単位ごとに出力する件数（既定: 20）")
+    aggregate_command.add_argument(
+        "--max-keys", type=int, default=DEFAULT_MAX_KEYS,
+        help=f"メモリに保持するキーの種類数の上限。超えた分は一時ファイルに書き出す（既定: {DEFAULT_MAX_KEYS}）",
+    )
+    aggregate_command.add_argument("--temp-dir", help="一時ファイルを作成するディレクトリ")
+    aggregate_command.add_argument("-w", "--workers", type=int, default=1, help="ワーカー数（既定: 1）")
+    aggregate_command.add_argument("--threads", action="store_true", default=None, help="スレッドで解析する")
+    aggregate_command.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="1つのワーカーに一度に送る件数")
+    aggregate_command.add_argument("--postal-index", help="build-postal で作成した郵便番号テーブル")
+    aggregate_command.add_argument("--town-table", help="build-towns で作成した町域テーブル（町域名の照合に使用する）")
+    aggregate_command.set_defaults(handler=run_aggregate)
+
+    serve_command = commands.add_parser("serve", help="住所を解析する HTTP サーバーを起動する")
+    serve_command.add_argument("--host", help="待ち受けるアドレス（既定: 127.0.0.1）")
+    serve_command.add_argument("--port", type=int, help="待ち受けるポート（既定: 8080、0の場合は空いているポート）")
+    serve_command.add_argument("-w", "--workers", type=int, help="解析するスレッドの数（既定: 1）")
+    serve_command.add_argument("--batch-size", type=int, help="1つのバッチにまとめる要求の最大件数（既定: 64）")
+    serve_command.add_argument("--batch-delay", type=float, help="バッチに要求が集まるのを待つ秒数（既定: 0）")
+    serve_command.add_argument("--idle-timeout", type=float, help="keep-alive の接続で次の要求を待つ秒数（既定: 30）")
+    serve_command.add_argument("--cache-size", type=int, default=100000, help="解析結果をキャッシュする件数の上限（既定: 100000）")
+    serve_command.add_argument("--postal-index", help="build-postal で作成した郵便番号テーブル")
+    serve_command.add_argument("--snapshot", help="build-snapshot で作成した辞書のスナップショット")
+    serve_command.set_defaults(handler=run_serve)
+
+    return arg_parser
+
+
+def main(argv=None):
+    """
+    メイン関数
+
+    Args:
+        argv (list): コマンドライン引数（None の場合は sys.argv[1:]）
+
+    Returns:
+        int: 終了コード
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    # コマンドが省略された場合は parse とみなす
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help", "--version")):
+        argv = ["parse"] + list(argv)
+
+    args = build_arg_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,217 @@
+"""
+解析結果を列指向（struct-of-arrays）形式で保持するためのモジュール
+
+都道府県と市区町村は共通の文字列表への整数コードとして辞書符号化し、
+array.array に格納する。array はバッファプロトコルに対応しているため、
+NumPy では numpy.frombuffer(batch.prefecture_codes, dtype=numpy.uint32) のように
+コピーせずに参照できる。
+"""
+import collections
+from array import array
+
+from .batch import DEFAULT_CHUNKSIZE, ParseFailure
+
+
+# 解析結果のキー
+FIELDS = ("prefecture", "city", "town_street", "other")
+
+# 符号化したコードを格納する array の型コード（符号なし32ビット整数）
+CODE_TYPECODE = "I"
+
+
+class StringTable:
+    """
+    文字列と整数コードの対応表
+
+    コード0は常に空文字列を表す。複数のバッチで共有できる。
+    """
+
+    def __init__(self, strings=()):
+        """
+        StringTableクラスの初期化
+
+        Args:
+            strings (iterable): あらかじめ登録する文字列（空文字列以外はこの順にコード1以降を割り当てる）
+        """
+        self.strings = [""]
+        self.codes = {"": 0}
+        for string in strings:
+            self.encode(string)
+
+    def __len__(self):
+        return len(self.strings)
+
+    def encode(self, string):
+        """
+        文字列をコードに変換する（未登録の場合は新しいコードを割り当てる）
+
+        Args:
+            string (str): 文字列
+
+        Returns:
+            int: コード
+        """
+        code = self.codes.get(string)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(string)
+            self.codes[string] = code
+        return code
+
+    def decode(self, code):
+        """
+        コードを文字列に変換する
+
+        Args:
+            code (int): コード
+
+        Returns:
+            str: 文字列
+        """
+        return self.strings[code]
+
+
+class ColumnarBatch:
+    """
+    解析結果を列ごとに保持するバッチ
+
+    Attributes:
+        strings (StringTable): 都道府県・市区町村で共有する文字列表
+        prefecture_codes (array): 都道府県のコード
+        city_codes (array): 市区町村のコード
+        town_street (list): 町名番地
+        other (list): 建物名・部屋番号など
+        failures (list): 解析に失敗したレコード（該当行はすべて空文字列となる）
+    """
+
+    def __init__(self, strings=None):
+        """
+        ColumnarBatchクラスの初期化
+
+        Args:
+            strings (StringTable): 共有する文字列表（None の場合は新しく作成する）
+        """
+        self.strings = strings if strings is not None else StringTable()
+        self.prefecture_codes = array(CODE_TYPECODE)
+        self.city_codes = array(CODE_TYPECODE)
+        self.town_street = []
+        self.other = []
+        self.failures = []
+
+    def __len__(self):
+        return len(self.town_street)
+
+    def __getitem__(self, index):
+        return {
+            "prefecture": self.strings.decode(self.prefecture_codes[index]),
+            "city": self.strings.decode(self.city_codes[index]),
+            "town_street": self.town_street[index],
+            "other": self.other[index],
+        }
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, result):
+        """
+        解析結果を1件追加する
+
+        Args:
+            result (ParsedAddress or dict): 解析された住所の構造化データ
+        """
+        self.prefecture_codes.append(self.strings.encode(result["prefecture"]))
+        self.city_codes.append(self.strings.encode(result["city"]))
+        self.town_street.append(result["town_street"])
+        self.other.append(result["other"])
+
+    def column(self, name):
+        """
+        列の値を文字列のリストとして返す
+
+        Args:
+            name (str): 列名（prefecture, city, town_street, other）
+
+        Returns:
+            list: 列の値
+        """
+        if name == "prefecture":
+            return [self.strings.decode(code) for code in self.prefecture_codes]
+        if name == "city":
+            return [self.strings.decode(code) for code in self.city_codes]
+        if name in ("town_street", "other"):
+            return list(getattr(self, name))
+        raise KeyError(name)
+
+    def value_counts(self, name):
+        """
+        都道府県または市区町村ごとの件数を数える（文字列を復元せずにコードで集計する）
+
+        Args:
+            name (str): 列名（prefecture または city）
+
+        Returns:
+            collections.Counter: 値ごとの件数
+        """
+        if name == "prefecture":
+            codes = self.prefecture_codes
+        elif name == "city":
+            codes = self.city_codes
+        else:
+            raise KeyError(name)
+        return collections.Counter({
+            self.strings.decode(code): count for code, count in collections.Counter(codes).items()
+        })
+
+    def to_dicts(self):
+        """
+        従来の辞書形式のリストに変換する
+
+        Returns:
+            list: 解析された住所の構造化データのリスト
+        """
+        return list(self)
+
+    @classmethod
+    def from_dicts(cls, results, strings=None):
+        """
+        辞書形式の解析結果からバッチを作成する
+
+        Args:
+            results (iterable): 解析された住所の構造化データのイテラブル
+            strings (StringTable): 共有する文字列表
+
+        Returns:
+            ColumnarBatch: 作成したバッチ
+        """
+        batch = cls(strings)
+        for result in results:
+            batch.append(result)
+        return batch
+
+
+# 解析に失敗した行に格納する空の結果
+_EMPTY_RESULT = dict.fromkeys(FIELDS, "")
+
+
+def parse_columnar(parser, addresses, strings=None, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    複数の住所を解析し、列指向のバッチとして返す
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+        addresses (iterable): 住所文字列のイテラブル
+        strings (StringTable): 共有する文字列表（None の場合は新しく作成する）
+        workers (int): ワーカープロセス数
+        chunksize (int): 1つのワーカーに一度に送る住所の件数
+
+    Returns:
+        ColumnarBatch: 解析結果のバッチ
+    """
+    batch = ColumnarBatch(strings)
+    for result in parser.parse_many(addresses, workers=workers, chunksize=chunksize):
+        if isinstance(result, ParseFailure):
+            batch.failures.append(result)
+            result = _EMPTY_RESULT
+        batch.append(result)
+    return batch
@@ -0,0 +1,270 @@
+"""
+住所の正規化キーと、正規化キーによる重複の集約のモジュール
+
+canonical_key は解析結果から比較用のキーを作成する。番地の漢数字は数字に、「1丁目2番3号」は
+「1-2-3」に統一し、空白は除く。dedupe は住所のイテラブルを1回だけ読み進め、同じキーの住所を
+クラスターにまとめる。クラスターは都道府県・市区町村ごとのブロックに分けて保持するため、
+1つのハッシュ表が大きくなりすぎることはない。
+
+使用例:
+    result = dedupe(open("customers.txt", encoding="utf-8"), workers=4)
+    for cluster in result.duplicates():
+        print(cluster.size, cluster.address)
+"""
+import collections
+from types import MappingProxyType
+
+from . import patterns
+from .batch import DEFAULT_CHUNKSIZE, ParseFailure
+from .parser import AddressParser
+
+
+# 漢数字の値
+KANJI_DIGITS = MappingProxyType({
+    "〇": 0, "一": 1, "二": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9
+})
+KANJI_UNITS = MappingProxyType({"十": 10, "百": 100, "千": 1000})
+
+
+class AddressKey(collections.namedtuple("AddressKey", ["prefecture", "city", "town_street", "other"])):
+    """
+    住所の正規化キー（ハッシュ可能）
+
+    Attributes:
+        prefecture (str): 都道府県名
+        city (str): 市区町村名
+        town_street (str): 正規化した町名番地（例: 西新宿1-2-3）
+        other (str): 空白を除いた建物名・部屋番号など
+    """
+
+    __slots__ = ()
+
+    @property
+    def block(self):
+        """
+        ブロック（都道府県名, 市区町村名）
+        """
+        return self.prefecture, self.city
+
+
+def kanji_to_number(text):
+    """
+    漢数字（数字との混在を含む）を整数に変換する
+
+    「二十三」「十2」（漢数字の一部だけが数字に変換された表記）「二〇三」などに対応する。
+
+    Args:
+        text (str): 漢数字と数字からなる文字列
+
+    Returns:
+        int: 変換した値
+    """
+    total = 0
+    current = 0
+    for char in text:
+        unit = KANJI_UNITS.get(char)
+        if unit is not None:
+            total += (current or 1) * unit
+            current = 0
+        elif char in KANJI_DIGITS:
+            current = current * 10 + KANJI_DIGITS[char]
+        else:
+            current = current * 10 + int(char)
+    return total + current
+
+
+def canonical_town_street(town_street, town=None):
+    """
+    町名番地を比較用に正規化する
+
+    漢数字の変換と番地の区切りの統一は町域名の後ろの番地にのみ行う（例: 一番町、麻布十番の
+    漢数字は変換しない）。
+
+    Args:
+        town_street (str): 町名番地（例: 西新宿一丁目2番3号）
+        town (str): 町名番地の先頭の町域名（None の場合は最初の数字、または漢数字の丁目の前までとする）
+
+    Returns:
+        str: 正規化した町名番地（例: 西新宿1-2-3）
+    """
+    if town is None:
+        town, block = patterns.TOWN_BLOCK.match(town_street).groups()
+        block = block or ""
+        if block[:1].isdigit():
+            # 一部だけ数字に変換された漢数字（例: 二十3番地）は番地に含める
+            numeral = patterns.TRAILING_KANJI_NUMERAL.search(town)
+            if numeral:
+                town, block = town[:numeral.start()], numeral.group() + block
+    else:
+        block = town_street[len(town):]
+    block = patterns.WHITESPACE.sub("", block)
+    block = patterns.KANJI_NUMERAL.sub(lambda match: str(kanji_to_number(match.group())), block)
+    block = patterns.BLOCK_SEPARATOR.sub(lambda match: match.group(1) + ("-" if match.group(2) else ""), block)
+    return patterns.WHITESPACE.sub("", town) + block
+
+
+def canonical_key(parsed, parser=None):
+    """
+    解析結果から比較用の正規化キーを作成する
+
+    Args:
+        parsed (Mapping): 解析結果（ParsedAddress または同じキーを持つ辞書）
+        parser (AddressParser): 町域名と番地を分ける際に町域の辞書（town_index）を使用するパーサー
+            （None または町域の辞書を使用しないパーサーの場合は、最初の数字の前までを町域名とする）
+
+    Returns:
+        AddressKey: 正規化キー
+    """
+    town = None
+    if parser is not None and parser.town_index is not None:
+        town = parser.town_index.split_town_street(parsed["town_street"], parsed["prefecture"], parsed["city"]).town
+    return AddressKey(
+        parsed["prefecture"],
+        parsed["city"],
+        canonical_town_street(parsed["town_street"], town),
+        patterns.WHITESPACE.sub("", parsed["other"]),
+    )
+
+
+class Cluster:
+    """
+    同じ正規化キーを持つ住所のクラスター
+
+    Attributes:
+        key (AddressKey): 正規化キー
+        index (int): 最初に現れた住所の入力中の位置（0始まり）
+        address (str): 最初に現れた住所
+        size (int): 住所の件数
+        members (list): 住所の入力中の位置のリスト（keep_members を指定しない場合は None）
+    """
+
+    __slots__ = ("key", "index", "address", "size", "members")
+
+    def __init__(self, key, index, address, keep_members=False):
+        self.key = key
+        self.index = index
+        self.address = address
+        self.size = 1
+        self.members = [index] if keep_members else None
+
+    def __repr__(self):
+        return f"Cluster(key={self.key!r}, index={self.index}, address={self.address!r}, size={self.size})"
+
+
+class DedupeResult:
+    """
+    重複の集約結果
+
+    Attributes:
+        blocks (dict): {(都道府県名, 市区町村名): {(町名番地, その他): Cluster}}
+        total (int): 入力の件数
+        failures (list): 解析に失敗したレコード（ParseFailure）のリスト
+    """
+
+    def __init__(self):
+        self.blocks = {}
+        self.total = 0
+        self.failures = []
+
+    def __len__(self):
+        return sum(len(clusters) for clusters in self.blocks.values())
+
+    def add(self, index, address, parsed, keep_members=False, parser=None):
+        """
+        解析結果を該当するクラスターに加える
+
+        Args:
+            index (int): 入力中の位置
+            address (str): 住所
+            parsed (ParsedAddress): 解析結果
+            keep_members (bool): クラスターに全件の位置を保持するかどうか
+            parser (AddressParser): 正規化キーの作成に使用するパーサー（canonical_key を参照）
+
+        Returns:
+            Cluster: 加えたクラスター
+        """
+        key = canonical_key(parsed, parser)
+        clusters = self.blocks.get(key.block)
+        if clusters is None:
+            clusters = self.blocks[key.block] = {}
+        cluster = clusters.get(key[2:])
+        if cluster is None:
+            cluster = clusters[key[2:]] = Cluster(key, index, address, keep_members)
+        else:
+            cluster.size += 1
+            if cluster.members is not None:
+                cluster.members.append(index)
+        return cluster
+
+    def clusters(self):
+        """
+        すべてのクラスターを返す（ブロックごと、ブロックの中では最初に現れた順）
+        """
+        for clusters in self.blocks.values():
+            yield from clusters.values()
+
+    def duplicates(self, min_size=2):
+        """
+        件数が min_size 以上のクラスターを件数の多い順に返す
+        """
+        return sorted(
+            (cluster for cluster in self.clusters() if cluster.size >= min_size),
+            key=lambda cluster: (-cluster.size, cluster.index),
+        )
+
+    def cluster_sizes(self):
+        """
+        クラスターの件数ごとのクラスター数を返す
+
+        Returns:
+            Counter: {件数: クラスター数}
+        """
+        return collections.Counter(cluster.size for cluster in self.clusters())
+
+    def block_sizes(self):
+        """
+        ブロックごとのクラスター数を返す
+
+        Returns:
+            Counter: {(都道府県名, 市区町村名): クラスター数}
+        """
+        return collections.Counter({block: len(clusters) for block, clusters in self.blocks.items()})
+
+
+def dedupe(addresses, parser=None, workers=1, chunksize=DEFAULT_CHUNKSIZE, keep_members=False):
+    """
+    住所を正規化キーごとのクラスターにまとめる
+
+    入力は1回だけ先頭から読み進め、クラスターごとに最初の住所と件数のみを保持する。
+
+    Args:
+        addresses (iterable): 住所文字列のイテラブル
+        parser (AddressParser): 解析に使用するパーサー（None の場合は既定のパーサー。町域の辞書を
+            使用するパーサーの場合は、正規化キーの町域名と番地を辞書の町域名で分ける）
+        workers (int): ワーカープロセス数（1の場合は同じプロセスで解析、None の場合はCPU数）
+        chunksize (int): 1つのワーカーに一度に送る住所の件数
+        keep_members (bool): クラスターに全件の入力中の位置を保持するかどうか
+
+    Returns:
+        DedupeResult: 集約結果
+    """
+    if parser is None:
+        parser = AddressParser()
+
+    result = DedupeResult()
+    # parse_many が先読みした分の住所を、結果と対応づけるまで保持する
+    pending = collections.deque()
+
+    def tee():
+        for address in addresses:
+            pending.append(address)
+            yield address
+
+    for index, parsed in enumerate(parser.parse_many(tee(), workers=workers, chunksize=chunksize)):
+        address = pending.popleft()
+        result.total += 1
+        if isinstance(parsed, ParseFailure):
+            result.failures.append(parsed)
+            continue
+        result.add(index, address, parsed, keep_members, parser)
+    return result
@@ -0,0 +1,191 @@
+"""
+市区町村名のあいまい検索を行うモジュール
+
+市区町村辞書に完全一致しなかった場合の代替手段として、異体字（檜/桧、﨑/崎 など）を同一視した
+照合と、文字の2-gramの転置インデックスで候補を絞り込んだうえで編集距離に上限を設けた照合を行う。
+1回の検索にかける時間には上限（予算）があり、予算を使い切った場合はそれまでの最良の候補を返す。
+"""
+import collections
+import threading
+import time
+from types import MappingProxyType
+
+from .municipality import load_municipalities, municipality_keys
+from .normalizer import Normalizer
+
+
+# 照合の際に同一視する異体字（異体字 -> 代表字。\ufa10 は互換漢字の塚で、見た目が同じためエスケープで記す）
+ITAIJI = MappingProxyType({
+    "﨑": "崎", "嵜": "崎", "碕": "崎", "檜": "桧", "髙": "高", "德": "徳",
+    "邊": "辺", "邉": "辺", "澤": "沢", "濱": "浜", "嶋": "島", "嶌": "島",
+    "槇": "槙", "龍": "竜", "國": "国", "舘": "館", "眞": "真", "冨": "富",
+    "\ufa10": "塚", "條": "条", "齋": "斉", "齊": "斉", "斎": "斉", "廣": "広",
+    "櫻": "桜", "關": "関", "驒": "騨", "ヶ": "ケ", "ヵ": "カ",
+})
+
+# 異体字を代表字に置き換えるノーマライザー
+ITAIJI_FOLDING = Normalizer(ITAIJI)
+
+# 市区町村名の末尾の文字（検索する範囲の終端の候補）
+CITY_SUFFIX_CHARS = "市区町村"
+
+
+class FuzzyMatch(collections.namedtuple("FuzzyMatch", ["city", "end", "distance", "score"])):
+    """
+    あいまい検索の結果
+
+    Attributes:
+        city (str): 辞書上の市区町村名（郡名を省略した表記に一致した場合は省略した表記）
+        end (int): 住所文字列中の一致した範囲の終了位置
+        distance (int): 異体字を同一視したうえでの編集距離
+        score (float): 一致の度合い（1 - 編集距離 / 長い方の文字数。1.0 が完全一致）
+    """
+
+    __slots__ = ()
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """
+    上限付きで2つの文字列の編集距離を求める
+
+    Args:
+        a (str): 文字列
+        b (str): 文字列
+        max_distance (int): 編集距離の上限
+
+    Returns:
+        int: 編集距離（上限を超える場合は max_distance + 1）
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        # この行の最小値が上限を超えた時点で打ち切る
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return min(previous[-1], max_distance + 1)
+
+
+def bigrams(text):
+    """
+    文字の2-gramを重複なく列挙する
+    """
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class FuzzyCityMatcher:
+    """
+    市区町村名のあいまい検索を行うクラス
+
+    住所文字列の先頭から「市」「区」「町」「村」で終わる範囲を候補として、
+    1. 異体字を同一視した完全一致
+    2. 2-gramを共有する市区町村名のうち、編集距離が上限以下で一致の度合いが最も高いもの
+    の順に検索する。
+
+    作成後に変更するのは打ち切った回数（ロックで保護）のみで、複数のスレッドから共有できる。
+    """
+
+    def __init__(self, municipalities=None, max_distance=2, min_score=0.75, budget_us=1000):
+        """
+        FuzzyCityMatcherクラスの初期化
+
+        Args:
+            municipalities (list): (都道府県名, 市区町村名) のリスト（None の場合は同梱の辞書）
+            max_distance (int): 許容する編集距離の上限
+            min_score (float): 採用する一致の度合いの下限
+            budget_us (int): 1回の検索で編集距離の計算にかける時間の上限（マイクロ秒）
+        """
+        if municipalities is None:
+            municipalities = load_municipalities()
+        self.max_distance = max_distance
+        self.min_score = min_score
+        self.budget_ns = budget_us * 1000
+        # 予算を使い切って検索を打ち切った回数
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+        # 異体字を同一視した検索キーと、(都道府県名, 表示する市区町村名) の対応
+        self._keys = []
+        self._exact = {}
+        # 2-gram の転置インデックス（全国共通と、都道府県ごと）
+        self._grams = {}
+        self._prefecture_grams = {}
+        for prefecture, name in municipalities:
+            for key in municipality_keys(name):
+                key_id = len(self._keys)
+                folded = ITAIJI_FOLDING.normalize(key)
+                self._keys.append((folded, prefecture, key))
+                self._exact.setdefault(folded, []).append(key_id)
+                for gram in bigrams(folded):
+                    self._grams.setdefault(gram, []).append(key_id)
+                    self._prefecture_grams.setdefault((prefecture, gram), []).append(key_id)
+        self.max_span = max(len(folded) for folded, _, _ in self._keys) + max_distance
+
+    def match(self, text, prefecture=""):
+        """
+        text の先頭にある市区町村名をあいまい検索する
+
+        Args:
+            text (str): 都道府県名を除いた住所文字列
+            prefecture (str): 都道府県名（空文字列の場合は全国から検索）
+
+        Returns:
+            FuzzyMatch: 最も一致の度合いが高い候補（見つからない場合は None）
+        """
+        folded = ITAIJI_FOLDING.normalize(text[:self.max_span])
+        ends = [end for end in range(2, len(folded) + 1) if folded[end - 1] in CITY_SUFFIX_CHARS]
+
+        # 異体字を同一視した完全一致（長い範囲を優先）
+        for end in reversed(ends):
+            for key_id in self._exact.get(folded[:end], ()):
+                _, key_prefecture, key = self._keys[key_id]
+                if not prefecture or key_prefecture == prefecture:
+                    return FuzzyMatch(key, end, 0, 1.0)
+
+        deadline = time.perf_counter_ns() + self.budget_ns
+        best = None
+        for end in ends:
+            span = folded[:end]
+            # 共有する2-gramの数を数え、編集距離の下限から明らかに遠い候補を除く
+            shared = collections.Counter()
+            for gram in bigrams(span):
+                if prefecture:
+                    shared.update(self._prefecture_grams.get((prefecture, gram), ()))
+                else:
+                    shared.update(self._grams.get(gram, ()))
+            for key_id, count in shared.items():
+                folded_key, _, key = self._keys[key_id]
+                length = max(len(span), len(folded_key))
+                limit = min(self.max_distance, int((1 - self.min_score) * length + 1e-9))
+                # 1文字の編集で失われる2-gramは高々2つ
+                if limit == 0 or count < length - 1 - 2 * limit:
+                    continue
+                if time.perf_counter_ns() >= deadline:
+                    with self._lock:
+                        self.timeouts += 1
+                    return best
+                distance = bounded_levenshtein(span, folded_key, limit)
+                if distance > limit:
+                    continue
+                score = 1 - distance / length
+                if best is None or (score, end) > (best.score, best.end):
+                    best = FuzzyMatch(key, end, distance, score)
+        return best
+
+    def __getstate__(self):
+        # ロックは pickle できないため除外し、復元時に作り直す
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,313 @@
+"""
+解析の段階ごとの所要時間と結果の内訳を計測するためのモジュール
+
+AddressParser(instrumentation=ParserStats()) のように指定した場合のみ、パーサーの
+各段階のメソッドを計時用のラッパーに差し替える。指定しない場合は何も差し替えないため、
+解析のオーバーヘッドはない。
+"""
+import collections
+import functools
+import threading
+import time
+
+
+# 計測する段階
+STAGES = ("normalize", "prefecture", "city", "town_street", "other", "final_normalize")
+
+# 段階と、計時用のラッパーに差し替えるパーサーのメソッド名
+STAGE_METHODS = (
+    ("normalize", "_normalize_input"),
+    ("prefecture", "extract_prefecture"),
+    ("city", "extract_city_span"),
+    ("town_street", "extract_town_street"),
+    ("other", "extract_other"),
+    ("final_normalize", "_normalize_fields"),
+)
+
+# 計時せず、結果の種類を数えるためだけにラッパーに差し替えるパーサーのメソッド名
+OUTCOME_METHODS = ("match_postal_city",)
+
+# instrument で差し替えるすべてのメソッド名
+WRAPPED_METHODS = tuple(name for _, name in STAGE_METHODS) + OUTCOME_METHODS
+
+# 数える結果の種類
+OUTCOMES = (
+    "parsed",            # 解析した住所
+    "fast_path",         # 正規化が不要な文字のみで、変換せずに解析した住所
+    "slow_path",         # 全角文字などを含み、変換してから解析した住所
+    "no_prefecture",     # 都道府県名が見つからなかった
+    "prefecture_alias",  # 都道府県の省略形を使用した
+    "designated_ward",   # 政令指定都市の区に一致した
+    "postal_city",       # 郵便番号の候補の市区町村に一致した（市区町村の抽出は行わない）
+    "fuzzy_city",        # 市区町村辞書に完全一致せず、あいまい検索で一致した
+    "city_fallback",     # 市区町村辞書になく、接尾辞から推定した
+    "gun_fallback",      # 市区町村辞書になく、郡を含む町村のパターンで推定した
+    "no_city",           # 市区町村が見つからなかった
+)
+
+
+class Instrumentation:
+    """
+    計測のコールバックを受け取るクラスの基底クラス
+
+    サブクラスで on_stage / on_outcome を上書きし、任意の監視基盤へ送ることができる。
+    コールバックは解析を行うスレッドから呼び出される。
+    """
+
+    def on_stage(self, stage, elapsed_ns):
+        """
+        段階の処理が終わったときに呼び出される
+
+        Args:
+            stage (str): 段階名（STAGES のいずれか）
+            elapsed_ns (int): 所要時間（ナノ秒）
+        """
+
+    def on_outcome(self, outcome):
+        """
+        結果の種類が確定したときに呼び出される
+
+        Args:
+            outcome (str): 結果の種類（OUTCOMES のいずれか）
+        """
+
+
+class Histogram:
+    """
+    2のべき乗ごとの区間で所要時間を数えるヒストグラム
+
+    区間 i には 2**(i + MIN_EXPONENT - 1) 以上 2**(i + MIN_EXPONENT) 未満のナノ秒を数える
+    （区間0はそれ未満すべて、最後の区間はそれ以上すべて）。
+    """
+
+    # 最初の区間の上限（2**6 = 64ナノ秒）
+    MIN_EXPONENT = 6
+
+    # 区間の数（最後の区間の下限は 2**26 ナノ秒 = 約67ミリ秒）
+    BUCKETS = 22
+
+    def __init__(self):
+        """
+        Histogramクラスの初期化
+        """
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, elapsed_ns):
+        """
+        所要時間を1件記録する
+
+        Args:
+            elapsed_ns (int): 所要時間（ナノ秒）
+        """
+        bucket = min(self.BUCKETS - 1, max(0, elapsed_ns.bit_length() - self.MIN_EXPONENT))
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def upper_bound_ns(self, bucket):
+        """
+        区間の上限（ナノ秒）を返す
+        """
+        return 2 ** (bucket + self.MIN_EXPONENT)
+
+    def percentile_ns(self, fraction):
+        """
+        百分位数の近似値（その値を含む区間の上限、ただし最大値を超えない）を返す
+
+        Args:
+            fraction (float): 0から1の割合（0.99 の場合は p99）
+
+        Returns:
+            int: 所要時間（ナノ秒）。記録がない場合は0
+        """
+        if not self.count:
+            return 0
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self.upper_bound_ns(bucket), self.max_ns)
+        return self.max_ns
+
+    def snapshot(self):
+        """
+        集計結果を辞書で返す
+        """
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile_ns(0.50) / 1000,
+            "p99_us": self.percentile_ns(0.99) / 1000,
+            "max_us": self.max_ns / 1000,
+            "buckets": {self.upper_bound_ns(bucket): count for bucket, count in enumerate(self.counts) if count},
+        }
+
+
+class ParserStats(Instrumentation):
+    """
+    段階ごとの所要時間のヒストグラムと、結果の種類ごとの件数を集計するクラス
+
+    複数のスレッドから共有できる。
+    """
+
+    def __init__(self):
+        """
+        ParserStatsクラスの初期化
+        """
+        self._lock = threading.Lock()
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.counters = collections.Counter()
+
+    def on_stage(self, stage, elapsed_ns):
+        with self._lock:
+            self.histograms[stage].record(elapsed_ns)
+
+    def on_outcome(self, outcome):
+        with self._lock:
+            self.counters[outcome] += 1
+
+    def reset(self):
+        """
+        集計結果を消去する
+        """
+        with self._lock:
+            self.histograms = {stage: Histogram() for stage in STAGES}
+            self.counters = collections.Counter()
+
+    def snapshot(self):
+        """
+        集計結果を辞書で返す
+
+        Returns:
+            dict: {"stages": {段階名: ヒストグラムの集計}, "counters": {結果の種類: 件数}}
+        """
+        with self._lock:
+            return {
+                "stages": {stage: histogram.snapshot() for stage, histogram in self.histograms.items()},
+                "counters": {outcome: self.counters[outcome] for outcome in OUTCOMES},
+            }
+
+    def __getstate__(self):
+        # ロックは pickle できないため、集計結果のみを受け渡す
+        with self._lock:
+            return {"histograms": self.histograms, "counters": self.counters}
+
+    def __setstate__(self, state):
+        self._lock = threading.Lock()
+        self.histograms = state["histograms"]
+        self.counters = state["counters"]
+
+
+def _timed(method, stage, instrumentation):
+    """
+    メソッドの所要時間を計測するラッパーを作成する
+    """
+    clock = time.perf_counter_ns
+    on_stage = instrumentation.on_stage
+
+    @functools.wraps(method)
+    def wrapper(*args):
+        start = clock()
+        try:
+            return method(*args)
+        finally:
+            on_stage(stage, clock() - start)
+    return wrapper
+
+
+def instrument(parser, instrumentation):
+    """
+    パーサーの各段階のメソッドを計時用のラッパーに差し替える
+
+    差し替えはインスタンス属性として行うため、同じクラスの他のインスタンスには影響しない。
+    結果の種類の判定は計時の外側で行い、判定のための処理は段階の所要時間に含めない。
+
+    Args:
+        parser (AddressParser): 計測するパーサー
+        instrumentation (Instrumentation): コールバックを受け取るオブジェクト
+    """
+    for stage, name in STAGE_METHODS:
+        method = _timed(getattr(parser, name), stage, instrumentation)
+        if stage == "prefecture":
+            method = _with_prefecture_outcomes(method, instrumentation)
+        elif stage == "city":
+            method = _with_city_outcomes(method, parser, instrumentation)
+        elif stage == "normalize":
+            method = _with_parsed_outcome(method, instrumentation)
+        parser.__dict__[name] = method
+    parser.__dict__["match_postal_city"] = _with_postal_outcome(parser.match_postal_city, instrumentation)
+
+
+def uninstrument(parser):
+    """
+    instrument で差し替えたメソッドを元に戻す
+    """
+    for name in WRAPPED_METHODS:
+        parser.__dict__.pop(name, None)
+
+
+def _with_parsed_outcome(method, instrumentation):
+    on_outcome = instrumentation.on_outcome
+
+    @functools.wraps(method)
+    def wrapper(address_string):
+        on_outcome("parsed")
+        normalized = method(address_string)
+        # 正規化済みの入力はノーマライザーがそのまま返す
+        on_outcome("fast_path" if normalized is address_string else "slow_path")
+        return normalized
+    return wrapper
+
+
+def _with_prefecture_outcomes(method, instrumentation):
+    on_outcome = instrumentation.on_outcome
+
+    @functools.wraps(method)
+    def wrapper(address_string):
+        prefecture, original_prefecture = method(address_string)
+        if not prefecture:
+            on_outcome("no_prefecture")
+        elif prefecture != original_prefecture:
+            on_outcome("prefecture_alias")
+        return prefecture, original_prefecture
+    return wrapper
+
+
+def _with_city_outcomes(method, parser, instrumentation):
+    on_outcome = instrumentation.on_outcome
+
+    @functools.wraps(method)
+    def wrapper(address_string, prefecture):
+        city, city_end = method(address_string, prefecture)
+        if not city:
+            on_outcome("no_city")
+            return city, city_end
+        if city.endswith("区") and city.startswith(parser.designated_cities):
+            on_outcome("designated_ward")
+        if city != address_string[:city_end]:
+            on_outcome("fuzzy_city")
+        else:
+            _, end = parser.municipality_index.match_city(city, prefecture)
+            if end != len(city):
+                on_outcome("gun_fallback" if "郡" in city else "city_fallback")
+        return city, city_end
+    return wrapper
+
+
+def _with_postal_outcome(method, instrumentation):
+    on_outcome = instrumentation.on_outcome
+
+    @functools.wraps(method)
+    def wrapper(address_string, prefecture, postal_entries):
+        postal_city = method(address_string, prefecture, postal_entries)
+        if postal_city:
+            on_outcome("postal_city")
+        return postal_city
+    return wrapper
@@ -0,0 +1,124 @@
+"""
+複数の読み方ができる住所の解釈の候補を、順位付きで列挙するモジュール
+
+parse_address は都道府県・市区町村を先頭から最長一致で確定するため、「京都京都市…」の「京都」や、
+「四日市市」のように名前の途中に市・町を含む住所を別の読み方で区切った候補は返さない。
+interpretations は最初に parse_address の結果をそのまま返し、呼び出し元が続きを要求した場合にのみ
+別の読み方の候補を作成する。最初の候補だけを使う場合のコストは parse_address と同じである。
+
+別の読み方の候補は、最長一致の読み方からの違い（REASONS のいずれか）を理由として持ち、
+理由ごとの重みの積をスコアとしてスコアの高い順に返す。同じ解析結果になる候補は1回だけ返す。
+
+使用例:
+    for candidate in itertools.islice(parser.interpretations("京都市左京区一乗寺1"), 3):
+        print(candidate.score, candidate.reasons, dict(candidate.parsed))
+"""
+import collections
+from types import MappingProxyType
+
+from . import patterns
+
+
+# 最長一致の読み方との違いと、スコアに掛ける重み
+REASONS = MappingProxyType({
+    "prefecture_from_city": 0.9,  # 都道府県の記載がなく、市区町村名から補った（複数の都道府県にある場合は等分する）
+    "shorter_city": 0.6,          # 市区町村辞書の短い方の表記に一致させた（例: 京都市左京区 → 京都市）
+    "prefecture_ignored": 0.5,    # 先頭の都道府県の省略形を都道府県名とみなさず、市区町村名の一部として読んだ
+    "city_by_suffix": 0.3,        # 市区町村辞書になく、途中の市・区・町・村で区切った
+})
+
+
+class Interpretation(collections.namedtuple("Interpretation", ["parsed", "score", "reasons"])):
+    """
+    住所の解釈の候補
+
+    Attributes:
+        parsed (ParsedAddress): 解析結果
+        score (float): 候補のスコア（最長一致の読み方は 1.0）
+        reasons (tuple): 最長一致の読み方との違い（REASONS のキー。最長一致の読み方は空のタプル）
+    """
+
+    __slots__ = ()
+
+
+def interpretations(parser, address_string):
+    """
+    住所の解釈の候補をスコアの高い順に返す
+
+    最初の候補は parse_address の結果（キャッシュを含む）で、以降の候補は2件目を要求したときに
+    まとめて作成する。別の読み方の候補では郵便番号による照合とあいまい検索は行わない。
+    町名番地以降は parse_address と同じメソッドで抽出する。
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+        address_string (str): 解析する住所文字列
+
+    Yields:
+        Interpretation: 解釈の候補
+    """
+    best = parser.parse_address(address_string)
+    yield Interpretation(best, 1.0, ())
+
+    seen = {best}
+    # sorted は安定なため、同じスコアの候補は作成した順（最長一致に近い順）になる
+    for candidate in sorted(_alternatives(parser, address_string), key=lambda candidate: -candidate.score):
+        if candidate.parsed not in seen:
+            seen.add(candidate.parsed)
+            yield candidate
+
+
+def _alternatives(parser, address_string):
+    """
+    都道府県・市区町村の読み方を変えた候補を列挙する（最長一致の読み方を含む）
+    """
+    text = patterns.POSTAL_CODE.sub("", parser.normalizer.normalize(address_string)).strip()
+    index = parser.municipality_index
+
+    prefecture, prefecture_end = index.match_prefecture(text)
+    readings = [(prefecture, text[prefecture_end:].strip(), ())]
+    if prefecture and not text.startswith(prefecture):
+        # 省略形（例: 京都）の場合は、市区町村名の一部とみなす読み方も候補にする
+        readings.append(("", text, ("prefecture_ignored",)))
+
+    for prefecture, remaining_address, reasons in readings:
+        for city, city_end, city_reasons in _city_readings(parser, index, remaining_address, prefecture):
+            rest = remaining_address[city_end:].strip()
+            written = remaining_address[:city_end]
+            candidate_prefectures = ((prefecture, ()),)
+            if not prefecture and city:
+                # 市区町村名から都道府県を補う候補（補わない候補も残す）
+                candidate_prefectures += tuple(
+                    (candidate, ("prefecture_from_city",)) for candidate in index.city_prefectures(city)
+                )
+            share = max(1, len(candidate_prefectures) - 1)
+            for candidate, prefecture_reasons in candidate_prefectures:
+                all_reasons = reasons + city_reasons + prefecture_reasons
+                score = 1.0
+                for reason in all_reasons:
+                    score *= REASONS[reason]
+                if prefecture_reasons:
+                    score /= share
+                yield Interpretation(parser._parse_remaining(rest, candidate, written), score, all_reasons)
+
+
+def _city_readings(parser, index, text, prefecture):
+    """
+    text の先頭の市区町村の読み方を列挙する
+
+    Yields:
+        tuple: (辞書上の市区町村名（辞書にない場合は空文字列）, text 中の終了位置, 理由のタプル)
+    """
+    matches = list(index.iter_cities(text, prefecture))
+    ends = {end for _, end in matches}
+    for city, end in reversed(matches):
+        yield city, end, (() if end == matches[-1][1] else ("shorter_city",))
+
+    # 市・区・町・村で区切る。辞書に一致した場合は最長一致の途中のみ（例: 四日市|市。続く町名の「町」では区切らない）、
+    # 一致しない場合は町名番地の数字や建物名の前までとし、先頭の文字では区切らない（例: 市川市）
+    limit = matches[-1][1] - 1 if matches else len(text)
+    for position in range(1, limit):
+        char = text[position]
+        if char.isdigit() or char.isspace():
+            break
+        if char in parser.city_suffixes and position + 1 not in ends:
+            yield "", position + 1, ("city_by_suffix",)
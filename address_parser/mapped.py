@@ -0,0 +1,161 @@
+"""
+メモリマップして参照する読み取り専用のバイナリテーブルの共通処理のモジュール
+
+テーブルは「識別子を含むヘッダー、32ビット符号なし整数の列（リトルエンディアン）のセクション、
+UTF-8 の文字列データ」の順に並べた1つのファイルで、郵便番号テーブルと町域テーブルが使用する。
+初回の参照時にメモリマップするため、読み込みはほぼ一瞬で、複数のプロセスで同じファイルを
+参照してもページキャッシュが共有される。テーブルは辞書のスナップショット（snapshot モジュール）のように
+別のファイルの途中に埋め込むこともできる。
+"""
+import array
+import mmap
+import os
+import sys
+import threading
+
+
+def write_table(output_path, header, sections, blob):
+    """
+    テーブルをファイルに書き出す（書き出しが完了してから置き換える）
+
+    Args:
+        output_path (str): 書き出すファイルのパス
+        header (bytes): ヘッダー（長さは4の倍数）
+        sections (list): 32ビット符号なし整数の列（array.array("I")）のリスト
+        blob (bytes): 文字列データ
+    """
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        write_sections(f, header, sections, blob)
+    os.replace(temp_path, output_path)
+
+
+def write_sections(f, header, sections, blob):
+    """
+    テーブルを開いているファイルの現在の位置に書き出す
+
+    Args:
+        f (file): バイナリモードで開いたファイル
+        header (bytes): ヘッダー（長さは4の倍数）
+        sections (list): 32ビット符号なし整数の列（array.array("I")）のリスト
+        blob (bytes): 文字列データ
+    """
+    f.write(header)
+    for section in sections:
+        if sys.byteorder != "little":
+            section = array.array("I", section)
+            section.byteswap()
+        section.tofile(f)
+    f.write(blob)
+
+
+class MappedTable:
+    """
+    テーブルをメモリマップして参照するクラスの基底クラス
+
+    サブクラスでは MAGIC と HEADER（struct.Struct、先頭が識別子）を定義し、
+    _open でヘッダーの値からセクションを切り出す。
+    pickle した場合はファイルのパス（と位置）のみを受け渡し、受け取った側で改めてメモリマップする。
+    """
+
+    # ファイルの先頭の識別子
+    MAGIC = b""
+
+    # ヘッダーの構造（struct.Struct）
+    HEADER = None
+
+    # 形式が正しくない場合のエラーメッセージに使用する名前
+    DESCRIPTION = "テーブル"
+
+    def __init__(self, path, offset=0):
+        """
+        MappedTableクラスの初期化
+
+        Args:
+            path (str): テーブルのパス（初回の参照時に開く）
+            offset (int): ファイル中のテーブルの開始位置（別のファイルに埋め込んだ場合）
+        """
+        self.path = path
+        self.offset = offset
+        self._lock = threading.Lock()
+        self._mmap = None
+        self._views = []
+
+    def __getstate__(self):
+        return {"path": self.path, "offset": self.offset}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state.get("offset", 0))
+
+    def _load(self):
+        """
+        テーブルをメモリマップし、各セクションを参照できるようにする（2回目以降は何もしない）
+        """
+        if self._mmap is not None:
+            return
+        with self._lock:
+            if self._mmap is not None:
+                return
+            with open(self.path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if buffer[self.offset:self.offset + len(self.MAGIC)] != self.MAGIC:
+                buffer.close()
+                raise ValueError(f"{self.DESCRIPTION}の形式が正しくありません: {self.path}")
+
+            # 各セクションは同じメモリビューから切り出し、close でまとめて解放する
+            view = memoryview(buffer)
+            self._views = [view, view[self.offset:]]
+            self._offset = self.HEADER.size
+            self._open(self.HEADER.unpack_from(buffer, self.offset)[1:])
+            self._mmap = buffer
+
+    def _open(self, header):
+        """
+        ヘッダーの値（識別子を除く）からセクションを切り出す（サブクラスで実装する）
+        """
+        raise NotImplementedError
+
+    def _uint32_section(self, count):
+        """
+        次のセクションを32ビット符号なし整数の列として参照する（ビッグエンディアンの環境ではコピーする）
+        """
+        view = self._views[1][self._offset:self._offset + count * 4]
+        self._offset += count * 4
+        self._views.append(view)
+        if sys.byteorder == "little":
+            view = view.cast("I")
+            self._views.append(view)
+            return view
+        values = array.array("I", view.tobytes())
+        values.byteswap()
+        return values
+
+    def _bytes_section(self, size):
+        """
+        次のセクションをバイト列として参照する
+        """
+        view = self._views[1][self._offset:self._offset + size]
+        self._offset += size
+        self._views.append(view)
+        return view
+
+    def close(self):
+        """
+        メモリマップを解放する（再度参照した場合は開き直す）
+
+        他のスレッドが参照している間は呼び出さないこと。
+        """
+        with self._lock:
+            if self._mmap is None:
+                return
+            self._close_sections()
+            for view in reversed(self._views):
+                view.release()
+            self._views = []
+            self._mmap.close()
+            self._mmap = None
+
+    def _close_sections(self):
+        """
+        close の前に、サブクラスが保持するセクションへの参照を解放する（サブクラスで実装する）
+        """
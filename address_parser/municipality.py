@@ -0,0 +1,197 @@
+"""
+都道府県・市区町村の辞書と最長一致インデックスのモジュール
+"""
+import os
+import threading
+from types import MappingProxyType
+
+from .trie import Trie
+
+
+# 同梱データのディレクトリ
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+# 市区町村辞書（都道府県<TAB>市区町村 のTSV）
+MUNICIPALITIES_PATH = os.path.join(DATA_DIR, "municipalities.tsv")
+
+# 都道府県リスト
+PREFECTURES = (
+    "北海道", "青森県", "岩手県", "宮城県", "秋田県", "山形県", "福島県",
+    "茨城県", "栃木県", "群馬県", "埼玉県", "千葉県", "東京都", "神奈川県",
+    "新潟県", "富山県", "石川県", "福井県", "山梨県", "長野県", "岐阜県",
+    "静岡県", "愛知県", "三重県", "滋賀県", "京都府", "大阪府", "兵庫県",
+    "奈良県", "和歌山県", "鳥取県", "島根県", "岡山県", "広島県", "山口県",
+    "徳島県", "香川県", "愛媛県", "高知県", "福岡県", "佐賀県", "長崎県",
+    "熊本県", "大分県", "宮崎県", "鹿児島県", "沖縄県"
+)
+
+# 都道府県の省略形マッピング
+PREFECTURE_ALIASES = MappingProxyType({
+    "東京": "東京都",
+    "大阪": "大阪府",
+    "京都": "京都府",
+    # 他の省略形も必要に応じて追加
+})
+
+
+def load_municipalities(path=MUNICIPALITIES_PATH):
+    """
+    市区町村辞書を読み込む
+
+    Args:
+        path (str): 辞書ファイルのパス（都道府県<TAB>市区町村 のTSV、#で始まる行は無視）
+
+    Returns:
+        list: (都道府県名, 市区町村名) のリスト
+    """
+    municipalities = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            prefecture, name = line.split("\t")
+            municipalities.append((prefecture, name))
+    return municipalities
+
+
+def municipality_keys(name):
+    """
+    市区町村名から、住所中に現れうる表記（検索キー）を列挙する
+
+    郡に属する町村は「河東郡音更町」と郡名を省略した「音更町」の両方を返す。
+
+    Args:
+        name (str): 辞書上の市区町村名
+
+    Returns:
+        list: 検索キーのリスト
+    """
+    keys = [name]
+    gun_position = name.find("郡")
+    # 「郡山市」「郡上市」のように先頭が郡の市や、郡名のみのキーは除外する
+    if 0 < gun_position < len(name) - 1 and name.endswith(("町", "村")):
+        keys.append(name[gun_position + 1:])
+    return keys
+
+
+class MunicipalityIndex:
+    """
+    都道府県・市区町村を最長一致で検索するインデックス
+
+    都道府県名（省略形を含む）と市区町村名をそれぞれトライに格納し、
+    住所の先頭から1回の走査で都道府県と市区町村を確定する。
+    """
+
+    def __init__(self, prefectures, prefecture_aliases, municipalities):
+        """
+        MunicipalityIndexクラスの初期化
+
+        Args:
+            prefectures (list): 都道府県名のリスト
+            prefecture_aliases (dict): 都道府県の省略形と正式名のマッピング
+            municipalities (list): (都道府県名, 市区町村名) のリスト
+        """
+        self.prefecture_trie = Trie()
+        for alias, full_name in prefecture_aliases.items():
+            self.prefecture_trie.insert(alias, full_name)
+        for prefecture in prefectures:
+            self.prefecture_trie.insert(prefecture, prefecture)
+
+        # 都道府県ごとのトライと、都道府県が不明な場合の全国共通のトライ
+        self.city_tries = {}
+        self.city_trie = Trie()
+        for prefecture, name in municipalities:
+            city_trie = self.city_tries.setdefault(prefecture, Trie())
+            for key in municipality_keys(name):
+                city_trie.insert(key, name)
+                self.city_trie.insert(key, name)
+
+    def match_prefecture(self, text, start=0):
+        """
+        text[start:] の先頭にある都道府県名を最長一致で検索する
+
+        Args:
+            text (str): 検索対象の文字列
+            start (int): 検索を開始する位置
+
+        Returns:
+            tuple: (正規化された都道府県名, 一致した表記の終了位置)。見つからない場合は ("", start)
+        """
+        prefecture, end = self.prefecture_trie.longest_prefix(text, start)
+        if not prefecture:
+            return "", start
+
+        # 「大阪市北区」のように省略形を含む市区町村名が続く場合は都道府県名とみなさない
+        _, city_end = self.city_trie.longest_prefix(text, start)
+        if city_end > end:
+            return "", start
+        return prefecture, end
+
+    def match_city(self, text, prefecture="", start=0):
+        """
+        text[start:] の先頭にある市区町村名を最長一致で検索する
+
+        Args:
+            text (str): 検索対象の文字列
+            prefecture (str): 都道府県名（空文字列の場合は全国から検索）
+            start (int): 検索を開始する位置
+
+        Returns:
+            tuple: (辞書上の市区町村名, 一致した表記の終了位置)。見つからない場合は ("", start)
+        """
+        city_trie = self.city_tries.get(prefecture) if prefecture else self.city_trie
+        if city_trie is None:
+            return "", start
+        city, end = city_trie.longest_prefix(text, start)
+        return city or "", end
+
+    def iter_cities(self, text, prefecture="", start=0):
+        """
+        text[start:] の先頭に一致するすべての市区町村名を短い順に列挙する（最後が match_city の結果）
+
+        Args:
+            text (str): 検索対象の文字列
+            prefecture (str): 都道府県名（空文字列の場合は全国から検索）
+            start (int): 検索を開始する位置
+
+        Yields:
+            tuple: (辞書上の市区町村名, 一致した表記の終了位置)
+        """
+        city_trie = self.city_tries.get(prefecture) if prefecture else self.city_trie
+        if city_trie is not None:
+            yield from city_trie.iter_prefixes(text, start)
+
+    def city_prefectures(self, city):
+        """
+        市区町村名が辞書にある都道府県を返す（「府中市」のように複数の都道府県にある場合は複数）
+
+        Args:
+            city (str): 辞書上の市区町村名
+
+        Returns:
+            tuple: 都道府県名のタプル（辞書の順）
+        """
+        return tuple(prefecture for prefecture, city_trie in self.city_tries.items() if city_trie.get(city) == city)
+
+
+# 既定のインデックス（get_default_index の初回呼び出し時に作成）
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_default_index():
+    """
+    同梱の辞書から作成した既定のインデックスを返す（初回呼び出し時に作成し、以降は共有）
+
+    複数のスレッドから同時に呼び出した場合も、インデックスの作成は1回だけ行う。
+
+    Returns:
+        MunicipalityIndex: 既定のインデックス
+    """
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = MunicipalityIndex(PREFECTURES, PREFECTURE_ALIASES, load_municipalities())
+    return _default_index
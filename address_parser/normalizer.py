@@ -0,0 +1,100 @@
+"""
+住所文字列の文字正規化を行うモジュール
+"""
+import re
+from types import MappingProxyType
+
+
+# 全角数字と半角数字の変換マッピング
+ZENKAKU_NUMBERS = MappingProxyType({
+    "０": "0", "１": "1", "２": "2", "３": "3", "４": "4",
+    "５": "5", "６": "6", "７": "7", "８": "8", "９": "9"
+})
+
+# 全角記号と半角記号の変換マッピング
+ZENKAKU_SYMBOLS = MappingProxyType({
+    "　": " ", "－": "-", "ー": "-", "−": "-", "‐": "-", "／": "/",
+    "（": "(", "）": ")", "［": "[", "］": "]", "｛": "{", "｝": "}",
+    "．": ".", "。": ".", "、": ",", "，": ",", "：": ":", "；": ";",
+    "！": "!", "？": "?", "＠": "@", "＃": "#", "＄": "$", "％": "%",
+    "＆": "&", "＊": "*", "＋": "+", "＝": "=", "＜": "<", "＞": ">",
+    "｜": "|", "＾": "^", "～": "~", "｀": "`"
+})
+
+# ハイフンの異体字（ZENKAKU_SYMBOLS に含まれないもの）の変換マッピング
+HYPHEN_VARIANTS = MappingProxyType({
+    "‑": "-", "‒": "-", "–": "-", "—": "-", "―": "-", "⁃": "-", "ｰ": "-"
+})
+
+# 全角英字と半角英字の変換マッピング
+ZENKAKU_ALPHABETS = MappingProxyType({
+    **{chr(ord("Ａ") + i): chr(ord("A") + i) for i in range(26)},
+    **{chr(ord("ａ") + i): chr(ord("a") + i) for i in range(26)},
+})
+
+
+class Normalizer:
+    """
+    変換テーブルを事前にコンパイルし、1回の走査で文字列を正規化するクラス
+
+    変換はすべて1文字から1文字への置換なので、正規化前後で文字列の長さと
+    各文字の位置は変わらない。
+
+    変換対象の文字を含まない文字列（上流で正規化済みの入力など）は、文字クラスの
+    正規表現で1回検索するだけで、変換せずにそのまま返す。
+    """
+
+    def __init__(self, *mappings):
+        """
+        Normalizerクラスの初期化
+
+        Args:
+            *mappings (dict): 1文字から1文字への変換マッピング（後のものが優先）
+        """
+        mapping = {}
+        for m in mappings:
+            mapping.update(m)
+        for source, target in mapping.items():
+            if len(source) != 1 or len(target) != 1:
+                raise ValueError(f"1文字同士の変換のみ指定できます: {source!r} -> {target!r}")
+
+        self.mapping = mapping
+        self.table = str.maketrans(mapping)
+        # 変換対象の文字のいずれかに一致するパターン（変換対象がない場合は何にも一致しない）
+        if mapping:
+            self.pattern = re.compile("[" + "".join(re.escape(source) for source in mapping) + "]")
+        else:
+            self.pattern = re.compile("(?!)")
+
+    def is_normalized(self, text):
+        """
+        文字列が変換対象の文字を含まないか（正規化済みか）を返す
+
+        Args:
+            text (str): 判定する文字列
+
+        Returns:
+            bool: 変換対象の文字を含まない場合は True
+        """
+        return self.pattern.search(text) is None
+
+    def normalize(self, text):
+        """
+        文字列を1回の走査で正規化する
+
+        Args:
+            text (str): 正規化する文字列
+
+        Returns:
+            str: 正規化された文字列（変換対象の文字を含まない場合は text そのもの）
+        """
+        # 文字列以外が渡された場合は従来どおり AttributeError とする
+        translate = text.translate
+        # 非ASCII文字を含む文字列の translate は1文字ごとに変換表を引くため、検索のみで済む場合は変換しない
+        if self.pattern.search(text) is None:
+            return text
+        return translate(self.table)
+
+
+# パーサーのインスタンス間で共有する既定のノーマライザー
+DEFAULT_NORMALIZER = Normalizer(ZENKAKU_SYMBOLS, HYPHEN_VARIANTS, ZENKAKU_NUMBERS, ZENKAKU_ALPHABETS)
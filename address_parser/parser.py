@@ -1,72 +1,157 @@
 """
 日本語住所を解析するためのモジュール
 """
-import re
+import sys
+from types import MappingProxyType
+
+from . import batch, columnar, patterns
+from . import instrumentation as instrumentation_module
+from . import interpretations as interpretations_module
+from .cache import LRUCache
+from .municipality import PREFECTURE_ALIASES, PREFECTURES, get_default_index, municipality_keys
+from .normalizer import DEFAULT_NORMALIZER, ZENKAKU_NUMBERS, ZENKAKU_SYMBOLS
+from .result import ParsedAddress
+from .spans import AddressSpans, OffsetMap
+
+
+# 市区町村の接尾辞パターン
+CITY_SUFFIXES = ("市", "区", "町", "村")
+
+# 政令指定都市のリスト
+DESIGNATED_CITIES = (
+    "札幌市", "仙台市", "さいたま市", "千葉市", "横浜市", "川崎市", "相模原市",
+    "新潟市", "静岡市", "浜松市", "名古屋市", "京都市", "大阪市", "堺市",
+    "神戸市", "岡山市", "広島市", "北九州市", "福岡市", "熊本市"
+)
+
+# 数字の漢数字変換マッピング
+KANJI_NUMBERS = MappingProxyType({
+    "一": "1", "二": "2", "三": "3", "四": "4", "五": "5",
+    "六": "6", "七": "7", "八": "8", "九": "9", "十": "10"
+})
+
+# 建物名や部屋番号を示す接尾辞
+BUILDING_SUFFIXES = ("ビル", "マンション", "アパート", "ハイツ", "コーポ", "荘", "タワー", "ハウス", "レジデンス")
+ROOM_SUFFIXES = ("号室", "室", "部屋")
 
 
 class AddressParser:
     """
     日本語の住所文字列を解析し、構造化されたデータに変換するクラス
+
+    変換テーブルや接尾辞のリストは変更不可のクラス属性としてすべてのインスタンスで共有する。
+    サブクラスではクラス属性を上書きすることで対象を変更できる。
+
+    インスタンスは作成後に変更できず（属性への代入は AttributeError）、1つのインスタンスを
+    複数のスレッドから共有できる。解析中に書き換えられる状態は、ロックで保護したキャッシュと
+    計測の集計、および初回使用時に1回だけ作成するインデックスのみである。
     """
 
-    def __init__(self):
+    # 都道府県リスト
+    prefectures = PREFECTURES
+
+    # 都道府県の省略形マッピング
+    prefecture_aliases = PREFECTURE_ALIASES
+
+    # 市区町村の接尾辞パターン
+    city_suffixes = CITY_SUFFIXES
+
+    # 政令指定都市のリスト
+    designated_cities = DESIGNATED_CITIES
+
+    # 数字の漢数字変換マッピング
+    kanji_numbers = KANJI_NUMBERS
+
+    # 建物名や部屋番号を示す接尾辞
+    building_suffixes = BUILDING_SUFFIXES
+    room_suffixes = ROOM_SUFFIXES
+
+    # 全角数字と半角数字の変換マッピング
+    zenkaku_numbers = ZENKAKU_NUMBERS
+
+    # 全角記号と半角記号の変換マッピング
+    zenkaku_symbols = ZENKAKU_SYMBOLS
+
+    # 全角・半角変換を1回の走査で行うノーマライザー
+    normalizer = DEFAULT_NORMALIZER
+
+    def __init__(self, cache_size=None, instrumentation=None, postal_index=None, fuzzy_matcher=None,
+                 town_index=None, snapshot=None):
         """
         AddressParserクラスの初期化
+
+        テーブル類はクラス属性として共有されるため、インスタンスの作成にはほぼコストがかからない。
+
+        Args:
+            cache_size (int): 解析結果のキャッシュの上限件数（None の場合はキャッシュしない）
+            instrumentation (Instrumentation): 段階ごとの所要時間と結果の内訳を受け取るオブジェクト
+                （ParserStats など。None の場合は計測しない）
+            postal_index (PostalIndex): 郵便番号から都道府県・市区町村を引くインデックス
+                （None の場合、郵便番号は除去するのみ）
+            fuzzy_matcher (FuzzyCityMatcher): 市区町村辞書に完全一致しない場合に使用するあいまい検索
+                （None の場合は接尾辞から推定する）
+            town_index (TownIndex): 町名番地を町域名と番地に分ける際に使用する町域の辞書
+            snapshot (Snapshot): 辞書のスナップショット。都道府県・市区町村の検索に使用し、
+                postal_index・town_index を指定しない場合はスナップショットに埋め込んだテーブルを使用する
         """
-        # 都道府県リスト
-        self.prefectures = [
-            "北海道", "青森県", "岩手県", "宮城県", "秋田県", "山形県", "福島県",
-            "茨城県", "栃木県", "群馬県", "埼玉県", "千葉県", "東京都", "神奈川県",
-            "新潟県", "富山県", "石川県", "福井県", "山梨県", "長野県", "岐阜県",
-            "静岡県", "愛知県", "三重県", "滋賀県", "京都府", "大阪府", "兵庫県",
-            "奈良県", "和歌山県", "鳥取県", "島根県", "岡山県", "広島県", "山口県",
-            "徳島県", "香川県", "愛媛県", "高知県", "福岡県", "佐賀県", "長崎県",
-            "熊本県", "大分県", "宮崎県", "鹿児島県", "沖縄県"
-        ]
-        
-        # 都道府県の省略形マッピング
-        self.prefecture_aliases = {
-            "東京": "東京都",
-            "大阪": "大阪府",
-            "京都": "京都府",
-            # 他の省略形も必要に応じて追加
-        }
+        # 辞書のスナップショット（None の場合は同梱の辞書からインデックスを作成する）
+        self.snapshot = snapshot
+        if snapshot is not None:
+            postal_index = postal_index if postal_index is not None else snapshot.postal_index
+            town_index = town_index if town_index is not None else snapshot.town_index
         
-        # 市区町村の接尾辞パターン
-        self.city_suffixes = ["市", "区", "町", "村"]
+        # 正規化後の住所文字列をキーとする解析結果のキャッシュ
+        self.cache = LRUCache(cache_size) if cache_size else None
         
-        # 政令指定都市のリスト
-        self.designated_cities = [
-            "札幌市", "仙台市", "さいたま市", "千葉市", "横浜市", "川崎市", "相模原市",
-            "新潟市", "静岡市", "浜松市", "名古屋市", "京都市", "大阪市", "堺市",
-            "神戸市", "岡山市", "広島市", "北九州市", "福岡市", "熊本市"
-        ]
+        # 郵便番号がある場合に都道府県・市区町村の照合に使用する
+        self.postal_index = postal_index
         
-        # 数字の漢数字変換マッピング
-        self.kanji_numbers = {
-            "一": "1", "二": "2", "三": "3", "四": "4", "五": "5",
-            "六": "6", "七": "7", "八": "8", "九": "9", "十": "10"
-        }
+        # 市区町村辞書に完全一致しない場合のみ使用する
+        self.fuzzy_matcher = fuzzy_matcher
         
-        # 建物名や部屋番号を示す接尾辞
-        self.building_suffixes = ["ビル", "マンション", "アパート", "ハイツ", "コーポ", "荘", "タワー", "ハウス", "レジデンス"]
-        self.room_suffixes = ["号室", "室", "部屋"]
+        # split_town_street で町域名の照合に使用する
+        self.town_index = town_index
         
-        # 全角数字と半角数字の変換マッピング
-        self.zenkaku_numbers = {
-            "０": "0", "１": "1", "２": "2", "３": "3", "４": "4",
-            "５": "5", "６": "6", "７": "7", "８": "8", "９": "9"
-        }
-        
-        # 全角記号と半角記号の変換マッピング
-        self.zenkaku_symbols = {
-            "　": " ", "－": "-", "ー": "-", "−": "-", "‐": "-", "／": "/",
-            "（": "(", "）": ")", "［": "[", "］": "]", "｛": "{", "｝": "}",
-            "．": ".", "。": ".", "、": ",", "，": ",", "：": ":", "；": ";",
-            "！": "!", "？": "?", "＠": "@", "＃": "#", "＄": "$", "％": "%",
-            "＆": "&", "＊": "*", "＋": "+", "＝": "=", "＜": "<", "＞": ">",
-            "｜": "|", "＾": "^", "～": "~", "｀": "`"
-        }
+        # 計測を有効にした場合のみ、各段階のメソッドを計時用のラッパーに差し替える
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            instrumentation_module.instrument(self, instrumentation)
+
+        # 以降は属性を変更できない（複数のスレッドから共有するため）
+        self.__dict__["_frozen"] = True
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get("_frozen"):
+            raise AttributeError(f"{type(self).__name__} は作成後に変更できません（{name}）")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        if self.__dict__.get("_frozen"):
+            raise AttributeError(f"{type(self).__name__} は作成後に変更できません（{name}）")
+        super().__delattr__(name)
+
+    def __getstate__(self):
+        # 計時用のラッパーは pickle できないため除外し、復元時に作り直す
+        state = self.__dict__.copy()
+        for name in instrumentation_module.WRAPPED_METHODS:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.instrumentation is not None:
+            instrumentation_module.instrument(self, self.instrumentation)
+
+    @property
+    def municipality_index(self):
+        """
+        都道府県・市区町村の最長一致インデックス（初回使用時に作成し、インスタンス間で共有）
+
+        スナップショットを指定した場合は、スナップショットのインデックスを返す。
+        """
+        if self.snapshot is not None:
+            return self.snapshot.municipality_index
+        return get_default_index()
 
     def parse_address(self, address_string):
         """
@@ -76,7 +161,7 @@ class AddressParser:
             address_string (str): 解析する住所文字列
 
         Returns:
-            dict: 解析された住所の構造化データ
+            ParsedAddress: 解析された住所の構造化データ（辞書と同じキーで参照できる）
                 {
                     "prefecture": "都道府県名",
                     "city": "市区町村名",
@@ -84,12 +169,53 @@ class AddressParser:
                     "other": "建物名・部屋番号など"
                 }
         """
-        # 全角記号を半角記号に変換（特に全角スペースを半角スペースに変換）
-        for zenkaku, hankaku in self.zenkaku_symbols.items():
-            address_string = address_string.replace(zenkaku, hankaku)
+        # 全角数字・記号を半角に変換（特に全角スペースを半角スペースに変換）
+        address_string = self._normalize_input(address_string)
+        
+        if self.cache is None:
+            return self._parse_normalized(address_string)
+        
+        # 全角・半角の表記が異なるだけの住所は同じエントリを共有する
+        # （解析結果は変更不可のため、そのまま返す）
+        result = self.cache.get(address_string)
+        if result is None:
+            result = self._parse_normalized(address_string)
+            self.cache.put(address_string, result)
+        return result
+
+    def interpretations(self, address_string):
+        """
+        複数の読み方ができる住所について、解釈の候補をスコアの高い順に返す
+
+        最初の候補は parse_address の結果で、別の読み方の候補は続きを要求した場合にのみ作成する。
+
+        Args:
+            address_string (str): 解析する住所文字列
+
+        Yields:
+            Interpretation: 解釈の候補（parsed, score, reasons）
+        """
+        return interpretations_module.interpretations(self, address_string)
+
+    def _normalize_input(self, address_string):
+        """
+        解析前に住所文字列全体の全角数字・記号を半角に変換する
+        """
+        return self.normalizer.normalize(address_string)
+
+    def _parse_normalized(self, address_string):
+        """
+        全角・半角を正規化済みの住所文字列を解析する
+        """
+        # 郵便番号から市区町村の候補を引く（インデックスがある場合）
+        postal_entries = ()
+        if self.postal_index is not None:
+            postal_match = patterns.POSTAL_CODE.search(address_string)
+            if postal_match:
+                postal_entries = self.postal_index.lookup(postal_match.group())
         
         # 郵便番号を除去（あれば）
-        address_string = re.sub(r'〒\d{3}-\d{4}', '', address_string).strip()
+        address_string = patterns.POSTAL_CODE.sub('', address_string).strip()
         
         # 都道府県を抽出
         prefecture, original_prefecture = self.extract_prefecture(address_string)
@@ -100,14 +226,29 @@ class AddressParser:
             # 元の都道府県名の長さを使って残りの住所を計算
             remaining_address = address_string[len(original_prefecture):].strip()
         
-        # 市区町村を抽出
-        city = self.extract_city(remaining_address, prefecture)
+        # 郵便番号の候補と一致する市区町村があれば、それを採用する
+        postal_city = self.match_postal_city(remaining_address, prefecture, postal_entries)
+        if postal_city:
+            prefecture, city = postal_city
+            city_end = len(city)
+        else:
+            # 市区町村を抽出（あいまい検索の場合は表記と長さが異なるため、住所中の終了位置も受け取る）
+            city, city_end = self.extract_city_span(remaining_address, prefecture)
         
         # 市区町村を除去した残りの住所
         remaining_address = remaining_address
         if city:
-            remaining_address = remaining_address[len(city):].strip()
+            remaining_address = remaining_address[city_end:].strip()
+        elif postal_entries:
+            # 住所に市区町村の記載がない場合は郵便番号から補う
+            prefecture, city = self.complete_from_postal(prefecture, postal_entries)
         
+        return self._parse_remaining(remaining_address, prefecture, city)
+
+    def _parse_remaining(self, remaining_address, prefecture, city):
+        """
+        都道府県・市区町村を除去した残りの住所から町名番地とその他を抽出し、結果を正規化する
+        """
         # 町名番地を抽出
         town_street = self.extract_town_street(remaining_address, prefecture, city)
         
@@ -129,15 +270,166 @@ class AddressParser:
         # その他の要素（建物名・部屋番号など）を抽出
         other = self.extract_other(remaining_address, prefecture, city, town_street)
         
-        # 結果を正規化
-        result = {
-            "prefecture": prefecture,
-            "city": city,
-            "town_street": town_street,
-            "other": other
-        }
-        
-        return self.normalize_address(result)
+        # 結果を正規化（中間の辞書は作成しない）
+        return self._normalize_fields(prefecture, city, town_street, other)
+
+    def scan(self, address_string):
+        """
+        住所文字列を1回走査し、各要素の入力中の位置を返す
+
+        parse_address と異なり、各段階で残りの住所の部分文字列を作成せずに位置だけを進める。
+        値は AddressSpans.to_parsed() を呼び出したときに初めて作成し、parse_address の結果と一致する。
+        extract_* メソッドは経由しないため、計測やサブクラスでの上書きは反映されない。
+
+        Args:
+            address_string (str): 解析する住所文字列
+
+        Returns:
+            AddressSpans: 各要素の位置
+        """
+        text = self.normalizer.normalize(address_string)
+        
+        # 郵便番号を除去し、除去後の位置を入力中の位置に変換できるようにする
+        postal_span = None
+        offsets = None
+        postal_entries = ()
+        postal_match = patterns.POSTAL_CODE.search(text)
+        if postal_match:
+            postal_span = postal_match.span()
+            if self.postal_index is not None:
+                postal_entries = self.postal_index.lookup(postal_match.group())
+            offsets = OffsetMap([match.span() for match in patterns.POSTAL_CODE.finditer(text)])
+            text = patterns.POSTAL_CODE.sub('', text)
+        start, end = _strip_span(text, 0, len(text))
+        
+        # 都道府県
+        prefecture, prefecture_end = self.municipality_index.match_prefecture(text, start)
+        prefecture_span = None
+        if prefecture:
+            prefecture_span = (start, prefecture_end)
+            start, _ = _strip_span(text, prefecture_end, end)
+        
+        # 市区町村（値が入力中の表記と異なる場合のみ city に値を設定する）
+        city = None
+        postal_city = self.match_postal_city(text[start:end], prefecture, postal_entries) if postal_entries else None
+        if postal_city:
+            prefecture, city_text = postal_city
+            city_end = start + len(city_text)
+        else:
+            city_text, city_end = self._city_span(text, start, end, prefecture)
+            if city_text != text[start:city_end]:
+                # あいまい検索で辞書上の表記に置き換えた場合
+                city = city_text
+        city_span = None
+        if city_text:
+            city_span = (start, city_end)
+            start, _ = _strip_span(text, city_end, end)
+        elif postal_entries:
+            # 住所に市区町村の記載がない場合は郵便番号から補う
+            prefecture, city = self.complete_from_postal(prefecture, postal_entries)
+        
+        # 町名番地（最初のスペースまで）とその他（最初のスペースの後）
+        town_street_span = None
+        other_span = None
+        if start < end:
+            space = text.find(" ", start, end)
+            if space < 0:
+                town_street_span = (start, end)
+            else:
+                town_street_span = (start, space)
+                other_span = self._other_span(text, space + 1, end)
+                if other_span[0] == other_span[1]:
+                    other_span = None
+        
+        cleaned_spans = (city_span, town_street_span, other_span)
+        if offsets is not None:
+            prefecture_span, city_span, town_street_span, other_span = (
+                offsets.span(*span) if span else None
+                for span in (prefecture_span, city_span, town_street_span, other_span)
+            )
+        return AddressSpans(
+            address_string,
+            (postal_span, prefecture_span, city_span, town_street_span, other_span),
+            self,
+            (prefecture, city, text, cleaned_spans),
+        )
+
+    def stats(self):
+        """
+        計測結果を返す
+
+        Returns:
+            dict: ParserStats.snapshot() の結果（ParserStats 以外で計測している場合や、計測しない場合は None）
+        """
+        if isinstance(self.instrumentation, instrumentation_module.ParserStats):
+            return self.instrumentation.snapshot()
+        return None
+
+    def cache_stats(self):
+        """
+        解析結果のキャッシュの統計情報を返す
+
+        Returns:
+            CacheStats: 統計情報（キャッシュを使用しない場合は None）
+        """
+        return self.cache.stats() if self.cache is not None else None
+
+    def prewarm(self, addresses):
+        """
+        出現頻度の高い住所をあらかじめ解析し、キャッシュに登録する
+
+        Args:
+            addresses (iterable): 住所文字列のイテラブル（ファイルオブジェクトの場合は各行の改行を除去する）
+
+        Returns:
+            int: 新たにキャッシュに登録した件数
+        """
+        if self.cache is None:
+            raise ValueError("キャッシュを使用しないパーサーは事前登録できません（cache_size を指定してください）")
+        count = 0
+        for address in addresses:
+            key = self.normalizer.normalize(address.rstrip("\r\n"))
+            if key and key not in self.cache:
+                self.cache.put(key, self._parse_normalized(key))
+                count += 1
+        return count
+
+    def parse_many(self, addresses, workers=1, chunksize=batch.DEFAULT_CHUNKSIZE, use_threads=None,
+                   shared_tables=False):
+        """
+        複数の住所を解析し、入力と同じ順序で結果を返す
+
+        Args:
+            addresses (iterable): 住所文字列のイテラブル（必要な分だけ順に読み進める）
+            workers (int): ワーカー数（1の場合は同じスレッドで解析、None の場合はCPU数）
+            chunksize (int): 1つのワーカーに一度に送る住所の件数
+            use_threads (bool): プロセスではなくスレッドのプールで解析するかどうか
+                （None の場合、GIL が無効な free-threaded ビルドではスレッドを使用する）
+            shared_tables (bool): プロセスのプールで、辞書をワーカー間で共有するかどうか（batch.share_tables を参照）
+
+        Yields:
+            ParsedAddress or ParseFailure: 解析結果。失敗したレコードは ParseFailure となり、処理は継続する
+        """
+        return batch.parse_many(
+            self, addresses, workers=workers, chunksize=chunksize, use_threads=use_threads, shared_tables=shared_tables
+        )
+
+    def parse_columnar(self, addresses, strings=None, workers=1, chunksize=batch.DEFAULT_CHUNKSIZE):
+        """
+        複数の住所を解析し、列指向のバッチとして返す
+
+        都道府県と市区町村は共通の文字列表への整数コードとして保持する。
+
+        Args:
+            addresses (iterable): 住所文字列のイテラブル
+            strings (StringTable): 複数のバッチで共有する文字列表（None の場合は新しく作成する）
+            workers (int): ワーカープロセス数（1の場合は同じプロセスで解析、None の場合はCPU数）
+            chunksize (int): 1つのワーカーに一度に送る住所の件数
+
+        Returns:
+            ColumnarBatch: 解析結果のバッチ
+        """
+        return columnar.parse_columnar(self, addresses, strings=strings, workers=workers, chunksize=chunksize)
 
     def extract_prefecture(self, address_string):
         """
@@ -149,15 +441,10 @@ class AddressParser:
         Returns:
             tuple: (正規化された都道府県名, 元の都道府県名)
         """
-        # 完全一致の都道府県名を検索
-        for prefecture in self.prefectures:
-            if address_string.startswith(prefecture):
-                return prefecture, prefecture
-        
-        # 省略形の都道府県名を検索
-        for alias, full_name in self.prefecture_aliases.items():
-            if address_string.startswith(alias):
-                return full_name, alias
+        # 都道府県名（省略形を含む）を最長一致で検索
+        prefecture, end = self.municipality_index.match_prefecture(address_string)
+        if prefecture:
+            return prefecture, address_string[:end]
         
         # 都道府県名が見つからない場合は空文字列を返す
         return "", ""
@@ -173,29 +460,114 @@ class AddressParser:
         Returns:
             str: 抽出された市区町村名
         """
-        if not address_string:
-            return ""
-        
+        return self.extract_city_span(address_string, prefecture)[0]
+
+    def extract_city_span(self, address_string, prefecture):
+        """
+        住所文字列から市区町村を抽出し、住所文字列中の終了位置とともに返す
+
+        あいまい検索で一致した場合は辞書上の表記を返すため、住所中の表記と長さが異なることがある。
+
+        Args:
+            address_string (str): 解析する住所文字列
+            prefecture (str): 抽出された都道府県名
+
+        Returns:
+            tuple: (市区町村名, 住所文字列中の終了位置)。見つからない場合は ("", 0)
+        """
+        return self._city_span(address_string, 0, len(address_string), prefecture)
+
+    def _city_span(self, text, start, end, prefecture):
+        """
+        text[start:end] の先頭にある市区町村を抽出する（部分文字列を作成せずに位置で処理する）
+
+        Returns:
+            tuple: (市区町村名, text 中の終了位置)。見つからない場合は ("", start)
+        """
+        if start >= end:
+            return "", start
+        
+        # 市区町村辞書から最長一致で検索（政令指定都市の区、郡を含む町村を含む）
+        _, city_end = self.municipality_index.match_city(text, prefecture, start)
+        if city_end > start:
+            return text[start:city_end], city_end
+        
+        # 辞書に完全一致しない場合は、異体字や誤字を許容して検索する（有効な場合）
+        if self.fuzzy_matcher is not None:
+            fuzzy_match = self.fuzzy_matcher.match(text[start:end], prefecture)
+            if fuzzy_match:
+                return fuzzy_match.city, start + fuzzy_match.end
+        
+        city_end = self._city_end_by_suffix(text, start, end)
+        return text[start:city_end], city_end
+
+    def _city_end_by_suffix(self, text, start, end):
+        """
+        市区町村辞書にない市区町村を接尾辞から推定し、text 中の終了位置を返す（見つからない場合は start）
+        """
         # 政令指定都市の特別区を処理
         for city in self.designated_cities:
-            if address_string.startswith(city):
+            if text.startswith(city, start, end):
                 # 政令指定都市の後に区がある場合（例: 大阪市北区）
-                district_match = re.match(f"{city}(.+?区)", address_string)
+                district_match = patterns.designated_ward_pattern(city).match(text, start, end)
                 if district_match:
-                    return f"{city}{district_match.group(1)}"
-                return city
+                    return district_match.end()
+                return start + len(city)
         
         # 一般的な市区町村の抽出パターン
-        city_match = re.match(r'(.+?[市区町村])', address_string)
+        city_match = patterns.CITY.match(text, start, end)
         if city_match:
-            return city_match.group(1)
+            return city_match.end(1)
         
         # 特殊なケース: 郡を含む町村（例: ○○郡△△町）
-        gun_match = re.match(r'(.+?郡.+?[町村])', address_string)
+        gun_match = patterns.GUN_CITY.match(text, start, end)
         if gun_match:
-            return gun_match.group(1)
+            return gun_match.end(1)
         
-        return ""
+        return start
+
+    def match_postal_city(self, address_string, prefecture, postal_entries):
+        """
+        郵便番号の候補の市区町村が住所文字列の先頭にあるか照合する
+
+        住所に記載された都道府県と異なる候補は無視する（郵便番号の誤記の可能性があるため、
+        住所の記載を優先する）。
+
+        Args:
+            address_string (str): 都道府県を除去した住所文字列
+            prefecture (str): 抽出された都道府県名（空文字列の場合は候補の都道府県を採用する）
+            postal_entries (tuple): PostalIndex.lookup の結果
+
+        Returns:
+            tuple: (都道府県名, 住所に記載された市区町村の表記)。一致しない場合は None
+        """
+        for entry in postal_entries:
+            if prefecture and entry.prefecture != prefecture:
+                continue
+            # 郡名を省略した表記（例: 音更町）を含めて照合し、長い表記を優先する
+            for key in municipality_keys(entry.city):
+                if address_string.startswith(key):
+                    return entry.prefecture, key
+        return None
+
+    def complete_from_postal(self, prefecture, postal_entries):
+        """
+        住所に市区町村の記載がない場合に、郵便番号から都道府県と市区町村を補う
+
+        Args:
+            prefecture (str): 抽出された都道府県名
+            postal_entries (tuple): PostalIndex.lookup の結果
+
+        Returns:
+            tuple: (都道府県名, 市区町村名)。候補が1つに定まらない場合は (prefecture, "")
+        """
+        candidates = {
+            (entry.prefecture, entry.city) for entry in postal_entries
+            if not prefecture or entry.prefecture == prefecture
+        }
+        if len(candidates) == 1:
+            return candidates.pop()
+        return prefecture, ""
 
     def extract_town_street(self, address_string, prefecture, city):
         """
@@ -219,19 +591,33 @@ class AddressParser:
         
         # 数字とハイフンを含む番地パターンを検出
         # 例: 西新宿1-2-3
-        number_pattern = re.search(r'([^\d]+)([\d-]+.*?)$', town_street_part)
+        number_pattern = patterns.TOWN_STREET_NUMBER.search(town_street_part)
         if number_pattern:
             return town_street_part
         
         # 漢数字を含む番地パターンを検出
         # 例: 西新宿一丁目二番三号
-        kanji_pattern = re.search(r'(.+?[町])(.+?[丁目])(.+?[番])(.+?[号])', town_street_part)
+        kanji_pattern = patterns.TOWN_STREET_KANJI.search(town_street_part)
         if kanji_pattern:
             return town_street_part
         
         # 番地がない場合は町名のみを返す
         return town_street_part
 
+    def split_town_street(self, parsed):
+        """
+        解析結果の町名番地を町域名と番地に分け、町域名が辞書にあるかどうかを確認する
+
+        Args:
+            parsed (ParsedAddress): parse_address の結果
+
+        Returns:
+            TownMatch: 町域名・番地と、町域名が市区町村の町域の辞書にあるかどうか
+        """
+        if self.town_index is None:
+            raise ValueError("町域の辞書を使用しないパーサーでは町域名を照合できません（town_index を指定してください）")
+        return self.town_index.split_town_street(parsed.town_street, parsed.prefecture, parsed.city)
+
     def extract_other(self, address_string, prefecture, city, town_street):
         """
         住所文字列からその他の要素（建物名・部屋番号など）を抽出する
@@ -245,51 +631,45 @@ class AddressParser:
         Returns:
             str: 抽出されたその他の要素
         """
-        if not address_string:
-            return ""
+        start, end = self._other_span(address_string, 0, len(address_string))
+        return address_string[start:end]
+
+    def _other_span(self, text, start, end):
+        """
+        text[start:end] からその他の要素（建物名・部屋番号など）の範囲を求める
+
+        Returns:
+            tuple: text 中の (開始位置, 終了位置)
+        """
+        if start >= end:
+            return start, start
         
         # 建物名と部屋番号を抽出
         # 例: 〇〇ビル101号室
         
-        # 建物名を検出
-        building_name = ""
-        for suffix in self.building_suffixes:
-            match = re.search(f"(.+?{suffix})", address_string)
-            if match:
-                building_name = match.group(1)
-                break
-        
-        # 部屋番号を検出
-        room_number = ""
-        for suffix in self.room_suffixes:
-            match = re.search(f"(\\d+{suffix})", address_string)
-            if match:
-                room_number = match.group(1)
-                break
+        # 建物名と部屋番号を1回の走査で検出
+        automaton = patterns.suffix_automaton(self.building_suffixes, self.room_suffixes)
+        building_span, room_span = automaton.find(text, start, end)
         
         # 建物名と部屋番号が見つからない場合は、そのまま返す
-        if not building_name and not room_number:
-            return address_string
+        if building_span is None and room_span is None:
+            return start, end
         
         # 建物名と部屋番号を組み合わせる
-        if building_name and room_number:
+        if building_span is not None and room_span is not None:
             # 部屋番号が建物名に含まれている場合
-            if room_number in building_name:
-                return building_name
-            
-            # スペースがすでに含まれている場合
-            if " " in address_string and building_name in address_string and room_number in address_string:
-                return address_string
+            if text[room_span[0]:room_span[1]] in text[building_span[0]:building_span[1]]:
+                return building_span
             
-            # それ以外の場合は、建物名と部屋番号をそのまま返す
-            return address_string
+            # それ以外の場合（スペースを含む場合を含む）は、そのまま返す
+            return start, end
         
         # 建物名のみ
-        if building_name:
-            return building_name
+        if building_span is not None:
+            return building_span
         
         # 部屋番号のみ
-        return room_number
+        return room_span
 
     def normalize_address(self, address_dict):
         """
@@ -299,37 +679,42 @@ class AddressParser:
             address_dict (dict): 解析された住所の構造化データ
 
         Returns:
-            dict: 正規化された住所の構造化データ
+            ParsedAddress: 正規化された住所の構造化データ
         """
-        normalized = {}
-        
-        # 都道府県の正規化
-        normalized["prefecture"] = address_dict["prefecture"]
-        
-        # 市区町村の正規化
-        normalized["city"] = address_dict["city"]
+        return self._normalize_fields(
+            address_dict["prefecture"], address_dict["city"], address_dict["town_street"], address_dict["other"]
+        )
+
+    def _normalize_fields(self, prefecture, city, town_street, other):
+        """
+        抽出した住所の各要素を正規化し、ParsedAddress を作成する
+        """
+        # 都道府県・市区町村は同じ値が繰り返し現れるため、文字列をインターンして共有する
+        prefecture = sys.intern(prefecture)
+        city = sys.intern(city)
         
         # 町名番地の正規化
-        town_street = address_dict["town_street"]
-        # 全角数字を半角数字に変換
-        for zenkaku, hankaku in self.zenkaku_numbers.items():
-            town_street = town_street.replace(zenkaku, hankaku)
-        # 全角記号を半角記号に変換
-        for zenkaku, hankaku in self.zenkaku_symbols.items():
-            town_street = town_street.replace(zenkaku, hankaku)
+        # 全角数字・記号を半角に変換
+        town_street = self.normalizer.normalize(town_street)
         # 漢数字を半角数字に変換（丁目、番、号の前の数字のみ）
-        for kanji, number in self.kanji_numbers.items():
-            town_street = re.sub(f"({kanji})([丁目番号])", f"{number}\\2", town_street)
-        normalized["town_street"] = town_street
+        kanji_numbers = self.kanji_numbers
+        town_street = patterns.kanji_number_pattern(tuple(kanji_numbers)).sub(
+            lambda match: kanji_numbers[match.group(1)] + match.group(2), town_street
+        )
         
         # その他の要素の正規化
-        other = address_dict["other"]
-        # 全角数字を半角数字に変換
-        for zenkaku, hankaku in self.zenkaku_numbers.items():
-            other = other.replace(zenkaku, hankaku)
-        # 全角記号を半角記号に変換
-        for zenkaku, hankaku in self.zenkaku_symbols.items():
-            other = other.replace(zenkaku, hankaku)
-        normalized["other"] = other
-        
-        return normalized 
\ No newline at end of file
+        # 全角数字・記号を半角に変換
+        other = self.normalizer.normalize(other)
+        
+        return ParsedAddress(prefecture, city, town_street, other)
+
+
+def _strip_span(text, start, end):
+    """
+    text[start:end] の前後の空白を除いた範囲を返す（str.strip と同じ空白を除く）
+    """
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
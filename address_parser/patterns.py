@@ -0,0 +1,90 @@
+"""
+住所解析で使用する正規表現パターンのレジストリモジュール
+
+固定のパターンはモジュールの読み込み時に、接尾辞などから組み立てるパターンは
+初回使用時にコンパイルし、AddressParser とそのサブクラスのすべてのインスタンスで共有する。
+re モジュール内部のキャッシュ（上限あり）には依存しない。
+"""
+import functools
+import re
+
+from .suffixes import SuffixAutomaton
+
+
+# 郵便番号（例: 〒123-4567）
+POSTAL_CODE = re.compile(r'〒\d{3}-\d{4}')
+
+# 一般的な市区町村（例: 府中市）
+CITY = re.compile(r'(.+?[市区町村])')
+
+# 郡を含む町村（例: 河東郡音更町）
+GUN_CITY = re.compile(r'(.+?郡.+?[町村])')
+
+# 数字とハイフンを含む番地（例: 西新宿1-2-3）
+TOWN_STREET_NUMBER = re.compile(r'([^\d]+)([\d-]+.*?)$')
+
+# 漢数字を含む番地（例: 西新宿一丁目二番三号）
+TOWN_STREET_KANJI = re.compile(r'(.+?[町])(.+?[丁目])(.+?[番])(.+?[号])')
+
+# 町域名と番地の境界（最初の数字、または漢数字の丁目の前。例: 西新宿|1-2-3、本町|三丁目5）
+TOWN_BLOCK = re.compile(r'(\D*?)\s*((?:\d|[一二三四五六七八九十]+丁目).*)?$')
+
+# 辞書の町域名の直後として認める文字（番地の数字・漢数字、丁目、空白、ハイフン、または末尾）
+TOWN_BOUNDARY = re.compile(r'$|[\d〇一二三四五六七八九十百千\s-]|丁目')
+
+# 町域名の末尾にある、番地の数字の前の漢数字（例: 西新宿二十|3番地。一部だけ数字に変換された番地）
+TRAILING_KANJI_NUMERAL = re.compile(r'[〇一二三四五六七八九十百千]+$')
+
+# 丁目・番・号などの直前にある漢数字を含む数（例: 二十三番、十2丁目）
+KANJI_NUMERAL = re.compile(r'[〇一二三四五六七八九十百千0-9]*[〇一二三四五六七八九十百千][〇一二三四五六七八九十百千0-9]*'
+                           r'(?=丁目|番|号|-|の[0-9〇一二三四五六七八九十])')
+
+# 番地の区切り（例: 1丁目2番3号、2番地の3、1の2）
+BLOCK_SEPARATOR = re.compile(r'(\d+)(?:丁目|番地の?|番の?|号|の(?=\d))(?=(\d)?)')
+
+# 空白（連続するものを含む）
+WHITESPACE = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=None)
+def designated_ward_pattern(city):
+    """
+    政令指定都市の後に続く区のパターンを返す（例: 大阪市北区）
+
+    Args:
+        city (str): 政令指定都市名
+
+    Returns:
+        re.Pattern: コンパイル済みのパターン
+    """
+    return re.compile(re.escape(city) + r'(.+?区)')
+
+
+@functools.lru_cache(maxsize=None)
+def suffix_automaton(building_suffixes, room_suffixes):
+    """
+    建物名・部屋番号の接尾辞を1回の走査で検出するオートマトンを返す
+
+    Args:
+        building_suffixes (tuple): 建物名の接尾辞（優先する順）
+        room_suffixes (tuple): 部屋番号の接尾辞（優先する順）
+
+    Returns:
+        SuffixAutomaton: 構築済みのオートマトン
+    """
+    return SuffixAutomaton(building_suffixes, room_suffixes)
+
+
+@functools.lru_cache(maxsize=None)
+def kanji_number_pattern(kanji_numbers):
+    """
+    丁目・番・号の直前にある漢数字のパターンを返す（例: 一丁目）
+
+    Args:
+        kanji_numbers (tuple): 変換対象の漢数字
+
+    Returns:
+        re.Pattern: コンパイル済みのパターン
+    """
+    kanji = "|".join(re.escape(k) for k in kanji_numbers)
+    return re.compile(f'({kanji})([丁目番号])')
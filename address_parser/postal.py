@@ -0,0 +1,244 @@
+"""
+郵便番号から都道府県・市区町村・町域を引くインデックスのモジュール
+
+日本郵便の郵便番号データ（KEN_ALL.CSV 形式）を build_postal_table で独自のバイナリ形式に
+変換しておき、PostalIndex で初回検索時にメモリマップして参照する（mapped モジュールを参照）。
+
+バイナリ形式（数値はすべてリトルエンディアンの32ビット符号なし整数）:
+
+    ヘッダー        MAGIC, 郵便番号数, エントリ数, 文字列数, 文字列データのバイト数
+    先頭3桁の索引   PREFIX_COUNT + 1 個。先頭3桁が p の郵便番号は codes[index[p]:index[p + 1]]
+    codes          郵便番号（昇順）
+    entry_offsets  郵便番号数 + 1 個。codes[i] のエントリは entries[entry_offsets[i]:entry_offsets[i + 1]]
+    entries        エントリ数 × 3 個（都道府県, 市区町村, 町域 の文字列番号）
+    string_offsets 文字列数 + 1 個
+    文字列データ    UTF-8
+"""
+import array
+import bisect
+import collections
+import csv
+import struct
+
+from .mapped import MappedTable, write_table
+from .normalizer import DEFAULT_NORMALIZER
+
+
+# ファイルの先頭の識別子（形式を変更した場合は末尾の番号を上げる）
+MAGIC = b"JPPOST01"
+
+# ヘッダーの構造
+HEADER = struct.Struct("<8sIIII")
+
+# 郵便番号の先頭3桁の種類
+PREFIX_COUNT = 1000
+
+# KEN_ALL.CSV の列番号
+KEN_ALL_CODE = 2
+KEN_ALL_PREFECTURE = 6
+KEN_ALL_CITY = 7
+KEN_ALL_TOWN = 8
+
+# 町域名ではなく注記として記載されている値
+TOWN_NOTES = ("以下に掲載がない場合",)
+TOWN_NOTE_SUFFIXES = ("の次に番地がくる場合", "の次に番地がくる")
+
+
+class PostalEntry(collections.namedtuple("PostalEntry", ["prefecture", "city", "towns"])):
+    """
+    郵便番号に対応する市区町村と町域の候補
+
+    Attributes:
+        prefecture (str): 都道府県名
+        city (str): 市区町村名（政令指定都市の区、郡を含む）
+        towns (tuple): 町域名の候補（町域を特定できない郵便番号の場合は空のタプル）
+    """
+
+    __slots__ = ()
+
+
+def normalize_code(code):
+    """
+    郵便番号を7桁の整数に変換する
+
+    Args:
+        code (str or int): 郵便番号（「〒123-4567」「１２３４５６７」などの表記も可）
+
+    Returns:
+        int: 7桁の郵便番号を表す整数
+    """
+    if isinstance(code, int):
+        digits = f"{code:07d}"
+    else:
+        digits = DEFAULT_NORMALIZER.normalize(code).strip().lstrip("〒").replace("-", "")
+    if len(digits) != 7 or not digits.isascii() or not digits.isdigit():
+        raise ValueError(f"7桁の郵便番号ではありません: {code!r}")
+    return int(digits)
+
+
+def clean_town(town):
+    """
+    KEN_ALL の町域名から括弧書きの補足や注記を除く
+
+    Args:
+        town (str): KEN_ALL の町域名（複数行に分割された括弧書きは結合済みのもの）
+
+    Returns:
+        str: 町域名（町域を特定できない場合は空文字列）
+    """
+    town = town.split("（", 1)[0]
+    if town in TOWN_NOTES or town.endswith(TOWN_NOTE_SUFFIXES):
+        return ""
+    # 「奥多摩町一円」のように市区町村全域を表す表記（「一円」という町域は除く）
+    if town.endswith("一円") and town != "一円":
+        return ""
+    return town
+
+
+def read_ken_all(path, encoding="cp932"):
+    """
+    KEN_ALL.CSV 形式のファイルを読み込む
+
+    括弧書きが長いために複数行に分割された町域は1行に結合する。
+
+    Args:
+        path (str): CSVファイルのパス
+        encoding (str): 文字コード（日本郵便の配布ファイルは cp932）
+
+    Yields:
+        tuple: (郵便番号, 都道府県名, 市区町村名, 町域名)
+    """
+    with open(path, encoding=encoding, newline="") as f:
+        pending = None
+        for row in csv.reader(f):
+            if not row:
+                continue
+            code = normalize_code(row[KEN_ALL_CODE])
+            if pending is not None and pending[0] == code:
+                # 分割された町域の続きの行
+                pending[3] += row[KEN_ALL_TOWN]
+            else:
+                if pending is not None:
+                    yield tuple(pending)
+                pending = [code, row[KEN_ALL_PREFECTURE], row[KEN_ALL_CITY], row[KEN_ALL_TOWN]]
+            if "（" not in pending[3] or "）" in pending[3]:
+                yield tuple(pending)
+                pending = None
+        if pending is not None:
+            yield tuple(pending)
+
+
+def build_postal_table(source_path, output_path, encoding="cp932"):
+    """
+    KEN_ALL.CSV 形式のファイルから郵便番号テーブルを作成する
+
+    Args:
+        source_path (str): KEN_ALL.CSV 形式のファイルのパス
+        output_path (str): 作成するテーブルのパス（作成が完了してから置き換える）
+        encoding (str): 入力の文字コード
+
+    Returns:
+        int: 郵便番号の件数
+    """
+    # 郵便番号ごとに (都道府県, 市区町村, 町域) を入力の順序で重複なく集める
+    entries_by_code = {}
+    for code, prefecture, city, town in read_ken_all(source_path, encoding):
+        entries = entries_by_code.setdefault(code, [])
+        entry = (prefecture, city, clean_town(town))
+        if entry not in entries:
+            entries.append(entry)
+
+    string_ids = {}
+    blob = bytearray()
+    string_offsets = array.array("I", [0])
+
+    def string_id(value):
+        if value not in string_ids:
+            string_ids[value] = len(string_ids)
+            blob.extend(value.encode("utf-8"))
+            string_offsets.append(len(blob))
+        return string_ids[value]
+
+    codes = array.array("I", sorted(entries_by_code))
+    prefix_index = array.array("I", [0] * (PREFIX_COUNT + 1))
+    entry_offsets = array.array("I", [0])
+    entry_ids = array.array("I")
+    for code in codes:
+        prefix_index[code // 10000 + 1] += 1
+        for prefecture, city, town in entries_by_code[code]:
+            entry_ids.extend((string_id(prefecture), string_id(city), string_id(town)))
+        entry_offsets.append(len(entry_ids) // 3)
+    for prefix in range(PREFIX_COUNT):
+        prefix_index[prefix + 1] += prefix_index[prefix]
+
+    header = HEADER.pack(MAGIC, len(codes), len(entry_ids) // 3, len(string_ids), len(blob))
+    write_table(output_path, header, [prefix_index, codes, entry_offsets, entry_ids, string_offsets], blob)
+    return len(codes)
+
+
+class PostalIndex(MappedTable):
+    """
+    郵便番号テーブルをメモリマップして検索するインデックス
+
+    ファイルは初回の検索時に開く。郵便番号は先頭3桁の索引で範囲を絞ってから二分探索するため、
+    検索にかかる時間はテーブルの大きさにほとんど依存しない。
+    """
+
+    MAGIC = MAGIC
+    HEADER = HEADER
+    DESCRIPTION = "郵便番号テーブル"
+
+    def __len__(self):
+        self._load()
+        return len(self._codes)
+
+    def _open(self, header):
+        code_count, entry_count, string_count, blob_size = header
+        self._prefix_index = self._uint32_section(PREFIX_COUNT + 1)
+        self._codes = self._uint32_section(code_count)
+        self._entry_offsets = self._uint32_section(code_count + 1)
+        self._entries = self._uint32_section(entry_count * 3)
+        self._string_offsets = self._uint32_section(string_count + 1)
+        self._blob = self._bytes_section(blob_size)
+
+    def _close_sections(self):
+        self._prefix_index = self._codes = self._entry_offsets = None
+        self._entries = self._string_offsets = self._blob = None
+
+    def _string(self, string_id):
+        start = self._string_offsets[string_id]
+        return str(self._blob[start:self._string_offsets[string_id + 1]], "utf-8")
+
+    def lookup(self, code):
+        """
+        郵便番号に対応する市区町村と町域の候補を返す
+
+        Args:
+            code (str or int): 郵便番号（「〒123-4567」「1234567」などの表記も可）
+
+        Returns:
+            tuple: PostalEntry のタプル（通常は1件。複数の市区町村にまたがる郵便番号の場合は複数件、
+                テーブルにない場合は空のタプル）
+        """
+        code = normalize_code(code)
+        self._load()
+        prefix = code // 10000
+        codes = self._codes
+        low, high = self._prefix_index[prefix], self._prefix_index[prefix + 1]
+        position = bisect.bisect_left(codes, code, low, high)
+        if position == high or codes[position] != code:
+            return ()
+
+        entries = self._entries
+        towns_by_city = {}
+        for entry in range(self._entry_offsets[position], self._entry_offsets[position + 1]):
+            key = (entries[entry * 3], entries[entry * 3 + 1])
+            towns = towns_by_city.setdefault(key, [])
+            town = self._string(entries[entry * 3 + 2])
+            if town:
+                towns.append(town)
+        return tuple(
+            PostalEntry(self._string(prefecture), self._string(city), tuple(towns))
+            for (prefecture, city), towns in towns_by_city.items()
+        )
+
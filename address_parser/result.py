@@ -0,0 +1,102 @@
+"""
+解析結果を表す型のモジュール
+"""
+from collections.abc import Mapping
+
+
+class ParsedAddress(Mapping):
+    """
+    解析された住所を表す変更不可のオブジェクト
+
+    __slots__ により4つのフィールドのみを保持する。Mapping として振る舞うため、
+    従来の辞書と同じく result["city"] や dict(result) で参照でき、辞書とも比較できる。
+
+    Attributes:
+        prefecture (str): 都道府県名
+        city (str): 市区町村名
+        town_street (str): 町名番地
+        other (str): 建物名・部屋番号など
+    """
+
+    __slots__ = ("_prefecture", "_city", "_town_street", "_other")
+
+    # キー（辞書形式と同じ順序）
+    FIELDS = ("prefecture", "city", "town_street", "other")
+
+    def __init__(self, prefecture="", city="", town_street="", other=""):
+        """
+        ParsedAddressクラスの初期化
+
+        Args:
+            prefecture (str): 都道府県名
+            city (str): 市区町村名
+            town_street (str): 町名番地
+            other (str): 建物名・部屋番号など
+        """
+        self._prefecture = prefecture
+        self._city = city
+        self._town_street = town_street
+        self._other = other
+
+    prefecture = property(lambda self: self._prefecture, doc="都道府県名")
+    city = property(lambda self: self._city, doc="市区町村名")
+    town_street = property(lambda self: self._town_street, doc="町名番地")
+    other = property(lambda self: self._other, doc="建物名・部屋番号など")
+
+    def __getitem__(self, key):
+        if key == "prefecture":
+            return self._prefecture
+        if key == "city":
+            return self._city
+        if key == "town_street":
+            return self._town_street
+        if key == "other":
+            return self._other
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return 4
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def __eq__(self, other):
+        if isinstance(other, ParsedAddress):
+            return self.astuple() == other.astuple()
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self):
+        return hash(self.astuple())
+
+    def __repr__(self):
+        return (f"ParsedAddress(prefecture={self._prefecture!r}, city={self._city!r}, "
+                f"town_street={self._town_street!r}, other={self._other!r})")
+
+    def __reduce__(self):
+        return (self.__class__, self.astuple())
+
+    def astuple(self):
+        """
+        フィールドの値をタプルとして返す
+
+        Returns:
+            tuple: (都道府県名, 市区町村名, 町名番地, 建物名・部屋番号など)
+        """
+        return (self._prefecture, self._city, self._town_street, self._other)
+
+    def to_dict(self):
+        """
+        従来の辞書形式に変換する
+
+        Returns:
+            dict: 解析された住所の構造化データ
+        """
+        return {
+            "prefecture": self._prefecture,
+            "city": self._city,
+            "town_street": self._town_street,
+            "other": self._other,
+        }
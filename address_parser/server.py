@@ -0,0 +1,500 @@
+"""
+住所を解析する HTTP サーバーのモジュール（標準ライブラリの asyncio のみを使用）
+
+1つのパーサー（とそのキャッシュ）を複数のサービスから共有するためのサーバーで、
+同時に届いた要求は AsyncAddressParser で小さなバッチにまとめて解析する。
+HTTP/1.1 の keep-alive に対応し、1つの接続で複数の要求を順に処理する。
+
+エンドポイント:
+    GET  /parse?address=...   1件の住所を解析し、結果を JSON で返す
+    POST /parse               {"address": "..."} を解析し、結果を JSON で返す
+    POST /parse/bulk          NDJSON（1行に1件の住所の文字列または {"address": "..."}）を解析し、
+                              入力と同じ順序で結果を NDJSON で返す（chunked で順に送る）
+    GET  /metrics             要求数・レイテンシ・スループット・バッチ・キャッシュの統計を JSON で返す
+    GET  /health              {"status": "ok"} を返す
+
+使用例:
+    python -m address_parser serve --port 8080 --cache-size 100000
+    curl 'http://127.0.0.1:8080/parse?address=東京都新宿区西新宿1-2-3'
+"""
+import asyncio
+import collections
+import http
+import json
+import sys
+import time
+import urllib.parse
+
+from .aio import AsyncAddressParser
+from .batch import ParseFailure
+from .instrumentation import Histogram
+from .parser import AddressParser
+
+
+# 既定の待ち受けアドレスとポート
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# 要求の本文の既定の上限（バイト）
+DEFAULT_MAX_BODY_SIZE = 64 << 20
+
+# keep-alive の接続で次の要求を待つ既定の秒数
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+# 要求ヘッダーの数の上限
+MAX_HEADERS = 100
+
+# 一括解析の結果を送る単位（行数）
+BULK_FLUSH_LINES = 256
+
+# 統計を取るエンドポイント
+ENDPOINTS = ("parse", "bulk", "metrics", "health", "other")
+
+
+class HTTPError(Exception):
+    """
+    エラーの応答を返す例外
+
+    Attributes:
+        status (int): ステータスコード
+        message (str): 応答の本文に含めるメッセージ
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request(collections.namedtuple("Request", ["method", "path", "query", "version", "headers", "body"])):
+    """
+    HTTP の要求
+
+    Attributes:
+        method (str): メソッド
+        path (str): パス
+        query (dict): クエリ文字列（{名前: 最後の値}）
+        version (str): HTTP のバージョン（例: HTTP/1.1）
+        headers (dict): 小文字のヘッダー名と値
+        body (bytes): 本文
+    """
+
+    __slots__ = ()
+
+    @property
+    def keep_alive(self):
+        """
+        応答の後も接続を維持するかどうか
+        """
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+def result_to_json(result):
+    """
+    解析結果を JSON に変換できる辞書にする（失敗した場合は {"error": ...}）
+    """
+    if isinstance(result, ParseFailure):
+        return {"error": result.error}
+    return dict(result)
+
+
+class ServerMetrics:
+    """
+    サーバーの統計
+
+    要求の処理はすべてイベントループのスレッドで行うため、ロックは使用しない。
+    """
+
+    def __init__(self):
+        """
+        ServerMetricsクラスの初期化
+        """
+        self.started = time.monotonic()
+        self.requests = collections.Counter()
+        self.errors = collections.Counter()
+        self.addresses = 0
+        self.connections = 0
+        self.open_connections = 0
+        self.latency = {endpoint: Histogram() for endpoint in ENDPOINTS}
+
+    def record(self, endpoint, status, elapsed_ns, addresses=0):
+        """
+        1件の要求を記録する
+
+        Args:
+            endpoint (str): エンドポイント（ENDPOINTS のいずれか）
+            status (int): 応答のステータスコード
+            elapsed_ns (int): 要求を読み終えてから応答を送り終えるまでの時間（ナノ秒）
+            addresses (int): 解析した住所の件数
+        """
+        self.requests[endpoint] += 1
+        if status >= 400:
+            self.errors[status] += 1
+        self.addresses += addresses
+        self.latency[endpoint].record(elapsed_ns)
+
+    def snapshot(self, parser=None, async_parser=None):
+        """
+        統計を辞書で返す
+
+        Args:
+            parser (AddressParser): キャッシュの統計を含めるパーサー
+            async_parser (AsyncAddressParser): バッチの統計を含めるパーサー
+
+        Returns:
+            dict: 統計
+        """
+        uptime = time.monotonic() - self.started
+        latency = {}
+        for endpoint, histogram in self.latency.items():
+            if histogram.count:
+                snapshot = histogram.snapshot()
+                del snapshot["buckets"]
+                latency[endpoint] = snapshot
+        metrics = {
+            "uptime_s": uptime,
+            "requests": dict(self.requests),
+            "errors": {str(status): count for status, count in self.errors.items()},
+            "addresses": self.addresses,
+            "addresses_per_s": self.addresses / uptime if uptime else 0.0,
+            "connections": {"total": self.connections, "open": self.open_connections},
+            "latency": latency,
+        }
+        if async_parser is not None:
+            count = async_parser.batch_count
+            metrics["batches"] = {
+                "count": count,
+                "requests": async_parser.batched_requests,
+                "mean_size": async_parser.batched_requests / count if count else 0.0,
+            }
+        if parser is not None and parser.cache is not None:
+            metrics["cache"] = parser.cache_stats()._asdict()
+        return metrics
+
+
+class AddressServer:
+    """
+    住所を解析する HTTP サーバー
+
+    1つのパーサーをすべての接続で共有し、/parse の要求は AsyncAddressParser でバッチにまとめて解析する。
+    """
+
+    def __init__(self, parser=None, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=1, batch_size=64,
+                 batch_delay=0.0, max_body_size=DEFAULT_MAX_BODY_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        AddressServerクラスの初期化
+
+        Args:
+            parser (AddressParser): 解析に使用するパーサー（None の場合は既定のパーサー）
+            host (str): 待ち受けるアドレス
+            port (int): 待ち受けるポート（0の場合は空いているポート）
+            workers (int): 解析するスレッドの数（パーサーとキャッシュはすべてのスレッドで共有する）
+            batch_size (int): 1つのバッチにまとめる要求の最大件数
+            batch_delay (float): バッチに要求が集まるのを待つ秒数
+            max_body_size (int): 要求の本文の上限（バイト）
+            idle_timeout (float): keep-alive の接続で次の要求を待つ秒数
+        """
+        self.parser = parser if parser is not None else AddressParser()
+        self.host = host
+        self.port = port
+        self.max_body_size = max_body_size
+        self.idle_timeout = idle_timeout
+        self.async_parser = AsyncAddressParser(
+            self.parser, workers=workers, batch_size=batch_size, batch_delay=batch_delay
+        )
+        self.metrics = ServerMetrics()
+        self._server = None
+        # 開いている接続（close で閉じる）
+        self._writers = set()
+        # パスと (エンドポイント, 使用できるメソッド, 処理するメソッド)
+        self._routes = {
+            "/parse": ("parse", ("GET", "POST"), self._handle_parse),
+            "/parse/bulk": ("bulk", ("POST",), self._handle_bulk),
+            "/metrics": ("metrics", ("GET",), self._handle_metrics),
+            "/health": ("health", ("GET",), self._handle_health),
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """
+        待ち受けを開始する（port に0を指定した場合は、割り当てられたポートを self.port に設定する）
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        待ち受けを開始し、停止されるまで要求を処理する
+        """
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        """
+        待ち受けを停止し、解析のスレッドを停止する
+        """
+        if self._server is not None:
+            self._server.close()
+            # keep-alive で待機中の接続も閉じる
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.async_parser.aclose()
+
+    async def _handle_connection(self, reader, writer):
+        """
+        1つの接続の要求を、接続が閉じられるまで順に処理する
+        """
+        self.metrics.connections += 1
+        self.metrics.open_connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except HTTPError as e:
+                    await self._write_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                start = time.perf_counter_ns()
+                endpoint, status, addresses = await self._dispatch(request, writer)
+                self.metrics.record(endpoint, status, time.perf_counter_ns() - start, addresses)
+                if not request.keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.metrics.open_connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_request(self, reader):
+        """
+        要求を1件読む（接続が閉じられた場合は None）
+        """
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "要求行が正しくありません")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(431, "ヘッダーが多すぎます")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(411, "本文には Content-Length を指定してください")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Content-Length が正しくありません")
+        if length > self.max_body_size:
+            raise HTTPError(413, f"本文が上限（{self.max_body_size}バイト）を超えています")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        return Request(method.upper(), url.path, query, version, headers, body)
+
+    async def _dispatch(self, request, writer):
+        """
+        要求をエンドポイントに振り分けて応答する
+
+        Returns:
+            tuple: (エンドポイント, ステータスコード, 解析した住所の件数)
+        """
+        keep_alive = request.keep_alive
+        endpoint, methods, handler = self._routes.get(request.path, ("other", None, None))
+        try:
+            if handler is None:
+                raise HTTPError(404, f"{request.path} はありません")
+            if request.method not in methods:
+                raise HTTPError(405, f"{request.path} では {', '.join(methods)} のみ使用できます")
+            status, addresses = await handler(request, writer, keep_alive)
+        except HTTPError as e:
+            await self._write_json(writer, e.status, {"error": e.message}, keep_alive)
+            return endpoint, e.status, 0
+        return endpoint, status, addresses
+
+    async def _handle_parse(self, request, writer, keep_alive):
+        """
+        /parse: 1件の住所を解析する
+        """
+        if request.method == "GET":
+            address = request.query.get("address")
+        else:
+            address = _decode_address(request.body)
+        if not isinstance(address, str):
+            raise HTTPError(400, "住所（address）を文字列で指定してください")
+        try:
+            result = await self.async_parser.aparse(address)
+        except Exception as e:
+            raise HTTPError(422, f"{type(e).__name__}: {e}")
+        await self._write_json(writer, 200, dict(result), keep_alive)
+        return 200, 1
+
+    async def _handle_bulk(self, request, writer, keep_alive):
+        """
+        /parse/bulk: NDJSON の住所を解析し、入力と同じ順序で結果を NDJSON で返す
+
+        形式が正しくない行は {"error": ...} とし、処理は継続する。結果は chunked で順に送る
+        （HTTP/1.0 の場合はすべて解析してから Content-Length を付けて送る）。
+        """
+        try:
+            lines = request.body.decode("utf-8").splitlines()
+        except UnicodeDecodeError:
+            raise HTTPError(400, "本文は UTF-8 で指定してください")
+        errors = {}
+        addresses = []
+        for index, line in enumerate(lines):
+            try:
+                address = _decode_address(line.encode("utf-8"))
+                if not isinstance(address, str):
+                    raise ValueError("住所を文字列で指定してください")
+            except (HTTPError, ValueError) as e:
+                errors[index] = str(e)
+                address = None
+            addresses.append(address)
+
+        chunked = request.version != "HTTP/1.0"
+        if chunked:
+            writer.write(_response_head(200, "application/x-ndjson", keep_alive, chunked=True))
+        buffer = []
+        index = 0
+        async for result in self.async_parser.aparse_stream(addresses):
+            if index in errors:
+                buffer.append({"error": errors[index]})
+            else:
+                buffer.append(result_to_json(result))
+            index += 1
+            if chunked and len(buffer) >= BULK_FLUSH_LINES:
+                await _write_chunk(writer, buffer)
+                buffer = []
+        if chunked:
+            if buffer:
+                await _write_chunk(writer, buffer)
+            writer.write(b"0\r\n\r\n")
+        else:
+            body = _ndjson(buffer)
+            writer.write(_response_head(200, "application/x-ndjson", keep_alive, length=len(body)) + body)
+        await writer.drain()
+        return 200, len(addresses) - len(errors)
+
+    async def _handle_metrics(self, request, writer, keep_alive):
+        """
+        /metrics: 統計を返す
+        """
+        await self._write_json(writer, 200, self.metrics.snapshot(self.parser, self.async_parser), keep_alive)
+        return 200, 0
+
+    async def _handle_health(self, request, writer, keep_alive):
+        """
+        /health: 稼働していることを返す
+        """
+        await self._write_json(writer, 200, {"status": "ok"}, keep_alive)
+        return 200, 0
+
+    async def _write_json(self, writer, status, value, keep_alive):
+        """
+        JSON の応答を送る
+        """
+        body = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        writer.write(_response_head(status, "application/json; charset=utf-8", keep_alive, length=len(body)) + body)
+        await writer.drain()
+
+
+def _decode_address(body):
+    """
+    本文（JSON の文字列または {"address": ...}）から住所を取り出す
+    """
+    try:
+        value = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "本文は JSON で指定してください")
+    if isinstance(value, dict):
+        return value.get("address")
+    return value
+
+
+def _response_head(status, content_type, keep_alive, length=None, chunked=False):
+    """
+    応答のステータス行とヘッダーを作成する
+    """
+    lines = [
+        f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}",
+        f"Content-Type: {content_type}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if chunked:
+        lines.append("Transfer-Encoding: chunked")
+    else:
+        lines.append(f"Content-Length: {length}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _ndjson(values):
+    """
+    JSON の値を1行ずつ NDJSON にする
+    """
+    return "".join(json.dumps(value, ensure_ascii=False) + "\n" for value in values).encode("utf-8")
+
+
+async def _write_chunk(writer, values):
+    """
+    JSON の値を NDJSON にして、chunked の1チャンクとして送る
+    """
+    data = _ndjson(values)
+    writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+    await writer.drain()
+
+
+def serve(parser=None, host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """
+    サーバーを起動し、中断されるまで要求を処理する
+
+    Args:
+        parser (AddressParser): 解析に使用するパーサー
+        host (str): 待ち受けるアドレス
+        port (int): 待ち受けるポート
+        **options: AddressServer に渡すその他の引数
+    """
+    async def run():
+        server = AddressServer(parser, host, port, **options)
+        await server.start()
+        print(f"http://{server.host}:{server.port}/ で待ち受けています", file=sys.stderr, flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
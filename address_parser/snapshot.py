@@ -0,0 +1,440 @@
+"""
+辞書のスナップショットのモジュール
+
+都道府県・市区町村のトライと、郵便番号テーブル・町域テーブル（作成済みの場合）を1つのバイナリファイルに
+まとめておき、Snapshot で読み込む。スナップショットは初回の参照時にメモリマップし、トライは配列のまま
+たどるため、起動時に辞書を読み込んでトライを作成する必要がなく、エントリごとの Python のオブジェクトも
+参照されるまで作成しない。短時間で終了するコマンドや、起動したばかりのワーカーの初回の解析が速くなる。
+
+バイナリ形式（数値はすべてリトルエンディアン）:
+
+    ヘッダー       MAGIC, 形式のバージョン, セクション数, 作成したライブラリのバージョン（16バイト）
+    セクション表   セクション数 × (名前（8バイト）, 開始位置, バイト数)（位置とバイト数は64ビット）
+    セクション     cities（市区町村のトライ）、postal（郵便番号テーブル）、towns（町域テーブル）。
+                  8バイト境界に揃え、postal・towns は build_postal_table・build_town_table の出力をそのまま埋め込む
+
+市区町村のトライのセクション（mapped モジュールの形式）:
+
+    ヘッダー         MUNICIPALITY_MAGIC, 都道府県のトライのノード数, 市区町村のトライのノード数, 文字列数, 文字列データのバイト数
+    各トライ         child_start（ノード数 + 1 個）、labels（ノード数）、values（ノード数）。
+                    ノードは幅優先の順に並べ、ノード i の子は child_start[i] から child_start[i + 1] の手前まで
+                    （文字コードの昇順）。labels は親からの文字の文字コード、values は値の文字列番号 + 1（値がない場合は0）
+    string_offsets  文字列数 + 1 個
+    文字列データ     UTF-8
+"""
+import array
+import atexit
+import bisect
+import os
+import struct
+import tempfile
+import threading
+
+from . import __version__
+from .mapped import MappedTable, write_sections
+from .municipality import MUNICIPALITIES_PATH, PREFECTURE_ALIASES, PREFECTURES, load_municipalities, municipality_keys
+from .postal import PostalIndex
+from .towns import TownIndex
+from .trie import Trie
+
+
+# ファイルの先頭の識別子
+MAGIC = b"JPSNAPSH"
+
+# 形式のバージョン（互換性のない変更をした場合に上げる）
+FORMAT_VERSION = 1
+
+# ヘッダーとセクション表の構造
+HEADER = struct.Struct("<8sII16s")
+SECTION = struct.Struct("<8sQQ")
+
+# セクションの名前
+MUNICIPAL_SECTION = "cities"
+POSTAL_SECTION = "postal"
+TOWNS_SECTION = "towns"
+
+# 市区町村のトライのセクションの識別子とヘッダーの構造
+MUNICIPALITY_MAGIC = b"JPMUNI01"
+MUNICIPALITY_HEADER = struct.Struct("<8sIIII")
+
+# 市区町村のトライで、都道府県名と市区町村名を区切る文字（都道府県が不明な場合は区切り文字から始める）
+_SEPARATOR = "\t"
+
+
+def _flatten_trie(trie, string_ids):
+    """
+    トライを幅優先の順の配列に変換する
+
+    Returns:
+        tuple: (child_start, labels, values) の array.array("I")
+    """
+    child_start = array.array("I")
+    labels = array.array("I", [0])
+    values = array.array("I", [0])
+    nodes = [trie.root]
+    index = 0
+    while index < len(nodes):
+        node = nodes[index]
+        child_start.append(len(nodes))
+        for char in sorted(key for key in node if key is not None):
+            child = node[char]
+            nodes.append(child)
+            labels.append(ord(char))
+            values.append(string_ids.setdefault(child[None], len(string_ids)) + 1 if None in child else 0)
+        index += 1
+    child_start.append(len(nodes))
+    return child_start, labels, values
+
+
+def write_municipality_table(f, municipalities):
+    """
+    都道府県・市区町村のトライをファイルの現在の位置に書き出す
+
+    Args:
+        f (file): バイナリモードで開いたファイル
+        municipalities (list): (都道府県名, 市区町村名) のリスト
+    """
+    # MunicipalityIndex と同じ順序で登録する（同じキーは後から登録したものが優先される）
+    prefecture_trie = Trie()
+    for alias, full_name in PREFECTURE_ALIASES.items():
+        prefecture_trie.insert(alias, full_name)
+    for prefecture in PREFECTURES:
+        prefecture_trie.insert(prefecture, prefecture)
+    city_trie = Trie()
+    for prefecture, name in municipalities:
+        for key in municipality_keys(name):
+            city_trie.insert(prefecture + _SEPARATOR + key, name)
+            city_trie.insert(_SEPARATOR + key, name)
+
+    string_ids = {}
+    prefecture_arrays = _flatten_trie(prefecture_trie, string_ids)
+    city_arrays = _flatten_trie(city_trie, string_ids)
+    string_offsets = array.array("I", [0])
+    blob = bytearray()
+    for string in string_ids:
+        blob.extend(string.encode("utf-8"))
+        string_offsets.append(len(blob))
+
+    header = MUNICIPALITY_HEADER.pack(
+        MUNICIPALITY_MAGIC, len(prefecture_arrays[1]), len(city_arrays[1]), len(string_ids), len(blob)
+    )
+    write_sections(f, header, list(prefecture_arrays) + list(city_arrays) + [string_offsets], bytes(blob))
+
+
+class _FlatTrie:
+    """
+    配列に変換したトライ（メモリマップしたセクションを参照する）
+    """
+
+    __slots__ = ("child_start", "labels", "values")
+
+    def __init__(self, child_start, labels, values):
+        self.child_start = child_start
+        self.labels = labels
+        self.values = values
+
+    def child(self, node, char):
+        """
+        ノードの子のうち、文字 char の子を返す（ない場合は None）
+        """
+        low, high = self.child_start[node], self.child_start[node + 1]
+        if low == high:
+            return None
+        code = ord(char)
+        index = bisect.bisect_left(self.labels, code, low, high)
+        if index == high or self.labels[index] != code:
+            return None
+        return index
+
+    def find(self, key, node=0):
+        """
+        ノードから key をたどった先のノードを返す（ない場合は None）
+        """
+        for char in key:
+            node = self.child(node, char)
+            if node is None:
+                return None
+        return node
+
+    def longest_prefix(self, text, start, node=0):
+        """
+        ノードから text[start:] をたどり、最長一致した値の文字列番号 + 1 と終了位置を返す（ない場合は0）
+        """
+        # 1文字ごとに呼ばれるため、child を展開している
+        child_start, labels, values = self.child_start, self.labels, self.values
+        value, end = 0, start
+        for position in range(start, len(text)):
+            low, high = child_start[node], child_start[node + 1]
+            code = ord(text[position])
+            node = bisect.bisect_left(labels, code, low, high)
+            if node == high or labels[node] != code:
+                break
+            if values[node]:
+                value, end = values[node], position + 1
+        return value, end
+
+    def iter_prefixes(self, text, start, node=0):
+        """
+        ノードから text[start:] をたどり、一致したすべての値の文字列番号 + 1 と終了位置を短い順に列挙する
+        """
+        for position in range(start, len(text)):
+            node = self.child(node, text[position])
+            if node is None:
+                return
+            if self.values[node]:
+                yield self.values[node], position + 1
+
+
+class MappedMunicipalityIndex(MappedTable):
+    """
+    スナップショットの市区町村のトライを参照する、MunicipalityIndex と同じ検索ができるインデックス
+    """
+
+    MAGIC = MUNICIPALITY_MAGIC
+    HEADER = MUNICIPALITY_HEADER
+    DESCRIPTION = "スナップショットの市区町村のトライ"
+
+    def _open(self, header):
+        prefecture_nodes, city_nodes, string_count, blob_size = header
+        self._prefecture_trie = _FlatTrie(
+            self._uint32_section(prefecture_nodes + 1),
+            self._uint32_section(prefecture_nodes),
+            self._uint32_section(prefecture_nodes),
+        )
+        self._city_trie = _FlatTrie(
+            self._uint32_section(city_nodes + 1),
+            self._uint32_section(city_nodes),
+            self._uint32_section(city_nodes),
+        )
+        self._string_offsets = self._uint32_section(string_count + 1)
+        self._blob = self._bytes_section(blob_size)
+        # 参照した文字列と、都道府県ごとの市区町村のトライの開始ノード
+        # （複数のスレッドが同時に登録しても同じ値になるため、ロックは使用しない）
+        self._strings = {}
+        self._city_roots = {}
+
+    def _close_sections(self):
+        self._prefecture_trie = self._city_trie = self._string_offsets = self._blob = None
+
+    def _string(self, value):
+        string = self._strings.get(value)
+        if string is None:
+            start = self._string_offsets[value - 1]
+            string = self._strings[value] = str(self._blob[start:self._string_offsets[value]], "utf-8")
+        return string
+
+    def _city_root(self, prefecture):
+        root = self._city_roots.get(prefecture)
+        if root is None and prefecture not in self._city_roots:
+            root = self._city_roots[prefecture] = self._city_trie.find(prefecture + _SEPARATOR)
+        return root
+
+    def match_prefecture(self, text, start=0):
+        """
+        text[start:] の先頭にある都道府県名を最長一致で検索する（MunicipalityIndex.match_prefecture と同じ）
+        """
+        self._load()
+        value, end = self._prefecture_trie.longest_prefix(text, start)
+        if not value:
+            return "", start
+
+        # 「大阪市北区」のように省略形を含む市区町村名が続く場合は都道府県名とみなさない
+        _, city_end = self._city_trie.longest_prefix(text, start, self._city_root(""))
+        if city_end > end:
+            return "", start
+        return self._string(value), end
+
+    def match_city(self, text, prefecture="", start=0):
+        """
+        text[start:] の先頭にある市区町村名を最長一致で検索する（MunicipalityIndex.match_city と同じ）
+        """
+        self._load()
+        root = self._city_root(prefecture)
+        if root is None:
+            return "", start
+        value, end = self._city_trie.longest_prefix(text, start, root)
+        return (self._string(value) if value else ""), end
+
+    def iter_cities(self, text, prefecture="", start=0):
+        """
+        text[start:] の先頭に一致するすべての市区町村名を短い順に列挙する（MunicipalityIndex.iter_cities と同じ）
+        """
+        self._load()
+        root = self._city_root(prefecture)
+        if root is None:
+            return
+        for value, end in self._city_trie.iter_prefixes(text, start, root):
+            yield self._string(value), end
+
+    def city_prefectures(self, city):
+        """
+        市区町村名が辞書にある都道府県を返す（MunicipalityIndex.city_prefectures と同じ）
+        """
+        self._load()
+        prefectures = []
+        for prefecture in PREFECTURES:
+            root = self._city_root(prefecture)
+            node = self._city_trie.find(city, root) if root is not None else None
+            if node is not None and self._city_trie.values[node] and self._string(self._city_trie.values[node]) == city:
+                prefectures.append(prefecture)
+        return tuple(prefectures)
+
+
+def build_snapshot(output_path, municipalities_path=MUNICIPALITIES_PATH, postal_table=None, town_table=None):
+    """
+    辞書のスナップショットを作成する
+
+    Args:
+        output_path (str): 作成するスナップショットのパス（作成が完了してから置き換える）
+        municipalities_path (str): 市区町村辞書のパス
+        postal_table (str): 埋め込む郵便番号テーブル（build_postal_table で作成したもの）のパス
+        town_table (str): 埋め込む町域テーブル（build_town_table で作成したもの）のパス
+
+    Returns:
+        list: 書き出したセクションの名前のリスト
+    """
+    embedded = [(name, path) for name, path in ((POSTAL_SECTION, postal_table), (TOWNS_SECTION, town_table)) if path]
+    names = [MUNICIPAL_SECTION] + [name for name, _ in embedded]
+    directory_size = HEADER.size + SECTION.size * len(names)
+
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        # セクション表は各セクションを書き出した後で書き込む
+        f.write(b"\0" * directory_size)
+        sections = []
+
+        def write_section(name, write):
+            f.write(b"\0" * (-f.tell() % 8))
+            start = f.tell()
+            write()
+            sections.append(SECTION.pack(name.encode("ascii"), start, f.tell() - start))
+
+        write_section(MUNICIPAL_SECTION, lambda: write_municipality_table(f, load_municipalities(municipalities_path)))
+        for name, path in embedded:
+            with open(path, "rb") as table:
+                write_section(name, lambda: f.write(table.read()))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(names), __version__.encode("ascii")))
+        f.write(b"".join(sections))
+    os.replace(temp_path, output_path)
+    return names
+
+
+class Snapshot:
+    """
+    辞書のスナップショット
+
+    作成時にはセクション表のみを読み込み、各セクションは初回の参照時にメモリマップする。
+    AddressParser(snapshot=...) に指定すると、市区町村の検索にスナップショットのトライを使用し、
+    postal_index・town_index を指定しない場合はスナップショットに埋め込んだテーブルを使用する。
+    pickle した場合はパスのみを受け渡す。
+
+    Attributes:
+        path (str): スナップショットのパス
+        library_version (str): スナップショットを作成したライブラリのバージョン
+        municipality_index (MappedMunicipalityIndex): 都道府県・市区町村のインデックス
+        postal_index (PostalIndex): 郵便番号テーブル（埋め込んでいない場合は None）
+        town_index (TownIndex): 町域テーブル（埋め込んでいない場合は None）
+    """
+
+    def __init__(self, path):
+        """
+        Snapshotクラスの初期化
+
+        Args:
+            path (str): スナップショットのパス
+
+        Raises:
+            ValueError: 形式が正しくない場合、形式のバージョンに対応していない場合、
+                または作成したライブラリのバージョンが使用しているバージョンと異なる場合
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or not header.startswith(MAGIC):
+                raise ValueError(f"スナップショットの形式が正しくありません: {path}")
+            _, version, count, library_version = HEADER.unpack(header)
+            if version != FORMAT_VERSION:
+                raise ValueError(
+                    f"スナップショットの形式のバージョン {version} には対応していません"
+                    f"（対応しているバージョン: {FORMAT_VERSION}）。作成し直してください: {path}"
+                )
+            directory = f.read(SECTION.size * count)
+        self.library_version = library_version.rstrip(b"\0").decode("ascii")
+        if self.library_version != __version__:
+            # 市区町村のトライは同梱の辞書と municipality_keys などの規則から作成するため、
+            # 形式が同じでも別のバージョンで作成したものは解析結果が異なる場合がある
+            raise ValueError(
+                f"スナップショットはバージョン {self.library_version} で作成されています"
+                f"（使用しているバージョン: {__version__}）。作成し直してください: {path}"
+            )
+
+        self.sections = {}
+        for position in range(count):
+            name, start, size = SECTION.unpack_from(directory, position * SECTION.size)
+            self.sections[name.rstrip(b"\0").decode("ascii")] = (start, size)
+        if MUNICIPAL_SECTION not in self.sections:
+            raise ValueError(f"スナップショットに市区町村のトライがありません: {path}")
+
+        self.municipality_index = MappedMunicipalityIndex(path, self.sections[MUNICIPAL_SECTION][0])
+        self.postal_index = self._table(PostalIndex, POSTAL_SECTION)
+        self.town_index = self._table(TownIndex, TOWNS_SECTION)
+
+    def _table(self, table_class, name):
+        if name not in self.sections:
+            return None
+        return table_class(self.path, self.sections[name][0])
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __repr__(self):
+        return f"Snapshot({self.path!r}, sections={list(self.sections)})"
+
+    def close(self):
+        """
+        各セクションのメモリマップを解放する
+        """
+        for table in (self.municipality_index, self.postal_index, self.town_index):
+            if table is not None:
+                table.close()
+
+
+# 同梱の辞書から作成した、ワーカープロセスで共有するスナップショット（get_shared_snapshot の初回呼び出し時に作成）
+_shared_snapshot = None
+_shared_snapshot_lock = threading.Lock()
+
+
+def get_shared_snapshot():
+    """
+    同梱の辞書のスナップショットを一時ファイルに作成して返す（初回呼び出し時に作成し、以降は共有）
+
+    プロセスのプールに渡すパーサーに指定すると、各ワーカーはインデックスを作成せずに同じファイルを
+    メモリマップして参照するため、ワーカー数が増えても辞書のメモリはページキャッシュの1つ分で済む。
+    一時ファイルは作成したプロセスの終了時に削除する。
+
+    Returns:
+        Snapshot: 同梱の辞書のスナップショット
+    """
+    global _shared_snapshot
+    if _shared_snapshot is None:
+        with _shared_snapshot_lock:
+            if _shared_snapshot is None:
+                fd, path = tempfile.mkstemp(prefix="address_parser-", suffix=".snapshot")
+                os.close(fd)
+                build_snapshot(path)
+                _shared_snapshot = Snapshot(path)
+                atexit.register(_remove_shared_snapshot, _shared_snapshot)
+    return _shared_snapshot
+
+
+def _remove_shared_snapshot(snapshot):
+    snapshot.close()
+    try:
+        os.remove(snapshot.path)
+    except OSError:
+        pass
@@ -0,0 +1,125 @@
+"""
+住所の各要素の元の文字列中の位置（スパン）を表す型のモジュール
+
+AddressParser.scan は住所文字列を1回走査して各要素の (開始位置, 終了位置) のみを記録し、
+値（ParsedAddress）は to_parsed などで要求されたときに初めて作成する。
+正規化は1文字から1文字への置換なので、位置は正規化前の入力にもそのまま当てはまる。
+"""
+import bisect
+
+
+class AddressSpans:
+    """
+    住所の各要素の入力中の位置
+
+    位置は入力文字列に対する (開始位置, 終了位置) で、その要素がない場合は None。
+    都道府県の省略形（例: 東京）は、位置は入力中の表記を、値は正式名を指す。
+    郵便番号を除去した結果つながった要素は、位置が郵便番号をまたぐことがある。
+
+    Attributes:
+        text (str): 入力された住所文字列
+        postal_code (tuple): 郵便番号の位置
+        prefecture (tuple): 都道府県の位置
+        city (tuple): 市区町村の位置（郵便番号から補った場合は None）
+        town_street (tuple): 町名番地の位置
+        other (tuple): 建物名・部屋番号などの位置
+    """
+
+    __slots__ = ("text", "postal_code", "prefecture", "city", "town_street", "other",
+                 "_parser", "_values", "_parsed")
+
+    # 位置を持つ要素（入力中の順序）
+    FIELDS = ("postal_code", "prefecture", "city", "town_street", "other")
+
+    def __init__(self, text, spans, parser, values):
+        """
+        AddressSpansクラスの初期化
+
+        Args:
+            text (str): 入力された住所文字列
+            spans (tuple): FIELDS の順の位置
+            parser (AddressParser): 値の作成に使用するパーサー
+            values (tuple): 値の作成に必要な (都道府県名, 市区町村名, 正規化して郵便番号を除去した文字列,
+                その文字列中の市区町村・町名番地・その他の位置)。市区町村名が None の場合は位置から作成する
+        """
+        self.text = text
+        self.postal_code, self.prefecture, self.city, self.town_street, self.other = spans
+        self._parser = parser
+        self._values = values
+        self._parsed = None
+
+    def __repr__(self):
+        spans = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS)
+        return f"AddressSpans({spans})"
+
+    def spans(self):
+        """
+        位置を辞書で返す（位置のない要素を含む）
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def raw(self, field):
+        """
+        要素の入力中の表記（正規化前）を返す
+
+        Args:
+            field (str): FIELDS のいずれか
+
+        Returns:
+            str: 入力中の表記（要素がない場合は空文字列）
+        """
+        span = getattr(self, field)
+        return self.text[span[0]:span[1]] if span else ""
+
+    def to_parsed(self):
+        """
+        値を作成して返す（parse_address の結果と同じ。2回目以降は作成済みの値を返す）
+
+        Returns:
+            ParsedAddress: 解析結果
+        """
+        if self._parsed is None:
+            prefecture, city, cleaned, (city_span, town_street_span, other_span) = self._values
+            if city is None:
+                city = cleaned[city_span[0]:city_span[1]] if city_span else ""
+            town_street = cleaned[town_street_span[0]:town_street_span[1]] if town_street_span else ""
+            other = cleaned[other_span[0]:other_span[1]] if other_span else ""
+            self._parsed = self._parser._normalize_fields(prefecture, city, town_street, other)
+            self._values = None
+        return self._parsed
+
+
+class OffsetMap:
+    """
+    郵便番号を除去した文字列の位置を、除去前の位置に変換する
+    """
+
+    __slots__ = ("_starts", "_shifts")
+
+    def __init__(self, removed):
+        """
+        OffsetMapクラスの初期化
+
+        Args:
+            removed (list): 除去した範囲 (開始位置, 終了位置) のリスト（除去前の位置、昇順）
+        """
+        self._starts = []
+        self._shifts = []
+        shift = 0
+        for start, end in removed:
+            self._starts.append(start - shift)
+            shift += end - start
+            self._shifts.append(shift)
+
+    def span(self, start, end):
+        """
+        除去後の範囲を除去前の範囲に変換する
+
+        除去した位置の直後から始まる範囲は除去した部分の後ろから、
+        除去した位置の直前で終わる範囲は除去した部分の前までとする。
+        """
+        return self._position(start, bisect.bisect_right), self._position(end, bisect.bisect_left)
+
+    def _position(self, position, search):
+        index = search(self._starts, position)
+        return position + (self._shifts[index - 1] if index else 0)
@@ -0,0 +1,147 @@
+"""
+建物名・部屋番号の接尾辞を検索するモジュール
+
+建物名の接尾辞（ビル、マンション、荘 など）と部屋番号の接尾辞（号室、室 など）をまとめて
+Aho-Corasick 法のオートマトンに格納し、住所文字列を1回走査するだけで両方を検出する。
+接尾辞の数が増えても1文字あたりの処理は増えない。
+
+接尾辞の辞書はファイルから読み込むこともできる（load_suffixes を参照）。
+"""
+import collections
+import os
+
+from .municipality import DATA_DIR
+
+
+# 建物名の接尾辞を増やした辞書（既定の接尾辞を含む）
+EXTENDED_SUFFIXES_PATH = os.path.join(DATA_DIR, "extended_suffixes.tsv")
+
+# 接尾辞の種類
+BUILDING = "building"
+ROOM = "room"
+
+
+def load_suffixes(path):
+    """
+    接尾辞の辞書を読み込む
+
+    辞書は「種類<TAB>接尾辞」の TSV で、種類は building（建物名）または room（部屋番号）。
+    #で始まる行は無視する。同じ種類の中では先に書いたものほど優先される。
+
+    Args:
+        path (str): 辞書ファイルのパス
+
+    Returns:
+        tuple: (建物名の接尾辞のタプル, 部屋番号の接尾辞のタプル)
+    """
+    suffixes = {BUILDING: [], ROOM: []}
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            kind, _, suffix = line.partition("\t")
+            if kind not in suffixes or not suffix:
+                raise ValueError(f"接尾辞の辞書の形式が正しくありません: {path}:{line_number}")
+            suffixes[kind].append(suffix)
+    return tuple(suffixes[BUILDING]), tuple(suffixes[ROOM])
+
+
+class SuffixAutomaton:
+    """
+    建物名・部屋番号の接尾辞を1回の走査で検出するオートマトン
+
+    検出結果は接尾辞ごとに正規表現で検索した場合と同じになる。
+    建物名は「1文字以上の文字列 + 接尾辞」、部屋番号は「数字 + 接尾辞」で、複数の接尾辞が見つかった場合は
+    位置にかかわらずリストの先頭にある接尾辞を、同じ接尾辞の中では最初に現れたものを採用する。
+    """
+
+    def __init__(self, building_suffixes, room_suffixes):
+        """
+        SuffixAutomatonクラスの初期化
+
+        Args:
+            building_suffixes (tuple): 建物名の接尾辞（優先する順）
+            room_suffixes (tuple): 部屋番号の接尾辞（優先する順）
+        """
+        self.building_suffixes = tuple(building_suffixes)
+        self.room_suffixes = tuple(room_suffixes)
+
+        # 各状態の遷移と、その状態で一致が確定する接尾辞 (種類, 優先順位, 長さ)
+        self._transitions = [{}]
+        outputs = [[]]
+        for kind, suffixes in ((BUILDING, self.building_suffixes), (ROOM, self.room_suffixes)):
+            for priority, suffix in enumerate(suffixes):
+                state = 0
+                for char in suffix:
+                    next_state = self._transitions[state].get(char)
+                    if next_state is None:
+                        next_state = len(self._transitions)
+                        self._transitions[state][char] = next_state
+                        self._transitions.append({})
+                        outputs.append([])
+                    state = next_state
+                outputs[state].append((kind, priority, len(suffix)))
+
+        # 幅優先で失敗時の遷移先を求め、遷移表を失敗時の遷移を含む完全なものにする
+        # （遷移表にない文字は初期状態に戻る）
+        failures = [0] * len(self._transitions)
+        queue = collections.deque(self._transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions = self._transitions[state]
+            fallback = self._transitions[failures[state]]
+            outputs[state].extend(outputs[failures[state]])
+            for char, next_state in list(transitions.items()):
+                failures[next_state] = fallback.get(char, 0)
+                queue.append(next_state)
+            for char, next_state in fallback.items():
+                transitions.setdefault(char, next_state)
+        self._outputs = [tuple(output) for output in outputs]
+
+    def find(self, text, start=0, end=None):
+        """
+        text[start:end] から建物名と部屋番号を検出する
+
+        Args:
+            text (str): 検索対象の文字列
+            start (int): 検索を開始する位置
+            end (int): 検索を終了する位置（None の場合は末尾）
+
+        Returns:
+            tuple: (建物名の範囲, 部屋番号の範囲)。範囲は text 中の (開始位置, 終了位置) で、
+                見つからない場合は None
+        """
+        if end is None:
+            end = len(text)
+        transitions = self._transitions
+        outputs = self._outputs
+        building = room = None
+        building_priority = len(self.building_suffixes)
+        room_priority = len(self.room_suffixes)
+        # 建物名の開始位置（正規表現の「.」と同じく改行はまたがない）
+        line_start = start
+        state = 0
+        for position in range(start, end):
+            char = text[position]
+            state = transitions[state].get(char, 0)
+            if char == "\n":
+                line_start = position + 1
+            if not outputs[state]:
+                continue
+            for kind, priority, length in outputs[state]:
+                suffix_start = position + 1 - length
+                if kind == BUILDING:
+                    if priority < building_priority and suffix_start > line_start:
+                        building_priority = priority
+                        building = (line_start, position + 1)
+                elif priority < room_priority and suffix_start > start and text[suffix_start - 1].isdecimal():
+                    number_start = suffix_start - 1
+                    while number_start > start and text[number_start - 1].isdecimal():
+                        number_start -= 1
+                    room_priority = priority
+                    room = (number_start, position + 1)
+            if building_priority == 0 and room_priority == 0:
+                # 最優先の接尾辞がどちらも見つかった
+                break
+        return building, room
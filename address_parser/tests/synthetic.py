@@ -0,0 +1,120 @@
+"""
+テストとベンチマーク用の合成住所ジェネレーター
+
+README に記載の住所形式（郵便番号付き、建物名・部屋番号付き、漢数字表記、全角数字・記号、
+政令指定都市の区、郡を含む町村）と、都道府県名の省略・欠落を混在させた住所を、
+シードを固定して再現可能に生成する。市区町村は同梱の市区町村辞書から選ぶ。
+"""
+import random
+
+from address_parser.municipality import PREFECTURE_ALIASES, load_municipalities
+from address_parser.normalizer import ZENKAKU_NUMBERS
+
+
+# 住所形式と出現比率
+FORMATS = (
+    ("standard", 30),        # 東京都新宿区西新宿1-2-3
+    ("postal_code", 10),     # 〒123-4567 東京都新宿区西新宿1-2-3
+    ("building", 20),        # 東京都新宿区西新宿1-2-3 〇〇ビル101号室
+    ("kanji", 10),           # 東京都新宿区西新宿一丁目二番三号
+    ("zenkaku", 10),         # 東京都新宿区西新宿１－２－３
+    ("designated", 10),      # 大阪府大阪市北区梅田1-2-3
+    ("gun", 5),              # 北海道河東郡音更町木野西通1-2-3
+    ("no_prefecture", 3),    # 新宿区西新宿1-2-3
+    ("alias", 2),            # 東京新宿区西新宿1-2-3
+)
+
+# 町名の例
+TOWNS = (
+    "本町", "中央", "栄町", "緑町", "旭町", "幸町", "大手町", "西新宿", "梅田", "錦",
+    "駅前", "寿町", "桜木町", "東町", "南町", "北町", "新町", "元町", "泉町", "若葉",
+)
+
+# 建物名の例
+BUILDINGS = ("〇〇ビル", "グランドマンション", "さくらハイツ", "中央タワー", "緑荘", "サンハウス", "パークレジデンス")
+
+# 漢数字
+KANJI_DIGITS = "一二三四五六七八九"
+
+# 全角に変換するための対応表
+TO_ZENKAKU = str.maketrans({hankaku: zenkaku for zenkaku, hankaku in ZENKAKU_NUMBERS.items()} | {"-": "－", " ": "　"})
+
+
+class AddressGenerator:
+    """
+    シードを固定した合成住所ジェネレーター
+    """
+
+    def __init__(self, seed=0):
+        """
+        AddressGeneratorクラスの初期化
+
+        Args:
+            seed (int): 乱数のシード
+        """
+        self.random = random.Random(seed)
+        municipalities = load_municipalities()
+        self.municipalities = [(p, c) for p, c in municipalities if "郡" not in c or c.startswith("郡")]
+        self.designated = [(p, c) for p, c in municipalities if "市" in c[:-1] and c.endswith("区")]
+        self.gun = [(p, c) for p, c in municipalities if "郡" in c[1:]]
+        self.aliases = {full_name: alias for alias, full_name in PREFECTURE_ALIASES.items()}
+        self.formats = [name for name, _ in FORMATS]
+        self.weights = [weight for _, weight in FORMATS]
+
+    def block(self):
+        """
+        番地（例: 1-2-3）を生成する
+        """
+        r = self.random
+        return f"{r.randint(1, 9)}-{r.randint(1, 30)}-{r.randint(1, 50)}"
+
+    def generate(self):
+        """
+        住所を1件生成する
+
+        Returns:
+            tuple: (住所形式, 住所文字列)
+        """
+        r = self.random
+        fmt = r.choices(self.formats, self.weights)[0]
+        if fmt == "designated":
+            prefecture, city = r.choice(self.designated)
+        elif fmt == "gun":
+            prefecture, city = r.choice(self.gun)
+        elif fmt == "alias":
+            prefecture, city = r.choice([(p, c) for p, c in self.municipalities if p in self.aliases])
+            prefecture = self.aliases[prefecture]
+        else:
+            prefecture, city = r.choice(self.municipalities)
+        if fmt == "no_prefecture":
+            prefecture = ""
+
+        town = r.choice(TOWNS)
+        if fmt == "kanji":
+            street = "".join(f"{r.choice(KANJI_DIGITS)}{unit}" for unit in ("丁目", "番", "号"))
+        else:
+            street = self.block()
+        address = f"{prefecture}{city}{town}{street}"
+
+        if fmt == "postal_code":
+            address = f"〒{r.randint(100, 999)}-{r.randint(0, 9999):04d} {address}"
+        elif fmt == "building":
+            address = f"{address} {r.choice(BUILDINGS)}{r.randint(1, 15)}{r.randint(1, 20):02d}号室"
+        elif fmt == "zenkaku":
+            address = address.translate(TO_ZENKAKU)
+        return fmt, address
+
+
+def generate_addresses(count, seed=0):
+    """
+    合成住所のリストを生成する
+
+    Args:
+        count (int): 件数
+        seed (int): 乱数のシード
+
+    Returns:
+        list: 住所文字列のリスト
+    """
+    generator = AddressGenerator(seed)
+    return [generator.generate()[1] for _ in range(count)]
@@ -0,0 +1,158 @@
+"""
+都道府県・市区町村・町域ごとの集計のテスト
+"""
+
+import collections
+
+import pytest
+from address_parser.aggregate import Aggregation, SpillingCounter, aggregate, aggregation_keys
+from address_parser.cli import main
+from address_parser.parser import AddressParser
+from address_parser.tests.synthetic import generate_addresses
+
+
+ADDRESSES = [
+    "東京都新宿区西新宿1-2-3",
+    "東京都新宿区西新宿２－８－１",
+    "大阪府大阪市北区梅田1-1",
+    "東京都渋谷区道玄坂1-2",
+    "東京都新宿区西新宿一丁目2番3号",
+    None,
+]
+
+
+def test_spilling_counter(tmp_path):
+    """
+    上限を超えたキーを一時ファイルに書き出し、マージした結果が Counter と一致することのテスト
+    """
+    keys = [(f"県{i % 7}", f"市{i % 13}", "町\t名\n") for i in range(500)]
+    expected = collections.Counter(keys)
+    with SpillingCounter(max_keys=10, directory=str(tmp_path)) as counter:
+        for key in keys:
+            counter.add(key)
+        assert counter.spilled > 0
+        assert counter.total == 500
+        items = list(counter.items())
+        # キーの区切りや改行は空白に置き換える
+        assert dict(items) == {(p, c, "町 名 "): n for (p, c, _), n in expected.items()}
+        assert [key for key, _ in items] == sorted(key for key, _ in items)
+        assert len(counter) == len(expected)
+        assert counter.most_common(3) == sorted(dict(items).items(), key=lambda item: (-item[1], item[0]))[:3]
+    assert counter.spilled == 0
+
+    with pytest.raises(ValueError):
+        SpillingCounter(max_keys=0)
+
+
+def test_spilling_counter_runs_bounded(tmp_path):
+    """
+    一時ファイルの数が max_runs に達した場合に1つのファイルにマージすることのテスト
+    """
+    keys = [(f"県{i % 50}", f"市{i}") for i in range(1000)]
+    with SpillingCounter(max_keys=5, directory=str(tmp_path), max_runs=4) as counter:
+        runs = []
+        for key in keys:
+            counter.add(key)
+            runs.append(counter.runs)
+        assert counter.spilled > 100
+        assert max(runs) < 4
+        assert dict(counter.items()) == collections.Counter(keys)
+
+    with pytest.raises(ValueError):
+        SpillingCounter(max_runs=1)
+
+
+def test_spilling_counter_merge():
+    """
+    別のカウンター（一時ファイルを含む）の件数を加えるテスト
+    """
+    first = SpillingCounter(max_keys=2)
+    second = SpillingCounter(max_keys=2)
+    first.update({("a",): 1, ("b",): 2, ("c",): 3})
+    second.update({("b",): 5, ("d",): 1, ("e",): 1})
+    first.merge(second)
+    assert dict(first.items()) == {("a",): 1, ("b",): 7, ("c",): 3, ("d",): 1, ("e",): 1}
+    assert first.total == 13
+    assert first.most_common(1) == [(("b",), 7)]
+
+
+def test_aggregation_keys():
+    """
+    集計の単位ごとのキーのテスト
+    """
+    parser = AddressParser()
+    parsed = parser.parse_address("東京都新宿区西新宿1-2-3 〇〇ビル")
+    assert aggregation_keys(parser, parsed) == {
+        "prefecture": ("東京都",),
+        "city": ("東京都", "新宿区"),
+        "town": ("東京都", "新宿区", "西新宿"),
+    }
+    assert aggregation_keys(parser, parser.parse_address("京都府京都市左京区一乗寺二丁目5"), ("town",)) == {
+        "town": ("京都府", "京都市左京区", "一乗寺"),
+    }
+
+
+def test_aggregate():
+    """
+    住所を解析しながら集計するテスト
+    """
+    with aggregate(ADDRESSES, max_keys=1) as result:
+        assert result.total == 6
+        assert result.parsed == 5
+        assert [failure.index for failure in result.failures] == [5]
+        assert result.top("prefecture") == [(("東京都",), 4), (("大阪府",), 1)]
+        assert result.top("city", 1) == [(("東京都", "新宿区"), 3)]
+        assert result.top("town", 2) == [(("東京都", "新宿区", "西新宿"), 3), (("大阪府", "大阪市北区", "梅田"), 1)]
+        assert result.counters["town"].spilled > 0
+
+    with pytest.raises(ValueError):
+        Aggregation(("street",))
+
+
+@pytest.mark.parametrize("use_threads", [False, True])
+def test_aggregate_with_workers(use_threads):
+    """
+    複数のワーカーで集計しても、1つのワーカーで集計した場合と一致することのテスト
+    """
+    addresses = generate_addresses(2000, seed=9)
+    with aggregate(addresses, max_keys=50) as expected:
+        with aggregate(addresses, workers=2, chunksize=300, use_threads=use_threads) as result:
+            assert result.total == expected.total
+            for level in expected.levels:
+                assert list(result.counters[level].items()) == list(expected.counters[level].items())
+                assert result.top(level, 5) == expected.top(level, 5)
+
+
+def test_aggregation_merge():
+    """
+    別々に集計した結果をマージするテスト
+    """
+    with aggregate(ADDRESSES[:3], levels=("city",)) as first, aggregate(ADDRESSES[3:], levels=("city",)) as second:
+        first.merge(second)
+        assert first.total == 6
+        assert len(first.failures) == 1
+        assert first.top("city") == [
+            (("東京都", "新宿区"), 3), (("大阪府", "大阪市北区"), 1), (("東京都", "渋谷区"), 1)
+        ]
+
+
+def test_aggregate_command(tmp_path, capsys):
+    """
+    aggregate コマンドのテスト
+    """
+    input_path = tmp_path / "export.txt"
+    output_path = tmp_path / "counts.tsv"
+    input_path.write_text("\n".join(ADDRESSES[:5]) + "\n", encoding="utf-8")
+
+    assert main(["aggregate", str(input_path), "--level", "prefecture", "--level", "city", "--top", "1",
+                 "--max-keys", "1", "--temp-dir", str(tmp_path), "-o", str(output_path)]) == 0
+    assert output_path.read_text(encoding="utf-8").splitlines() == [
+        "level\trank\tcount\tshare\tprefecture\tcity\ttown",
+        "prefecture\t1\t4\t0.8000\t東京都\t\t",
+        "prefecture\ttotal\t5\t1.0000\t\t\t",
+        "city\t1\t3\t0.6000\t東京都\t新宿区\t",
+        "city\ttotal\t5\t1.0000\t\t\t",
+    ]
+    assert "5件を集計しました（解析に失敗 0件、prefecture 2種類、city 3種類）" in capsys.readouterr().err
+    # 一時ファイルは残らない
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["counts.tsv", "export.txt"]
@@ -0,0 +1,163 @@
+"""
+asyncio から住所を解析する機能のテスト
+"""
+
+import asyncio
+
+import pytest
+from address_parser.aio import AsyncAddressParser
+from address_parser.batch import ParseFailure
+from address_parser.parser import AddressParser
+
+
+ADDRESSES = [
+    "東京都新宿区西新宿1-2-3",
+    "〒123-4567 東京都新宿区西新宿一丁目２番３号　〇〇ビル101号室",
+    "大阪府大阪市北区梅田1-2-3",
+    "北海道河東郡音更町木野西通1-2-3",
+    "新宿区西新宿1-2-3",
+]
+
+
+def test_aparse_matches_parse_address():
+    """
+    同時に呼び出した aparse の結果が parse_address と一致することをテスト
+    """
+    parser = AddressParser()
+
+    async def run():
+        async with AsyncAddressParser(parser, workers=2, batch_size=4) as async_parser:
+            return await asyncio.gather(*(async_parser.aparse(address) for address in ADDRESSES * 20))
+
+    assert asyncio.run(run()) == [parser.parse_address(address) for address in ADDRESSES * 20]
+
+
+def test_aparse_raises_parse_error():
+    """
+    解析に失敗した場合は parse_address と同じ例外が発生することをテスト
+    """
+    async def run():
+        async with AsyncAddressParser() as async_parser:
+            with pytest.raises(AttributeError):
+                await async_parser.aparse(None)
+            # 失敗した要求は同じバッチの他の要求に影響しない
+            results = await asyncio.gather(
+                async_parser.aparse("東京都新宿区西新宿1-2-3"), async_parser.aparse(None), return_exceptions=True
+            )
+            assert results[0].city == "新宿区"
+            assert isinstance(results[1], AttributeError)
+
+    asyncio.run(run())
+
+
+def test_aparse_after_executor_shutdown():
+    """
+    エグゼキューターに送れない場合は、待たせ続けずに要求を例外で失敗させることをテスト
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(1)
+    executor.shutdown()
+
+    async def run():
+        async with AsyncAddressParser(executor=executor, max_in_flight=1) as async_parser:
+            for _ in range(3):
+                results = await asyncio.wait_for(
+                    asyncio.gather(*(async_parser.aparse(address) for address in ADDRESSES), return_exceptions=True),
+                    timeout=5,
+                )
+                assert all(isinstance(result, RuntimeError) for result in results)
+            # 処理中のバッチの枠は解放されている
+            assert not async_parser._slots.locked()
+
+    asyncio.run(run())
+
+
+def test_aparse_stream_after_executor_shutdown():
+    """
+    エグゼキューターに送れない場合は、aparse_stream が例外を送出し、処理中のバッチの枠を解放することをテスト
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(1)
+    executor.shutdown()
+
+    async def run():
+        async with AsyncAddressParser(executor=executor, max_in_flight=1) as async_parser:
+            for _ in range(2):
+                with pytest.raises(RuntimeError):
+                    await asyncio.wait_for(collect(async_parser.aparse_stream(ADDRESSES)), timeout=5)
+            assert not async_parser._slots.locked()
+
+    async def collect(stream):
+        return [result async for result in stream]
+
+    asyncio.run(run())
+
+
+def test_aparse_backpressure():
+    """
+    待ち行列が上限に達した場合に呼び出し側を待たせることをテスト
+    """
+    async def run():
+        async with AsyncAddressParser(queue_limit=2, batch_size=1, max_in_flight=1) as async_parser:
+            tasks = [asyncio.create_task(async_parser.aparse(address)) for address in ADDRESSES * 4]
+            await asyncio.sleep(0)
+            # 送信待ちの要求は上限を超えない
+            assert async_parser._queue.qsize() <= 2
+            results = await asyncio.gather(*tasks)
+            assert len(results) == len(ADDRESSES) * 4
+
+    asyncio.run(run())
+
+
+def test_aparse_stream():
+    """
+    aparse_stream が同期・非同期のイテラブルを入力と同じ順序で解析することをテスト
+    """
+    parser = AddressParser()
+    addresses = ADDRESSES * 50 + [None]
+    expected = [parser.parse_address(address) for address in addresses[:-1]]
+
+    async def source():
+        for address in addresses:
+            await asyncio.sleep(0)
+            yield address
+
+    async def run(iterable):
+        async with AsyncAddressParser(parser, workers=2, batch_size=16, queue_limit=64) as async_parser:
+            return [result async for result in async_parser.aparse_stream(iterable)]
+
+    for iterable in (addresses, source()):
+        results = asyncio.run(run(iterable))
+        assert results[:-1] == expected
+        assert isinstance(results[-1], ParseFailure)
+        assert results[-1].index == len(addresses) - 1
+
+
+def test_event_loop_stays_responsive():
+    """
+    大量の住所を解析している間もイベントループが他のタスクを処理できることをテスト
+    """
+    async def run():
+        ticks = 0
+        done = False
+
+        async def ticker():
+            nonlocal ticks
+            while not done:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        task = asyncio.create_task(ticker())
+        async with AsyncAddressParser(batch_size=256) as async_parser:
+            count = 0
+            async for _ in async_parser.aparse_stream(ADDRESSES * 2000):
+                count += 1
+        done = True
+        await task
+        return count, ticks
+
+    count, ticks = asyncio.run(run())
+    assert count == len(ADDRESSES) * 2000
+    assert ticks > 1
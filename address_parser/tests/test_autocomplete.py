@@ -0,0 +1,182 @@
+"""
+住所入力の補完のためのインクリメンタルな解析のテスト
+"""
+
+import time
+
+import pytest
+from address_parser.autocomplete import AutocompleteIndex, IncrementalParser, get_default_autocomplete_index
+from address_parser.parser import AddressParser
+from address_parser.tests.synthetic import generate_addresses
+
+
+@pytest.fixture
+def session():
+    return IncrementalParser()
+
+
+def texts(completions):
+    return [completion.text for completion in completions]
+
+
+def test_prefecture_completions(session):
+    """
+    都道府県名の補完のテスト
+    """
+    session.feed("東")
+    completions = session.completions()
+    # 都道府県が市区町村より先に並ぶ
+    assert completions[0].text == "東京都"
+    assert completions[0].kind == "prefecture"
+    assert completions[0].start == 0
+    assert all(completion.kind != "prefecture" for completion in completions[1:])
+
+    session.feed("京都")
+    assert session.prefecture == "東京都"
+    assert "東京都" not in texts(session.completions())
+
+
+def test_city_completions(session):
+    """
+    都道府県名に続く市区町村名の補完のテスト
+    """
+    session.feed("東京都新")
+    completions = session.completions()
+    assert texts(completions) == ["新宿区", "新島村"]
+    assert all(completion.start == 3 and completion.prefecture == "東京都" for completion in completions)
+    assert [completion.kind for completion in completions] == ["ward", "village"]
+
+    session.feed("宿区")
+    assert session.city == "新宿区"
+    assert session.city_end == 6
+    assert session.completions() == []
+
+
+def test_completions_limit_and_weights():
+    """
+    件数の上限と重みによる順位のテスト
+    """
+    municipalities = [("東京都", "新宿区"), ("東京都", "新島村"), ("東京都", "新町")]
+    index = AutocompleteIndex(municipalities, weights={"新町": 10}, top_k=2)
+    session = index.session()
+    session.feed("東京都新")
+    # 種類の順位が優先され、同じ種類の中では重みの大きいものが先になる
+    assert texts(session.completions()) == ["新宿区", "新町"]
+    assert texts(session.completions(limit=1)) == ["新宿区"]
+
+
+def test_gun_omitted_completions(session):
+    """
+    郡名を省略した表記の補完のテスト
+    """
+    session.feed("北海道音")
+    completion = session.completions()[0]
+    assert completion.text == "音更町"
+    assert completion.name == "河東郡音更町"
+    session.feed("更町")
+    assert session.city == "河東郡音更町"
+
+
+def test_prefecture_alias_resolution(session):
+    """
+    都道府県の省略形と、省略形を含む市区町村名の判定のテスト
+    """
+    session.feed("大阪")
+    assert session.prefecture == "大阪府"
+    # 「大阪市」が続く場合は都道府県名とみなさない（parse_address と同じ）
+    session.feed("市北区")
+    assert session.prefecture == ""
+    assert session.city == "大阪市北区"
+
+    session.reset()
+    session.feed("〒160-0023 東京 新宿")
+    assert session.prefecture == "東京都"
+    assert session.completions()[0].start == 13
+
+
+@pytest.mark.parametrize("text, city", [("大阪", "大阪市"), ("京都", "京都市")])
+def test_completions_unique_text(session, text, city):
+    """
+    全国の市区町村名と省略形の都道府県名に続く市区町村名で同じ候補を返さないことのテスト
+    """
+    session.feed(text)
+    completions = session.completions()
+    assert len({(completion.text, completion.prefecture) for completion in completions}) == len(completions)
+    # 順位の高い全国の市区町村名の候補（入力の先頭から置き換える）を残す
+    assert [completion.start for completion in completions if completion.text == city] == [0]
+
+
+def test_same_name_in_different_prefectures(session):
+    """
+    同じ名称の市区町村が複数の都道府県にある場合に、都道府県ごとの候補を返すことのテスト
+    """
+    session.feed("伊達")
+    assert [(completion.text, completion.prefecture) for completion in session.completions()[:2]] == [
+        ("伊達市", "北海道"), ("伊達市", "福島県"),
+    ]
+    session.reset()
+    session.feed("府中")
+    assert [(completion.text, completion.prefecture) for completion in session.completions()] == [
+        ("府中市", "東京都"), ("府中市", "広島県"), ("府中町", "広島県"),
+    ]
+
+
+def test_backspace_and_update(session):
+    """
+    文字の削除と入力欄の値全体による更新のテスト
+    """
+    session.feed("東京都新宿区")
+    session.backspace(3)
+    assert session.text == "東京都"
+    assert session.city == ""
+    assert all(completion.start == 3 for completion in session.completions())
+
+    session.update("東京都新宿区西新宿")
+    assert session.city == "新宿区"
+    session.update("神奈川県横浜")
+    assert session.prefecture == "神奈川県"
+    assert session.city == ""
+    # 全角・半角は正規化して扱う
+    session.update("ＡＢＣ")
+    assert session.text == "ABC"
+    assert session.completions() == []
+
+    session.backspace(10)
+    assert session.text == ""
+    assert session.completions() == []
+
+
+def test_parity_with_parse_address():
+    """
+    1文字ずつ入力した結果の都道府県・市区町村が parse_address と一致することのテスト
+    """
+    parser = AddressParser()
+    index = get_default_autocomplete_index()
+    for address in generate_addresses(300, seed=7):
+        session = index.session()
+        for char in address:
+            session.feed(char)
+        parsed = parser.parse_address(address)
+        assert session.prefecture == parsed.prefecture, address
+        # 辞書にない市区町村（末尾の文字による推定）は補完の対象外
+        if session.city or parsed.city in index.city_names:
+            assert session.city == parsed.city, address
+
+
+def test_keystroke_cost_independent_of_length(session):
+    """
+    1文字あたりの処理時間が入力の長さに依存しないことのテスト
+    """
+    def keystroke_time(prefix_length):
+        session.reset()
+        session.feed("東京都新宿区" + "西" * prefix_length)
+        start = time.perf_counter()
+        for _ in range(200):
+            session.feed("1")
+            session.completions()
+            session.backspace()
+        return time.perf_counter() - start
+
+    short = min(keystroke_time(10) for _ in range(3))
+    long = min(keystroke_time(5000) for _ in range(3))
+    assert long < short * 5
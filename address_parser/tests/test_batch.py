@@ -0,0 +1,134 @@
+"""
+複数の住所をまとめて解析する機能のテスト
+"""
+
+import itertools
+import sys
+
+import pytest
+from address_parser.batch import ParseFailure, free_threading, iter_chunks, map_chunks, share_tables
+from address_parser.instrumentation import ParserStats
+from address_parser.parser import AddressParser
+from address_parser.snapshot import get_shared_snapshot
+
+
+ADDRESSES = [
+    "東京都新宿区西新宿1-2-3",
+    "大阪府大阪市北区梅田1-2-3",
+    "北海道河東郡音更町木野西通1-2-3",
+    "東京都新宿区西新宿１－２－３　〇〇ビル１０１号室",
+]
+
+
+def test_iter_chunks():
+    """
+    イテラブルのチャンク分割のテスト
+    """
+    assert list(iter_chunks(range(5), 2)) == [(0, [0, 1]), (2, [2, 3]), (4, [4])]
+    with pytest.raises(ValueError):
+        list(iter_chunks(range(5), 0))
+
+
+@pytest.mark.parametrize("workers, use_threads", [(1, None), (2, False), (4, True)])
+def test_parse_many_preserves_order(workers, use_threads):
+    """
+    入力と同じ順序で結果が返ることをテスト
+    """
+    parser = AddressParser()
+    addresses = ADDRESSES * 10
+    results = list(parser.parse_many(iter(addresses), workers=workers, chunksize=3, use_threads=use_threads))
+    assert results == [parser.parse_address(address) for address in addresses]
+
+
+@pytest.mark.parametrize("workers, use_threads", [(1, None), (2, False), (4, True)])
+def test_parse_many_reports_failures(workers, use_threads):
+    """
+    失敗したレコードが ParseFailure として報告され、処理が継続することをテスト
+    """
+    parser = AddressParser()
+    addresses = ["東京都新宿区西新宿1-2-3", None, "大阪府大阪市北区梅田1-2-3"]
+    results = list(parser.parse_many(addresses, workers=workers, use_threads=use_threads))
+    assert results[0]["city"] == "新宿区"
+    assert isinstance(results[1], ParseFailure)
+    assert results[1].index == 1
+    assert results[1].address is None
+    assert "AttributeError" in results[1].error
+    assert results[2]["city"] == "大阪市北区"
+
+
+@pytest.mark.parametrize("workers, use_threads", [(1, None), (2, False), (4, True)])
+def test_parse_many_is_lazy(workers, use_threads):
+    """
+    無限のイテラブルでも必要な分だけ読み進めることをテスト
+    """
+    parser = AddressParser()
+    results = parser.parse_many(itertools.cycle(ADDRESSES), workers=workers, chunksize=2, use_threads=use_threads)
+    first = list(itertools.islice(results, 6))
+    results.close()
+    assert [r["city"] for r in first[:4]] == ["新宿区", "大阪市北区", "河東郡音更町", "新宿区"]
+
+
+def test_parse_many_with_threads_shares_parser():
+    """
+    スレッドのプールではパーサーを pickle せず、キャッシュを共有することをテスト
+    """
+    parser = AddressParser(cache_size=100)
+    results = list(parser.parse_many(ADDRESSES * 25, workers=4, chunksize=5, use_threads=True))
+    assert len(results) == 100
+    stats = parser.cache_stats()
+    assert stats.hits + stats.misses == 100
+    assert stats.size == len(ADDRESSES)
+
+
+def _index_type(parser, start, addresses):
+    return type(parser.municipality_index).__name__
+
+
+def test_share_tables():
+    """
+    ワーカープロセスに渡すパーサーが、共有のスナップショットを参照することのテスト
+    """
+    parser = AddressParser(cache_size=10, instrumentation=ParserStats())
+    shared = share_tables(parser)
+    assert shared is not parser
+    assert shared.snapshot is get_shared_snapshot()
+    assert (shared.cache, shared.instrumentation) == (parser.cache, parser.instrumentation)
+    assert [shared.parse_address(address) for address in ADDRESSES] == [
+        AddressParser().parse_address(address) for address in ADDRESSES
+    ]
+    assert shared.stats()["counters"]["parsed"] == len(ADDRESSES)
+    # スナップショットを指定済みのパーサーはそのまま渡す
+    assert share_tables(shared) is shared
+
+
+@pytest.mark.parametrize("shared_tables, index_type", [
+    (True, "MappedMunicipalityIndex"), (False, "MunicipalityIndex"),
+])
+def test_workers_share_tables(shared_tables, index_type):
+    """
+    プロセスのプールの各ワーカーが、共有のスナップショットのインデックスで解析することのテスト
+    """
+    results = map_chunks(AddressParser(), _index_type, ADDRESSES * 4, workers=2, chunksize=2,
+                         use_threads=False, shared_tables=shared_tables)
+    assert set(results) == {index_type}
+
+
+def test_tables_not_shared_by_default():
+    """
+    既定ではプロセスのプールの各ワーカーがインデックスを作成することのテスト
+    """
+    results = map_chunks(AddressParser(), _index_type, ADDRESSES * 4, workers=2, chunksize=2, use_threads=False)
+    assert set(results) == {"MunicipalityIndex"}
+
+
+def test_free_threading(monkeypatch):
+    """
+    GIL が無効かどうかの判定のテスト
+    """
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+    assert free_threading()
+    monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True)
+    assert not free_threading()
+    # 3.12 以前には sys._is_gil_enabled がない
+    monkeypatch.delattr(sys, "_is_gil_enabled")
+    assert not free_threading()
@@ -0,0 +1,93 @@
+"""
+ベンチマーク（合成住所ジェネレーター・回帰判定）のテスト
+"""
+
+import asyncio
+
+from address_parser.parser import AddressParser
+from address_parser.tests.synthetic import AddressGenerator, FORMATS, generate_addresses
+from benchmarks import bench_memory, bench_server, bench_startup
+from benchmarks.bench_parser import compare, run
+
+
+def test_generate_addresses_is_reproducible():
+    """
+    同じシードで同じ住所が生成されることをテスト
+    """
+    assert generate_addresses(50, seed=1) == generate_addresses(50, seed=1)
+    assert generate_addresses(50, seed=1) != generate_addresses(50, seed=2)
+
+
+def test_generator_covers_all_formats():
+    """
+    すべての住所形式が生成され、解析できることをテスト
+    """
+    generator = AddressGenerator(seed=0)
+    parser = AddressParser()
+    seen = set()
+    for _ in range(500):
+        fmt, address = generator.generate()
+        seen.add(fmt)
+        result = parser.parse_address(address)
+        assert result["city"]
+    assert seen == {name for name, _ in FORMATS}
+
+
+def test_compare_detects_regressions():
+    """
+    閾値を超えた悪化のみを回帰と判定することをテスト
+    """
+    baseline = {"addresses_per_sec": 1000.0, "p50_us": 10.0, "p99_us": 50.0}
+    assert compare({"addresses_per_sec": 950.0, "p50_us": 10.5, "p99_us": 40.0}, baseline, 0.1) == []
+    regressions = compare({"addresses_per_sec": 800.0, "p50_us": 12.0, "p99_us": 50.0}, baseline, 0.1)
+    assert [metric for metric, *_ in regressions] == ["addresses_per_sec", "p50_us"]
+
+
+def test_run_reports_stage_breakdown():
+    """
+    ベンチマークの結果に段階ごとの所要時間が含まれることをテスト
+    """
+    result = run(count=200, seed=0, repeat=1)
+    assert result["addresses_per_sec"] > 0
+    assert result["p50_us"] <= result["p99_us"]
+    assert set(result["stages_us"]) == {
+        "extract_prefecture", "extract_city", "extract_town_street", "extract_other", "normalize_address",
+    }
+
+
+def test_startup_benchmark_reports_metrics():
+    """
+    起動時間のベンチマークの結果に import と初回の解析の時間が含まれることをテスト
+    """
+    result = bench_startup.run(repeat=1)
+    for metric, _ in bench_startup.GATED_METRICS:
+        assert result[metric] > 0
+    assert bench_startup.compare(result, result, 0.2, bench_startup.GATED_METRICS) == []
+
+
+def test_server_load_test_reports_metrics():
+    """
+    サーバーの負荷試験の結果にスループット・レイテンシ・バッチの平均件数が含まれることをテスト
+    """
+    addresses = generate_addresses(100, seed=2)
+    with bench_server.start_server() as url:
+        result = asyncio.run(bench_server.load(url, addresses, concurrency=4, requests=10))
+    assert result["requests"] == 40
+    for metric, _ in bench_server.GATED_METRICS:
+        assert result[metric] > 0
+    assert result["mean_batch_size"] >= 1
+    assert result["cache_hit_rate"] is not None
+
+
+def test_worker_memory_report():
+    """
+    ワーカーごとのメモリの計測で、辞書を共有した方がワーカーの USS が小さいことをテスト
+    """
+    addresses = generate_addresses(200, seed=3)
+    shared = bench_memory.measure_workers(addresses, 2, shared_tables=True)
+    per_worker = bench_memory.measure_workers(addresses, 2, shared_tables=False)
+    assert 1 <= shared["measured"] <= 2
+    assert shared["parse_seconds"] > 0 and per_worker["parse_seconds"] > 0
+    if bench_memory.process_memory() is not None:
+        assert shared["uss_mib"] < per_worker["uss_mib"]
+        assert shared["pss_total_mib"] > 0
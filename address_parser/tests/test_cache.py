@@ -0,0 +1,117 @@
+"""
+解析結果のキャッシュのテスト
+"""
+
+import pickle
+import threading
+
+import pytest
+from address_parser.cache import LRUCache
+from address_parser.parser import AddressParser
+
+
+def test_lru_cache_eviction_and_stats():
+    """
+    上限を超えた場合に最も長く参照されていないエントリが破棄されることをテスト
+    """
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # a を最近参照したものにする
+    cache.put("c", 3)           # b が破棄される
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size, stats.maxsize) == (2, 1, 1, 2, 2)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+
+
+def test_lru_cache_rejects_invalid_maxsize():
+    """
+    上限に0以下を指定できないことをテスト
+    """
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+
+def test_lru_cache_pickle():
+    """
+    pickle してもエントリが引き継がれることをテスト
+    """
+    cache = LRUCache(3)
+    cache.put("a", 1)
+    restored = pickle.loads(pickle.dumps(cache))
+    assert restored.get("a") == 1
+    assert restored.maxsize == 3
+
+
+def test_parse_address_with_cache():
+    """
+    キャッシュ使用時も同じ結果を返し、全角・半角の表記違いが同じエントリを共有することをテスト
+    """
+    parser = AddressParser(cache_size=10)
+    uncached = AddressParser()
+
+    for address in ["東京都新宿区西新宿1-2-3", "東京都新宿区西新宿１－２－３", "東京都新宿区西新宿1-2-3"]:
+        assert parser.parse_address(address) == uncached.parse_address(address)
+
+    stats = parser.cache_stats()
+    assert (stats.hits, stats.misses, stats.size) == (2, 1, 1)
+
+
+def test_parse_address_cache_returns_immutable_results():
+    """
+    キャッシュした結果を呼び出し側で変更できないことをテスト
+    """
+    parser = AddressParser(cache_size=10)
+    result = parser.parse_address("東京都新宿区西新宿1-2-3")
+    with pytest.raises((TypeError, AttributeError)):
+        result["city"] = "渋谷区"
+    with pytest.raises(AttributeError):
+        result.city = "渋谷区"
+    assert parser.parse_address("東京都新宿区西新宿1-2-3")["city"] == "新宿区"
+
+
+def test_prewarm(tmp_path):
+    """
+    ファイルから読み込んだ住所でキャッシュを事前登録できることをテスト
+    """
+    path = tmp_path / "frequent.txt"
+    path.write_text("東京都新宿区西新宿1-2-3\n大阪府大阪市北区梅田1-2-3\n\n東京都新宿区西新宿１－２－３\n", encoding="utf-8")
+
+    parser = AddressParser(cache_size=10)
+    with open(path, encoding="utf-8") as f:
+        assert parser.prewarm(f) == 2
+    parser.parse_address("大阪府大阪市北区梅田1-2-3")
+    assert parser.cache_stats().hits == 1
+
+    with pytest.raises(ValueError):
+        AddressParser().prewarm(["東京都新宿区西新宿1-2-3"])
+
+
+def test_cache_shared_across_threads():
+    """
+    複数スレッドから同じパーサーを使用してもキャッシュの統計が整合することをテスト
+    """
+    parser = AddressParser(cache_size=3)
+    addresses = ["東京都新宿区西新宿1-2-%d" % i for i in range(5)]
+    expected = {address: AddressParser().parse_address(address) for address in addresses}
+    errors = []
+
+    def work():
+        for _ in range(200):
+            for address in addresses:
+                if parser.parse_address(address) != expected[address]:
+                    errors.append(address)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = parser.cache_stats()
+    assert not errors
+    assert stats.hits + stats.misses == 4 * 200 * 5
+    assert stats.size <= 3
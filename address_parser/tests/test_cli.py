@@ -0,0 +1,171 @@
+"""
+コマンドラインインターフェースのテスト
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+from address_parser.cli import detect_format, main
+from address_parser.parser import AddressParser
+
+
+def test_detect_format():
+    """
+    拡張子からの入力形式の判定をテスト
+    """
+    assert detect_format("addresses.csv") == "csv"
+    assert detect_format("addresses.TSV") == "tsv"
+    assert detect_format("addresses.jsonl") == "jsonl"
+    assert detect_format("-") == "csv"
+
+
+def test_parse_csv_with_header(tmp_path):
+    """
+    ヘッダー付きCSVの住所列を解析し、結果の列が追加されることをテスト
+    """
+    input_path = tmp_path / "addresses.csv"
+    output_path = tmp_path / "parsed.csv"
+    input_path.write_text(
+        "名前,住所\n山田,東京都新宿区西新宿1-2-3\n鈴木,東京都新宿区西新宿１－２－３　〇〇ビル１０１号室\n",
+        encoding="utf-8",
+    )
+
+    assert main([str(input_path), "--column", "住所", "-o", str(output_path)]) == 0
+    assert output_path.read_text(encoding="utf-8").splitlines() == [
+        "名前,住所,prefecture,city,town_street,other",
+        "山田,東京都新宿区西新宿1-2-3,東京都,新宿区,西新宿1-2-3,",
+        "鈴木,東京都新宿区西新宿１－２－３　〇〇ビル１０１号室,東京都,新宿区,西新宿1-2-3,〇〇ビル101号室",
+    ]
+
+
+@pytest.mark.parametrize("options", [[], ["--threads"]])
+def test_parse_tsv_without_header_with_workers(tmp_path, options):
+    """
+    ヘッダーなしTSVを複数のプロセス・スレッドで解析しても入力順に出力されることをテスト
+    """
+    input_path = tmp_path / "addresses.tsv"
+    output_path = tmp_path / "parsed.tsv"
+    lines = [f"{i}\t大阪府大阪市北区梅田1-2-{i}" for i in range(20)]
+    input_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    assert main(["parse", str(input_path), "--no-header", "-c", "1", "-w", "2", "--chunksize", "3",
+                 "-o", str(output_path)] + options) == 0
+    rows = [line.split("\t") for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert [row[0] for row in rows] == [str(i) for i in range(20)]
+    assert rows[5][2:] == ["大阪府", "大阪市北区", "梅田1-2-5", ""]
+
+
+def test_parse_jsonl(tmp_path):
+    """
+    JSON Linesのレコードに解析結果のキーが追加されることをテスト
+    """
+    input_path = tmp_path / "addresses.jsonl"
+    output_path = tmp_path / "parsed.jsonl"
+    input_path.write_text('{"id": 1, "address": "北海道河東郡音更町木野西通1-2-3"}\n', encoding="utf-8")
+
+    assert main([str(input_path), "-o", str(output_path)]) == 0
+    record = json.loads(output_path.read_text(encoding="utf-8"))
+    assert record == {
+        "id": 1, "address": "北海道河東郡音更町木野西通1-2-3",
+        "prefecture": "北海道", "city": "河東郡音更町", "town_street": "木野西通1-2-3", "other": "",
+    }
+
+
+def test_parse_reports_failures(tmp_path, capsys):
+    """
+    住所がないレコードは空の列を出力し、終了コード1を返すことをテスト
+    """
+    input_path = tmp_path / "addresses.jsonl"
+    output_path = tmp_path / "parsed.jsonl"
+    input_path.write_text('{"id": 1}\n{"id": 2, "address": "東京都新宿区西新宿1-2-3"}\n', encoding="utf-8")
+
+    assert main([str(input_path), "-o", str(output_path)]) == 1
+    records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert records[0]["city"] == ""
+    assert records[1]["city"] == "新宿区"
+    assert "1行目に住所の列がありません: address" in capsys.readouterr().err
+
+    # CSV の列がない行
+    input_path = tmp_path / "addresses.csv"
+    output_path = tmp_path / "parsed.csv"
+    input_path.write_text("id,address\n1,東京都新宿区西新宿1-2-3\n2\n", encoding="utf-8")
+    assert main([str(input_path), "--column", "address", "-o", str(output_path)]) == 1
+    assert output_path.read_text(encoding="utf-8").splitlines()[2] == "2,,,,"
+    err = capsys.readouterr().err
+    assert "3行目に住所の列がありません: address" in err
+    assert "AttributeError" not in err
+
+
+def test_parse_jsonl_invalid_lines(tmp_path, capsys):
+    """
+    JSON として読み込めない行やオブジェクトではない行は行番号とともに報告し、処理を続けることをテスト
+    """
+    input_path = tmp_path / "addresses.jsonl"
+    output_path = tmp_path / "parsed.jsonl"
+    input_path.write_text(
+        '{"id": 1, "address": "東京都新宿区西新宿1-2-3"}\n\n{不正なJSON\n[1, 2]\n{"id": 2, "address": "大阪府大阪市北区梅田1"}\n',
+        encoding="utf-8",
+    )
+
+    assert main([str(input_path), "-o", str(output_path)]) == 1
+    records = [json.loads(line) for line in output_path.read_text(encoding="utf-8").splitlines()]
+    assert [(record["id"], record["city"]) for record in records] == [(1, "新宿区"), (2, "大阪市北区")]
+    err = capsys.readouterr().err
+    assert "3行目を読み込めませんでした: JSON として読み込めません" in err
+    assert "4行目を読み込めませんでした: JSON のオブジェクトではありません: list" in err
+
+
+def test_parse_failure_line_numbers(tmp_path, capsys, monkeypatch):
+    """
+    解析に失敗したレコードを、読み込めない行を含めた入力中の行番号で報告することのテスト
+    """
+    def parse_address(self, address_string):
+        raise ValueError("解析できません")
+
+    monkeypatch.setattr(AddressParser, "parse_address", parse_address)
+    input_path = tmp_path / "addresses.jsonl"
+    input_path.write_text('{不正なJSON\n\n{"address": "架空"}\n', encoding="utf-8")
+    assert main([str(input_path), "-o", str(tmp_path / "parsed.jsonl")]) == 1
+    err = capsys.readouterr().err
+    assert "1行目を読み込めませんでした" in err
+    assert "3行目の解析に失敗しました: ValueError: 解析できません" in err
+
+
+@pytest.mark.parametrize("options, expected", [
+    ([], "キャッシュ: ヒット 1 / ミス 1"),
+    (["--workers", "2", "--threads"], "キャッシュ: ヒット 1 / ミス 1"),
+    (["--workers", "2"], "ワーカープロセスごとのキャッシュの統計は集計できません"),
+])
+def test_parse_cache_stats(tmp_path, capsys, options, expected):
+    """
+    --cache-stats の表示のテスト（ワーカープロセスで解析する場合は統計を表示しない）
+    """
+    input_path = tmp_path / "addresses.txt"
+    input_path.write_text("東京都新宿区西新宿1-2-3\n東京都新宿区西新宿1-2-3\n", encoding="utf-8")
+    assert main([str(input_path), "--no-header", "--cache-size", "10", "--cache-stats", "--chunksize", "2",
+                 "-o", str(tmp_path / "out.tsv")] + options) == 0
+    assert expected in capsys.readouterr().err
+
+
+def test_parse_unknown_column(tmp_path, capsys):
+    """
+    存在しない列名を指定した場合のテスト
+    """
+    input_path = tmp_path / "addresses.csv"
+    input_path.write_text("名前,住所\n", encoding="utf-8")
+    assert main([str(input_path), "-c", "address", "-o", str(tmp_path / "out.csv")]) == 2
+    assert "列が見つかりません" in capsys.readouterr().err
+
+
+def test_module_entry_point_reads_stdin():
+    """
+    python -m address_parser が標準入力から読み込み、標準出力に書き出すことをテスト
+    """
+    completed = subprocess.run(
+        [sys.executable, "-m", "address_parser", "--no-header"],
+        input="東京都新宿区西新宿1-2-3\n".encode("utf-8"),
+        capture_output=True, check=True,
+    )
+    assert completed.stdout.decode("utf-8") == "東京都新宿区西新宿1-2-3,東京都,新宿区,西新宿1-2-3,\n"
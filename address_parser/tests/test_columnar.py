@@ -0,0 +1,91 @@
+"""
+列指向のバッチ出力のテスト
+"""
+
+import pytest
+from address_parser.columnar import ColumnarBatch, StringTable
+from address_parser.parser import AddressParser
+
+
+ADDRESSES = [
+    "東京都新宿区西新宿1-2-3",
+    "大阪府大阪市北区梅田1-2-3",
+    "東京都新宿区西新宿１－２－３　〇〇ビル１０１号室",
+    "新宿区西新宿1-2-3",
+]
+
+
+def test_string_table():
+    """
+    文字列表の符号化・復号のテスト
+    """
+    strings = StringTable(["東京都"])
+    assert strings.encode("") == 0
+    assert strings.encode("東京都") == 1
+    assert strings.encode("新宿区") == 2
+    assert strings.encode("東京都") == 1
+    assert strings.decode(2) == "新宿区"
+    assert len(strings) == 3
+
+
+def test_parse_columnar_round_trip():
+    """
+    列指向のバッチが辞書形式と相互に変換できることをテスト
+    """
+    parser = AddressParser()
+    batch = parser.parse_columnar(ADDRESSES)
+    expected = [parser.parse_address(address) for address in ADDRESSES]
+
+    assert len(batch) == 4
+    assert batch.to_dicts() == expected
+    assert batch[2] == expected[2]
+    assert ColumnarBatch.from_dicts(expected).to_dicts() == expected
+
+
+def test_parse_columnar_dictionary_encoding():
+    """
+    都道府県・市区町村が共通の文字列表で符号化されることをテスト
+    """
+    batch = AddressParser().parse_columnar(ADDRESSES)
+    strings = batch.strings
+
+    assert batch.prefecture_codes.typecode == "I"
+    assert batch.prefecture_codes[0] == batch.prefecture_codes[2]
+    assert batch.prefecture_codes[3] == 0  # 都道府県名なし
+    assert batch.city_codes[0] == batch.city_codes[3] == strings.encode("新宿区")
+    assert batch.column("prefecture") == ["東京都", "大阪府", "東京都", ""]
+    assert batch.column("other") == ["", "", "〇〇ビル101号室", ""]
+    assert memoryview(batch.city_codes).tolist() == list(batch.city_codes)
+
+
+def test_shared_string_table_across_batches():
+    """
+    複数のバッチで文字列表を共有できることをテスト
+    """
+    parser = AddressParser()
+    strings = StringTable()
+    first = parser.parse_columnar(ADDRESSES[:2], strings=strings)
+    second = parser.parse_columnar(ADDRESSES[2:], strings=strings)
+    assert first.prefecture_codes[0] == second.prefecture_codes[0]
+    assert first.strings is second.strings
+
+
+def test_value_counts():
+    """
+    コードによる集計のテスト
+    """
+    batch = AddressParser().parse_columnar(ADDRESSES)
+    assert batch.value_counts("prefecture") == {"東京都": 2, "大阪府": 1, "": 1}
+    assert batch.value_counts("city")["新宿区"] == 3
+    with pytest.raises(KeyError):
+        batch.value_counts("other")
+
+
+def test_parse_columnar_failures():
+    """
+    解析に失敗した行が空文字列となり、failures に記録されることをテスト
+    """
+    batch = AddressParser().parse_columnar(["東京都新宿区西新宿1-2-3", None])
+    assert len(batch) == 2
+    assert batch[1] == {"prefecture": "", "city": "", "town_street": "", "other": ""}
+    assert [failure.index for failure in batch.failures] == [1]
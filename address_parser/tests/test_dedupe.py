@@ -0,0 +1,159 @@
+"""
+住所の正規化キーと重複の集約のテスト
+"""
+
+import pytest
+from address_parser.cli import main
+from address_parser.dedupe import AddressKey, canonical_key, canonical_town_street, dedupe, kanji_to_number
+from address_parser.parser import AddressParser
+from address_parser.result import ParsedAddress
+from address_parser.tests.synthetic import generate_addresses
+from address_parser.towns import TownIndex, write_town_table
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("一", 1),
+    ("十", 10),
+    ("十二", 12),
+    ("二十三", 23),
+    ("十2", 12),
+    ("二十3", 23),
+    ("百五", 105),
+    ("二〇三", 203),
+    ("123", 123),
+])
+def test_kanji_to_number(text, expected):
+    """
+    漢数字の変換のテスト
+    """
+    assert kanji_to_number(text) == expected
+
+
+@pytest.mark.parametrize("town_street, expected", [
+    ("西新宿1-2-3", "西新宿1-2-3"),
+    ("西新宿1丁目2番3号", "西新宿1-2-3"),
+    ("西新宿1丁目2番地3", "西新宿1-2-3"),
+    ("西新宿 1丁目 2-3", "西新宿1-2-3"),
+    ("西新宿一丁目二番三号", "西新宿1-2-3"),
+    ("西新宿二十3番地の4", "西新宿23-4"),
+    ("梅田3丁目", "梅田3"),
+    ("本町1の2", "本町1-2"),
+    # 町名の漢数字は変換しない
+    ("一ツ橋2丁目1番", "一ツ橋2-1"),
+    ("三田1-2-3号", "三田1-2-3"),
+    ("一番町3", "一番町3"),
+    ("二番町1-2", "二番町1-2"),
+    ("麻布十番1-2", "麻布十番1-2"),
+    ("麻布十番二丁目3番", "麻布十番2-3"),
+    ("東一番丁1-2", "東一番丁1-2"),
+])
+def test_canonical_town_street(town_street, expected):
+    """
+    町名番地の正規化のテスト
+    """
+    assert canonical_town_street(town_street) == expected
+
+
+def test_canonical_key():
+    """
+    表記の揺れのある住所が同じ正規化キーになることのテスト
+    """
+    parser = AddressParser()
+    addresses = [
+        "東京都新宿区西新宿1-2-3 〇〇ビル101号室",
+        "東京都新宿区西新宿１－２－３　〇〇ビル　１０１号室",
+        "東京新宿区西新宿一丁目二番三号 〇〇ビル101号室",
+        "〒160-0023 東京都 新宿区 西新宿1丁目2番地3 〇〇ビル 101号室",
+    ]
+    keys = {canonical_key(parser.parse_address(address)) for address in addresses}
+    assert keys == {AddressKey("東京都", "新宿区", "西新宿1-2-3", "〇〇ビル101号室")}
+    assert hash(next(iter(keys))) == hash(("東京都", "新宿区", "西新宿1-2-3", "〇〇ビル101号室"))
+
+    # 番地が異なる住所は別のキーになる
+    assert canonical_key(parser.parse_address("東京都新宿区西新宿1-2-4")) not in keys
+    # 辞書形式の解析結果も受け付ける
+    assert canonical_key(dict(ParsedAddress("東京都", "新宿区", "西新宿1丁目2番3号", ""))).town_street == "西新宿1-2-3"
+
+
+def test_canonical_key_with_town_index(tmp_path):
+    """
+    町域の辞書の町域名で町域名と番地を分けた正規化キーのテスト
+    """
+    path = str(tmp_path / "towns.bin")
+    write_town_table({
+        ("東京都", "千代田区"): {"一番町".encode("utf-8")},
+        ("東京都", "港区"): {"麻布十番".encode("utf-8")},
+        ("東京都", "新宿区"): {"西新宿".encode("utf-8")},
+    }, path)
+    town_index = TownIndex(path)
+    try:
+        parser = AddressParser(town_index=town_index)
+        for parsed, expected in [
+            (ParsedAddress("東京都", "千代田区", "一番町3", ""), "一番町3"),
+            (ParsedAddress("東京都", "港区", "麻布十番一丁目2番3号", ""), "麻布十番1-2-3"),
+            (ParsedAddress("東京都", "新宿区", "西新宿二十3番地の4", ""), "西新宿23-4"),
+        ]:
+            assert canonical_key(parsed, parser).town_street == expected
+        addresses = ["東京都港区麻布十番1-2-3", "東京都港区麻布十番1丁目2番3号"]
+        assert dedupe(addresses, parser=parser).cluster_sizes() == {2: 1}
+    finally:
+        town_index.close()
+
+
+def test_dedupe():
+    """
+    重複の集約とクラスターの件数のテスト
+    """
+    addresses = [
+        "東京都新宿区西新宿1-2-3",
+        "大阪府大阪市北区梅田1-2-3",
+        "東京都新宿区西新宿一丁目2番3号",
+        "東京都新宿区西新宿１－２－３",
+        "大阪府大阪市北区梅田1丁目2番3号",
+        "北海道河東郡音更町木野西通1-2-3",
+        None,
+    ]
+    result = dedupe(addresses, keep_members=True)
+    assert result.total == 7
+    assert len(result) == 3
+    assert [failure.index for failure in result.failures] == [6]
+    assert result.cluster_sizes() == {3: 1, 2: 1, 1: 1}
+
+    duplicates = result.duplicates()
+    assert [(cluster.size, cluster.index, cluster.address) for cluster in duplicates] == [
+        (3, 0, "東京都新宿区西新宿1-2-3"),
+        (2, 1, "大阪府大阪市北区梅田1-2-3"),
+    ]
+    assert duplicates[0].members == [0, 2, 3]
+    assert result.block_sizes()[("東京都", "新宿区")] == 1
+
+
+def test_dedupe_with_workers():
+    """
+    複数プロセスで解析しても同じ結果になることのテスト
+    """
+    addresses = generate_addresses(300, seed=3) * 2
+    expected = dedupe(addresses)
+    result = dedupe(addresses, workers=2, chunksize=50)
+    assert result.total == 600
+    assert result.cluster_sizes() == expected.cluster_sizes()
+    assert all(cluster.size >= 2 for cluster in result.clusters())
+    assert [cluster.index for cluster in result.duplicates()] == [cluster.index for cluster in expected.duplicates()]
+
+
+def test_dedupe_command(tmp_path, capsys):
+    """
+    dedupe コマンドのテスト
+    """
+    input_path = tmp_path / "customers.txt"
+    output_path = tmp_path / "duplicates.tsv"
+    input_path.write_text(
+        "東京都新宿区西新宿1-2-3\n大阪府大阪市北区梅田1-2-3\n東京都新宿区西新宿一丁目2番3号\n", encoding="utf-8"
+    )
+
+    assert main(["dedupe", str(input_path), "-o", str(output_path)]) == 0
+    assert output_path.read_text(encoding="utf-8").splitlines() == [
+        "size\tline\tprefecture\tcity\ttown_street\tother\taddress",
+        "2\t1\t東京都\t新宿区\t西新宿1-2-3\t\t東京都新宿区西新宿1-2-3",
+    ]
+    assert "3件を2件のクラスターにまとめました" in capsys.readouterr().err
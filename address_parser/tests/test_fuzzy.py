@@ -0,0 +1,103 @@
+"""
+市区町村名のあいまい検索のテスト
+"""
+
+import pickle
+
+from address_parser.fuzzy import FuzzyCityMatcher, FuzzyMatch, bounded_levenshtein
+from address_parser.instrumentation import ParserStats
+from address_parser.parser import AddressParser
+
+
+MATCHER = FuzzyCityMatcher()
+
+
+def test_bounded_levenshtein():
+    """
+    上限付き編集距離のテスト
+    """
+    assert bounded_levenshtein("名古屋市", "名古屋市", 2) == 0
+    assert bounded_levenshtein("名古尾市", "名古屋市", 2) == 1
+    assert bounded_levenshtein("横浜市", "横須賀市", 2) == 2
+    assert bounded_levenshtein("横浜市", "横須賀市", 1) == 2  # 上限を超える場合は上限 + 1
+    assert bounded_levenshtein("北区", "北海道札幌市", 2) == 3
+
+
+def test_match_itaiji():
+    """
+    異体字を同一視した照合のテスト
+    """
+    assert MATCHER.match("桧原村本宿1-2-3", "東京都") == FuzzyMatch("檜原村", 3, 0, 1.0)
+    assert MATCHER.match("川﨑市川﨑区駅前1-2") == FuzzyMatch("川崎市川崎区", 6, 0, 1.0)
+    assert MATCHER.match("竜ヶ崎市1-2", "茨城県") == FuzzyMatch("龍ケ崎市", 4, 0, 1.0)
+    # 互換漢字の塚（U+FA10）
+    assert MATCHER.match("宝\ufa10市栄町1-2", "兵庫県") == FuzzyMatch("宝塚市", 3, 0, 1.0)
+
+
+def test_match_typo():
+    """
+    誤字を含む市区町村名の照合のテスト
+    """
+    match = MATCHER.match("名古尾市中区栄1-2-3", "愛知県")
+    assert (match.city, match.end, match.distance) == ("名古屋市中区", 6, 1)
+    assert round(match.score, 3) == 0.833
+    # 都道府県が異なる候補は採用しない
+    assert MATCHER.match("名古尾市中区栄1-2-3", "大阪府") is None
+    # 短い名前では1文字違いでも一致の度合いが下限に届かない（府中市と府中町など）
+    assert MATCHER.match("府中村1-2-3") is None
+    assert MATCHER.match("架空市本町1-2-3") is None
+
+
+def test_match_budget():
+    """
+    時間の予算を使い切った場合に検索を打ち切ることをテスト
+    """
+    matcher = FuzzyCityMatcher(budget_us=0)
+    assert matcher.match("名古尾市中区栄1-2-3", "愛知県") is None
+    assert matcher.timeouts == 1
+    # 異体字の完全一致は予算に関係なく照合する
+    assert matcher.match("桧原村本宿1-2-3", "東京都").city == "檜原村"
+
+    # ロックを除いて pickle し、復元後も打ち切った回数を数える
+    restored = pickle.loads(pickle.dumps(matcher))
+    assert restored.timeouts == 1
+    assert restored.match("名古尾市中区栄1-2-3", "愛知県") is None
+    assert restored.timeouts == 2
+
+
+def test_parser_fuzzy_fallback():
+    """
+    パーサーのあいまい検索による代替のテスト
+    """
+    parser = AddressParser(fuzzy_matcher=MATCHER)
+    assert parser.parse_address("愛知県名古尾市中区栄1-2-3").to_dict() == {
+        "prefecture": "愛知県", "city": "名古屋市中区", "town_street": "栄1-2-3", "other": "",
+    }
+    assert parser.parse_address("東京都西多摩郡桧原村本宿1").city == "西多摩郡檜原村"
+    assert parser.extract_city_span("神奈川県横浜氏中区1-2"[4:], "神奈川県") == ("横浜市中区", 5)
+    # 一致しない場合は従来どおり接尾辞から推定する
+    assert parser.parse_address("東京都架空市本町1-2").city == "架空市"
+
+
+def test_exact_match_skips_fuzzy_matcher():
+    """
+    辞書に完全一致する場合はあいまい検索を行わないことをテスト
+    """
+    class FailingMatcher:
+        def match(self, text, prefecture=""):
+            raise AssertionError("あいまい検索が呼び出されました")
+
+    parser = AddressParser(fuzzy_matcher=FailingMatcher())
+    assert parser.parse_address("東京都新宿区西新宿1-2-3").city == "新宿区"
+
+
+def test_fuzzy_outcome_counter():
+    """
+    あいまい検索で一致した件数が計測されることをテスト
+    """
+    parser = AddressParser(instrumentation=ParserStats(), fuzzy_matcher=MATCHER)
+    parser.parse_address("愛知県名古尾市中区栄1-2-3")
+    parser.parse_address("東京都新宿区西新宿1-2-3")
+    counters = parser.stats()["counters"]
+    assert counters["fuzzy_city"] == 1
+    assert counters["city_fallback"] == 0
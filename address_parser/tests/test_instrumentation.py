@@ -0,0 +1,146 @@
+"""
+段階ごとの計測機能のテスト
+"""
+
+import os
+import pickle
+
+from address_parser.instrumentation import Histogram, Instrumentation, OUTCOMES, ParserStats, STAGES
+from address_parser.parser import AddressParser
+from address_parser.postal import PostalIndex, build_postal_table
+
+
+def test_histogram_percentiles():
+    """
+    ヒストグラムの記録と百分位数の近似のテスト
+    """
+    histogram = Histogram()
+    for elapsed_ns in [100] * 98 + [10_000, 1_000_000]:
+        histogram.record(elapsed_ns)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100
+    assert snapshot["p50_us"] == 0.128  # 100ns を含む区間の上限
+    assert snapshot["p99_us"] == 16.384
+    assert snapshot["max_us"] == 1000.0
+
+
+def test_parser_stats_records_stages_and_outcomes():
+    """
+    段階ごとの所要時間と結果の内訳が集計されることをテスト
+    """
+    stats = ParserStats()
+    parser = AddressParser(instrumentation=stats)
+    for address in [
+        "東京都新宿区西新宿1-2-3",          # 通常
+        "東京新宿区西新宿1-2-3",            # 省略形
+        "新宿区西新宿1-2-3",                # 都道府県名なし
+        "大阪府大阪市北区梅田1-2-3",        # 政令指定都市の区
+        "北海道架空郡架空町1-2-3",          # 郡のパターンで推定
+        "東京都西新宿1-2-3",                # 市区町村なし
+    ]:
+        parser.parse_address(address)
+
+    snapshot = parser.stats()
+    assert set(snapshot["stages"]) == set(STAGES)
+    assert all(stage["count"] == 6 for stage in snapshot["stages"].values())
+    assert snapshot["counters"] == {
+        "parsed": 6, "fast_path": 6, "slow_path": 0, "no_prefecture": 1, "prefecture_alias": 1,
+        "designated_ward": 1, "postal_city": 0, "fuzzy_city": 0, "city_fallback": 0, "gun_fallback": 1, "no_city": 1,
+    }
+    assert set(snapshot["counters"]) == set(OUTCOMES)
+
+
+def test_parser_stats_counts_fast_and_slow_paths():
+    """
+    正規化が不要な入力と必要な入力の件数が集計されることをテスト
+    """
+    parser = AddressParser(instrumentation=ParserStats())
+    for address in ["東京都新宿区西新宿1-2-3", "東京都新宿区西新宿１－２－３", "東京都新宿区西新宿1-2-3 Ａ棟"]:
+        parser.parse_address(address)
+    counters = parser.stats()["counters"]
+    assert (counters["parsed"], counters["fast_path"], counters["slow_path"]) == (3, 1, 2)
+
+
+def test_postal_city_outcome(tmp_path):
+    """
+    郵便番号の候補の市区町村に一致した場合の結果の種類のテスト
+    """
+    path = str(tmp_path / "postal.bin")
+    build_postal_table(os.path.join(os.path.dirname(__file__), "data", "ken_all_sample.csv"), path)
+    postal_index = PostalIndex(path)
+    try:
+        parser = AddressParser(instrumentation=ParserStats(), postal_index=postal_index)
+        parser.parse_address("〒160-0023 東京都新宿区西新宿1-2-3")
+        parser.parse_address("東京都新宿区西新宿1-2-3")
+        snapshot = parser.stats()
+        assert snapshot["counters"]["postal_city"] == 1
+        # 郵便番号の候補に一致した場合は市区町村を抽出しない
+        assert snapshot["stages"]["city"]["count"] == 1
+    finally:
+        postal_index.close()
+
+
+def test_city_outcomes_not_timed():
+    """
+    結果の種類の判定のための市区町村の照合が、段階の所要時間に含まれないことのテスト
+    """
+    class OrderRecorder(ParserStats):
+        def on_stage(self, stage, elapsed_ns):
+            calls.append(("stage", stage))
+            super().on_stage(stage, elapsed_ns)
+
+        def on_outcome(self, outcome):
+            calls.append(("outcome", outcome))
+            super().on_outcome(outcome)
+
+    calls = []
+    AddressParser(instrumentation=OrderRecorder()).parse_address("大阪府大阪市北区梅田1-2-3")
+    # 市区町村の段階の計時が終わってから結果の種類を判定する
+    assert calls.index(("stage", "city")) < calls.index(("outcome", "designated_ward"))
+
+
+def test_instrumentation_does_not_change_results():
+    """
+    計測の有無で解析結果が変わらないことをテスト
+    """
+    address = "〒123-4567 東京都新宿区西新宿一丁目２番３号　〇〇ビル101号室"
+    assert AddressParser(instrumentation=ParserStats()).parse_address(address) == AddressParser().parse_address(address)
+
+
+def test_disabled_instrumentation_leaves_methods_untouched():
+    """
+    計測しない場合はメソッドを差し替えないことをテスト
+    """
+    parser = AddressParser()
+    assert "extract_city" not in vars(parser)
+    assert parser.stats() is None
+
+
+def test_callback_hook():
+    """
+    任意のコールバックで計測結果を受け取れることをテスト
+    """
+    class Recorder(Instrumentation):
+        def __init__(self):
+            self.stages = []
+            self.outcomes = []
+
+        def on_stage(self, stage, elapsed_ns):
+            self.stages.append(stage)
+
+        def on_outcome(self, outcome):
+            self.outcomes.append(outcome)
+
+    recorder = Recorder()
+    AddressParser(instrumentation=recorder).parse_address("東京新宿区西新宿1-2-3")
+    assert recorder.stages == ["normalize", "prefecture", "city", "town_street", "other", "final_normalize"]
+    assert recorder.outcomes == ["parsed", "fast_path", "prefecture_alias"]
+
+
+def test_instrumented_parser_pickle():
+    """
+    計測を有効にしたパーサーを pickle しても計測が継続することをテスト
+    """
+    parser = pickle.loads(pickle.dumps(AddressParser(instrumentation=ParserStats())))
+    parser.parse_address("東京都新宿区西新宿1-2-3")
+    assert parser.stats()["counters"]["parsed"] == 1
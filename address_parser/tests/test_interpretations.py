@@ -0,0 +1,105 @@
+"""
+住所の解釈の候補の列挙のテスト
+"""
+
+import pytest
+from address_parser import interpretations as interpretations_module
+from address_parser.interpretations import REASONS
+from address_parser.parser import AddressParser
+
+
+def candidates(address, parser=None):
+    parser = parser or AddressParser()
+    return [(candidate.parsed.astuple(), candidate.reasons) for candidate in parser.interpretations(address)]
+
+
+def test_first_candidate_is_parse_address():
+    """
+    最初の候補が parse_address の結果と一致することのテスト
+    """
+    parser = AddressParser(cache_size=10)
+    for address in ["東京都新宿区西新宿1-2-3 〇〇ビル", "京都京都市左京区一乗寺1", "架空", ""]:
+        first = next(parser.interpretations(address))
+        assert first.parsed is parser.parse_address(address)
+        assert (first.score, first.reasons) == (1.0, ())
+
+
+def test_alternatives_are_lazy(monkeypatch):
+    """
+    2件目を要求するまで別の読み方の候補を作成しないことのテスト
+    """
+    calls = []
+    alternatives = interpretations_module._alternatives
+
+    def counting(parser, address_string):
+        calls.append(address_string)
+        return alternatives(parser, address_string)
+
+    monkeypatch.setattr(interpretations_module, "_alternatives", counting)
+    generator = AddressParser().interpretations("京都市左京区一乗寺1")
+    next(generator)
+    assert calls == []
+    next(generator)
+    assert calls == ["京都市左京区一乗寺1"]
+
+
+def test_prefecture_alias_and_shorter_city():
+    """
+    都道府県の省略形と、政令指定都市の区を含む市区町村名の別の読み方のテスト
+    """
+    assert candidates("京都京都市左京区一乗寺1") == [
+        (("京都府", "京都市左京区", "一乗寺1", ""), ()),
+        (("京都府", "京都市", "左京区一乗寺1", ""), ("shorter_city",)),
+        (("", "京都京都市", "左京区一乗寺1", ""), ("prefecture_ignored", "city_by_suffix")),
+        (("", "京都京都市左京区", "一乗寺1", ""), ("prefecture_ignored", "city_by_suffix")),
+    ]
+    # 正式名の都道府県名は市区町村名の一部とみなさない
+    assert all("prefecture_ignored" not in reasons for _, reasons in candidates("東京都新宿区西新宿1-2-3"))
+
+
+def test_prefecture_from_city():
+    """
+    都道府県の記載がない場合に、市区町村名から都道府県を補う候補のテスト
+    """
+    results = list(AddressParser().interpretations("府中市宮西町1"))
+    assert [(candidate.parsed.prefecture, candidate.reasons) for candidate in results[:3]] == [
+        ("", ()), ("東京都", ("prefecture_from_city",)), ("広島県", ("prefecture_from_city",)),
+    ]
+    # 複数の都道府県にある市区町村名はスコアを等分する
+    assert results[1].score == results[2].score == pytest.approx(REASONS["prefecture_from_city"] / 2)
+    assert candidates("京都市左京区一乗寺1")[1] == (("京都府", "京都市左京区", "一乗寺1", ""), ("prefecture_from_city",))
+
+
+def test_suffix_character_inside_city():
+    """
+    名前の途中に市・町を含む市区町村を途中で区切った候補のテスト
+    """
+    # 辞書の市区町村名の後ろの町名の「町」では区切らない
+    assert candidates("三重県四日市市諏訪町1-5") == [
+        (("三重県", "四日市市", "諏訪町1-5", ""), ()),
+        (("三重県", "四日市", "市諏訪町1-5", ""), ("city_by_suffix",)),
+    ]
+    # 先頭の文字では区切らない
+    assert candidates("市川市八幡1") == [
+        (("", "市川市", "八幡1", ""), ()),
+        (("千葉県", "市川市", "八幡1", ""), ("prefecture_from_city",)),
+    ]
+    # 辞書にない場合は町名番地の数字の前までにある市・区・町・村で区切る
+    assert candidates("架空町北区1") == [
+        (("", "架空町", "北区1", ""), ()),
+        (("", "架空町北区", "1", ""), ("city_by_suffix",)),
+    ]
+
+
+def test_ranked_and_unique():
+    """
+    候補がスコアの高い順に並び、同じ解析結果を繰り返さないことのテスト
+    """
+    parser = AddressParser()
+    for address in ["〒600-8216 京都京都市下京区東塩小路町1 〇〇ビル", "大阪市北区梅田1-2-3", "北海道余市郡余市町1"]:
+        results = list(parser.interpretations(address))
+        scores = [candidate.score for candidate in results]
+        assert scores == sorted(scores, reverse=True)
+        assert len({candidate.parsed for candidate in results}) == len(results)
+        assert all(set(candidate.reasons) <= set(REASONS) for candidate in results)
+
@@ -0,0 +1,115 @@
+"""
+市区町村インデックスのテスト
+"""
+
+import threading
+
+import pytest
+from address_parser import municipality
+from address_parser.municipality import (
+    PREFECTURES, get_default_index, load_municipalities, municipality_keys
+)
+from address_parser.parser import AddressParser
+from address_parser.trie import Trie
+
+
+def test_trie_longest_prefix():
+    """
+    トライの最長一致検索のテスト
+    """
+    trie = Trie([("大阪市", "a"), ("大阪市北区", "b")])
+    assert trie.longest_prefix("大阪市北区梅田") == ("b", 5)
+    assert trie.longest_prefix("大阪市中央区") == ("a", 3)
+    assert trie.longest_prefix("堺市") == (None, 0)
+    assert list(trie.iter_prefixes("大阪市北区")) == [("a", 3), ("b", 5)]
+    assert "大阪市" in trie and "大阪" not in trie
+    assert len(trie) == 2
+
+
+def test_municipality_dictionary():
+    """
+    同梱の市区町村辞書のテスト
+    """
+    municipalities = load_municipalities()
+    assert len(municipalities) > 1800
+    assert {prefecture for prefecture, _ in municipalities} == set(PREFECTURES)
+    assert ("北海道", "札幌市中央区") in municipalities
+    assert ("北海道", "河東郡音更町") in municipalities
+
+
+def test_municipality_keys():
+    """
+    郡名を省略した検索キーのテスト
+    """
+    assert municipality_keys("河東郡音更町") == ["河東郡音更町", "音更町"]
+    assert municipality_keys("郡山市") == ["郡山市"]
+    assert municipality_keys("大和郡山市") == ["大和郡山市"]
+
+
+def test_match_prefecture_and_city():
+    """
+    都道府県と市区町村の最長一致検索のテスト
+    """
+    index = get_default_index()
+    text = "大阪府大阪市北区梅田1-2-3"
+    prefecture, end = index.match_prefecture(text)
+    assert (prefecture, end) == ("大阪府", 3)
+    assert index.match_city(text, prefecture, end) == ("大阪市北区", 8)
+    assert list(index.iter_cities(text, prefecture, end)) == [("大阪市", 6), ("大阪市北区", 8)]
+    assert list(index.iter_cities(text, "架空県", end)) == []
+    assert index.city_prefectures("府中市") == ("東京都", "広島県")
+    assert index.city_prefectures("余市郡余市町") == ("北海道",)
+    # 郡名を省略した表記は辞書上の市区町村名ではない
+    assert index.city_prefectures("余市町") == ()
+
+
+def test_alias_followed_by_city_name():
+    """
+    省略形の都道府県名から始まる市区町村名を都道府県名とみなさないことをテスト
+    """
+    parser = AddressParser()
+    assert parser.extract_prefecture("大阪市北区梅田1-2-3") == ("", "")
+    assert parser.extract_prefecture("京都京都市中京区烏丸通1-2-3") == ("京都府", "京都")
+
+
+@pytest.mark.parametrize("address, city", [
+    ("三重県四日市市諏訪町1-5", "四日市市"),
+    ("東京都東村山市本町1-2-3", "東村山市"),
+    ("東京都武蔵村山市本町1-1-1", "武蔵村山市"),
+    ("広島県廿日市市下平良1-11-1", "廿日市市"),
+    ("新潟県十日町市千歳町3-3", "十日町市"),
+    ("石川県野々市市三納1-1", "野々市市"),
+    ("千葉県市川市八幡1-1-1", "市川市"),
+    ("東京都町田市森野2-2-22", "町田市"),
+    ("北海道音更町木野西通1-2-3", "音更町"),
+    ("静岡県浜松市中央区元城町103-2", "浜松市中央区"),
+])
+def test_city_with_suffix_character_inside(address, city):
+    """
+    名前の途中に市区町村の接尾辞を含む市区町村のテスト
+    """
+    parser = AddressParser()
+    assert parser.parse_address(address)["city"] == city
+
+
+def test_default_index_built_once(monkeypatch):
+    """
+    複数のスレッドから同時に呼び出しても、既定のインデックスを1回だけ作成することのテスト
+    """
+    built = []
+
+    class CountingIndex(municipality.MunicipalityIndex):
+        def __init__(self, *args):
+            built.append(self)
+            super().__init__(*args)
+
+    monkeypatch.setattr(municipality, "MunicipalityIndex", CountingIndex)
+    monkeypatch.setattr(municipality, "_default_index", None)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_default_index())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert all(index is built[0] for index in results)
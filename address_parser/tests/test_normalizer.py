@@ -0,0 +1,116 @@
+"""
+Normalizerクラスのテスト
+"""
+
+import random
+
+import pytest
+from address_parser.normalizer import DEFAULT_NORMALIZER, Normalizer, ZENKAKU_NUMBERS, ZENKAKU_SYMBOLS
+from address_parser.parser import AddressParser
+from address_parser.tests.synthetic import generate_addresses
+
+
+class TranslatingNormalizer(Normalizer):
+    """
+    正規化済みかどうかに関係なく、常に変換するノーマライザー（比較用）
+    """
+
+    def normalize(self, text):
+        return text.translate(self.table)
+
+
+class TranslatingParser(AddressParser):
+    """
+    常に変換するノーマライザーを使用するパーサー（比較用）
+    """
+
+    normalizer = TranslatingNormalizer(DEFAULT_NORMALIZER.mapping)
+
+
+def test_normalize_zenkaku_numbers_and_symbols():
+    """
+    全角数字・記号が1回の変換で半角になることをテスト
+    """
+    assert DEFAULT_NORMALIZER.normalize("西新宿１－２－３　〇〇ビル１０１号室") == "西新宿1-2-3 〇〇ビル101号室"
+
+
+def test_normalize_hyphen_variants_and_alphabets():
+    """
+    ハイフンの異体字と全角英字の変換をテスト
+    """
+    assert DEFAULT_NORMALIZER.normalize("1‐2−3–4—5―6") == "1-2-3-4-5-6"
+    assert DEFAULT_NORMALIZER.normalize("Ａ棟ｂ") == "A棟b"
+
+
+def test_normalize_keeps_length():
+    """
+    正規化の前後で文字列の長さが変わらないことをテスト
+    """
+    text = "〒１２３－４５６７　東京都新宿区西新宿一丁目２番３号　ＡＢＣビル"
+    assert len(DEFAULT_NORMALIZER.normalize(text)) == len(text)
+
+
+def test_normalize_matches_replace_loops():
+    """
+    従来の str.replace ループと同じ結果になることをテスト
+    """
+    text = "".join(ZENKAKU_NUMBERS) + "".join(ZENKAKU_SYMBOLS) + "東京都"
+    expected = text
+    for zenkaku, hankaku in {**ZENKAKU_NUMBERS, **ZENKAKU_SYMBOLS}.items():
+        expected = expected.replace(zenkaku, hankaku)
+    assert DEFAULT_NORMALIZER.normalize(text) == expected
+
+
+def test_normalizer_rejects_multi_character_mapping():
+    """
+    1文字同士でない変換マッピングを拒否することをテスト
+    """
+    with pytest.raises(ValueError):
+        Normalizer({"丁目": "-"})
+
+
+def test_normalizer_shared_across_parsers():
+    """
+    ノーマライザーがパーサーのインスタンス間で共有されることをテスト
+    """
+    assert AddressParser().normalizer is AddressParser().normalizer
+
+
+def test_normalized_text_is_returned_as_is():
+    """
+    変換対象の文字を含まない文字列は変換せずにそのまま返すことをテスト
+    """
+    text = "東京都新宿区西新宿1-2-3 〇〇ビル101号室"
+    assert DEFAULT_NORMALIZER.is_normalized(text)
+    assert DEFAULT_NORMALIZER.normalize(text) is text
+    assert not DEFAULT_NORMALIZER.is_normalized("西新宿１-2-3")
+    assert not DEFAULT_NORMALIZER.is_normalized("〇〇タワー")  # 長音符もハイフンに変換する
+    assert Normalizer().normalize("１") == "１"
+    with pytest.raises(AttributeError):
+        DEFAULT_NORMALIZER.normalize(None)
+
+
+def test_fast_path_matches_translation():
+    """
+    変換を省略した場合と常に変換した場合で、正規化と解析の結果が一致することの差分テスト
+    """
+    rng = random.Random(7)
+    sources = list(DEFAULT_NORMALIZER.mapping)
+    texts = []
+    for address in generate_addresses(500, seed=21):
+        texts.append(address)
+        # 変換対象の文字をランダムな位置に埋め込んだもの
+        chars = list(address)
+        for _ in range(rng.randrange(1, 4)):
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(sources))
+        texts.append("".join(chars))
+        texts.append(TranslatingParser.normalizer.normalize(address))
+
+    fast = AddressParser()
+    slow = TranslatingParser()
+    for text in texts:
+        expected = text.translate(DEFAULT_NORMALIZER.table)
+        assert DEFAULT_NORMALIZER.normalize(text) == expected
+        assert DEFAULT_NORMALIZER.is_normalized(text) == (expected == text)
+        assert fast.parse_address(text) == slow.parse_address(text), text
+        assert fast.scan(text).to_parsed() == slow.parse_address(text), text
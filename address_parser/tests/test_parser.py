@@ -2,8 +2,17 @@
 AddressParserクラスのテスト
 """
 
+import random
+import sys
+import threading
+from collections.abc import Mapping
+
 import pytest
+from address_parser.fuzzy import FuzzyCityMatcher
+from address_parser.instrumentation import ParserStats
 from address_parser.parser import AddressParser
+from address_parser.result import ParsedAddress
+from address_parser.tests.synthetic import generate_addresses
 
 
 def test_address_parser_initialization():
@@ -12,10 +21,23 @@ def test_address_parser_initialization():
     """
     parser = AddressParser()
     assert isinstance(parser, AddressParser)
-    assert isinstance(parser.prefectures, list)
+    assert isinstance(parser.prefectures, tuple)
     assert len(parser.prefectures) == 47  # 47都道府県
 
 
+def test_address_parser_shares_tables():
+    """
+    テーブル類がインスタンス間で共有され、変更できないことをテスト
+    """
+    parser1 = AddressParser()
+    parser2 = AddressParser()
+    assert parser1.prefectures is parser2.prefectures
+    assert parser1.kanji_numbers is parser2.kanji_numbers
+    assert parser1.municipality_index is parser2.municipality_index
+    with pytest.raises(TypeError):
+        parser1.prefecture_aliases["神奈川"] = "神奈川県"
+
+
 def test_parse_address_method():
     """
     parse_addressメソッドが呼び出せることをテスト
@@ -23,7 +45,8 @@ def test_parse_address_method():
     parser = AddressParser()
     result = parser.parse_address("東京都新宿区西新宿1-2-3")
     
-    assert isinstance(result, dict)
+    assert isinstance(result, ParsedAddress)
+    assert isinstance(result, Mapping)
     assert "prefecture" in result
     assert "city" in result
     assert "town_street" in result
@@ -353,4 +376,75 @@ def test_address_with_grid_pattern_sapporo():
     assert result["prefecture"] == "北海道"
     assert result["city"] == "札幌市中央区"
     assert result["town_street"] == "北1条西2丁目5番地"
-    assert result["other"] == "" 
\ No newline at end of file
+    assert result["other"] == "" 
+
+
+def test_parser_is_immutable_after_construction():
+    """
+    作成後のパーサーの属性を変更できないことのテスト
+    """
+    parser = AddressParser(cache_size=10)
+    with pytest.raises(AttributeError):
+        parser.cache = None
+    with pytest.raises(AttributeError):
+        parser.building_suffixes = ("ビル",)
+    with pytest.raises(AttributeError):
+        del parser.postal_index
+    assert parser.cache is not None
+
+    # サブクラスはクラス属性の上書きで対象を変更する
+    class TowerParser(AddressParser):
+        building_suffixes = ("タワー",)
+
+    assert TowerParser().extract_other("〇〇タワー", "", "", "") == "〇〇タワー"
+
+
+def test_parser_shared_across_threads():
+    """
+    1つのパーサーを複数のスレッドで同時に使用しても、1スレッドで解析した場合と結果が一致することのテスト
+    """
+    addresses = generate_addresses(400, seed=5) + ["東京都新宿区西新宿1-2-3 〇〇ビル101号室", "東京都新宿区西新宿１－２－３"]
+    expected = {address: AddressParser().parse_address(address) for address in addresses}
+
+    # キャッシュ（破棄が起きる大きさ）・計測・あいまい検索を有効にし、共有する状態をすべて使用する
+    stats = ParserStats()
+    parser = AddressParser(cache_size=50, instrumentation=stats, fuzzy_matcher=FuzzyCityMatcher())
+    threads_count = 8
+    rounds = 3
+    barrier = threading.Barrier(threads_count)
+    mismatches = []
+    errors = []
+
+    def work(seed):
+        order = addresses * rounds
+        random.Random(seed).shuffle(order)
+        try:
+            barrier.wait()
+            for address in order:
+                if parser.parse_address(address) != expected[address]:
+                    mismatches.append(address)
+                if parser.scan(address).to_parsed() != expected[address]:
+                    mismatches.append(address)
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    # スレッドの切り替えを頻繁に起こす
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=work, args=(seed,)) for seed in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert mismatches == []
+    # 計測の件数は失われない
+    total = threads_count * rounds * len(addresses)
+    assert stats.snapshot()["counters"]["parsed"] == total
+    cache_stats = parser.cache_stats()
+    assert cache_stats.hits + cache_stats.misses == total
+    assert cache_stats.size <= 50
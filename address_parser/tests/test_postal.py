@@ -0,0 +1,130 @@
+"""
+郵便番号インデックスのテスト
+"""
+
+import os
+import pickle
+
+import pytest
+from address_parser.cli import main
+from address_parser.parser import AddressParser
+from address_parser.postal import PostalEntry, PostalIndex, build_postal_table, clean_town, normalize_code
+
+
+KEN_ALL_SAMPLE = os.path.join(os.path.dirname(__file__), "data", "ken_all_sample.csv")
+
+
+@pytest.fixture
+def postal_index(tmp_path):
+    path = str(tmp_path / "postal.bin")
+    assert build_postal_table(KEN_ALL_SAMPLE, path) == 17
+    index = PostalIndex(path)
+    yield index
+    index.close()
+
+
+def test_normalize_code():
+    """
+    郵便番号の表記の正規化のテスト
+    """
+    assert normalize_code("〒160-0023") == 1600023
+    assert normalize_code("１６０００２３") == 1600023
+    assert normalize_code(600000) == 600000
+    with pytest.raises(ValueError):
+        normalize_code("160-002")
+
+
+def test_clean_town():
+    """
+    町域名の括弧書きと注記の除去のテスト
+    """
+    assert clean_town("西新宿（次のビルを除く）") == "西新宿"
+    assert clean_town("以下に掲載がない場合") == ""
+    assert clean_town("奥多摩町一円") == ""
+    assert clean_town("一円") == "一円"
+
+
+def test_lookup(postal_index):
+    """
+    郵便番号の検索のテスト
+    """
+    assert postal_index.lookup("160-0023") == (PostalEntry("東京都", "新宿区", ("西新宿",)),)
+    assert postal_index.lookup("〒163-6090") == (PostalEntry("東京都", "新宿区", ("西新宿新宿三井ビル",)),)
+    assert postal_index.lookup("0800101") == (PostalEntry("北海道", "河東郡音更町", ("大通",)),)
+    # 町域を特定できない郵便番号
+    assert postal_index.lookup("060-0000") == (PostalEntry("北海道", "札幌市中央区", ()),)
+    # 複数行に分割された町域
+    assert postal_index.lookup("064-0941") == (PostalEntry("北海道", "札幌市中央区", ("旭ケ丘",)),)
+    # 複数の町域・市区町村にまたがる郵便番号
+    assert postal_index.lookup("530-0002") == (PostalEntry("大阪府", "大阪市北区", ("曾根崎新地", "曾根崎")),)
+    assert postal_index.lookup("452-0961") == (
+        PostalEntry("愛知県", "清須市", ("春日",)), PostalEntry("愛知県", "北名古屋市", ("春日",)),
+    )
+    # テーブルにない郵便番号（先頭3桁が同じもの・異なるもの）
+    assert postal_index.lookup("160-0024") == ()
+    assert postal_index.lookup("999-9999") == ()
+    assert len(postal_index) == 17
+
+
+def test_lazy_load_and_pickle(postal_index):
+    """
+    初回検索時まで開かないこと、pickle してもパスから開き直せることをテスト
+    """
+    assert postal_index._mmap is None
+    restored = pickle.loads(pickle.dumps(postal_index))
+    assert restored.lookup("100-0001")[0].city == "千代田区"
+    restored.close()
+    assert restored._mmap is None
+
+
+def test_invalid_table(tmp_path):
+    """
+    形式の異なるファイルを開いた場合のテスト
+    """
+    path = tmp_path / "invalid.bin"
+    path.write_bytes(b"not a postal table")
+    with pytest.raises(ValueError):
+        PostalIndex(str(path)).lookup("100-0001")
+
+
+def test_parser_with_postal_index(postal_index):
+    """
+    郵便番号による都道府県・市区町村の照合と補完のテスト
+    """
+    parser = AddressParser(postal_index=postal_index)
+    # 都道府県・市区町村の記載がない住所を郵便番号から補う
+    assert parser.parse_address("〒160-0023 西新宿1-2-3").to_dict() == {
+        "prefecture": "東京都", "city": "新宿区", "town_street": "西新宿1-2-3", "other": "",
+    }
+    # 都道府県の記載がない住所
+    assert parser.parse_address("〒080-0101 音更町大通1-2-3").to_dict() == {
+        "prefecture": "北海道", "city": "音更町", "town_street": "大通1-2-3", "other": "",
+    }
+    # 記載と郵便番号が一致する場合は同じ結果になる
+    address = "〒530-0001 大阪府大阪市北区梅田1-2-3 〇〇ビル101号室"
+    assert parser.parse_address(address) == AddressParser().parse_address(address)
+    # 記載と郵便番号が食い違う場合は記載を優先する
+    assert parser.parse_address("〒160-0023 大阪府大阪市北区梅田1-2-3").city == "大阪市北区"
+    # 市区町村が1つに定まらない郵便番号では補わない
+    assert parser.parse_address("〒452-0961 春日1-2-3").city == ""
+    # 位置を返す走査でも同じ値になる
+    for address in ("〒160-0023 西新宿1-2-3", "〒080-0101 音更町大通1-2-3", "〒452-0961 春日1-2-3"):
+        assert parser.scan(address).to_parsed() == parser.parse_address(address)
+    assert parser.scan("〒160-0023 西新宿1-2-3").city is None
+    # テーブルにない郵便番号は除去するのみ
+    assert parser.parse_address("〒999-9999 東京都新宿区西新宿1-2-3").city == "新宿区"
+
+
+def test_build_postal_command(tmp_path, capsys):
+    """
+    build-postal コマンドと parse コマンドの --postal-index のテスト
+    """
+    table = str(tmp_path / "postal.bin")
+    assert main(["build-postal", KEN_ALL_SAMPLE, "-o", table]) == 0
+    assert "17件" in capsys.readouterr().err
+
+    source = tmp_path / "addresses.csv"
+    source.write_text("住所\n〒160-0023 西新宿1-2-3\n", encoding="utf-8")
+    output = tmp_path / "parsed.csv"
+    assert main([str(source), "-c", "住所", "-o", str(output), "--postal-index", table]) == 0
+    assert output.read_text(encoding="utf-8").splitlines()[1] == "〒160-0023 西新宿1-2-3,東京都,新宿区,西新宿1-2-3,"
@@ -0,0 +1,68 @@
+"""
+ParsedAddressクラスのテスト
+"""
+
+import pickle
+
+import pytest
+from address_parser.parser import AddressParser
+from address_parser.result import ParsedAddress
+
+
+def test_parsed_address_mapping_compatibility():
+    """
+    従来の辞書と同じキーで参照できることをテスト
+    """
+    result = ParsedAddress("東京都", "新宿区", "西新宿1-2-3", "")
+    assert result["city"] == "新宿区"
+    assert result.city == "新宿区"
+    assert result.get("other") == ""
+    assert result.get("zip", "none") == "none"
+    assert list(result) == ["prefecture", "city", "town_street", "other"]
+    assert dict(result) == result.to_dict() == {
+        "prefecture": "東京都", "city": "新宿区", "town_street": "西新宿1-2-3", "other": "",
+    }
+    assert result == {"prefecture": "東京都", "city": "新宿区", "town_street": "西新宿1-2-3", "other": ""}
+    with pytest.raises(KeyError):
+        result["zip"]
+
+
+def test_parsed_address_is_immutable_and_compact():
+    """
+    変更できず、インスタンスごとの辞書を持たないことをテスト
+    """
+    result = ParsedAddress("東京都", "新宿区", "西新宿1-2-3", "")
+    with pytest.raises(AttributeError):
+        result.city = "渋谷区"
+    with pytest.raises(AttributeError):
+        result.__dict__
+    assert hash(result) == hash(ParsedAddress("東京都", "新宿区", "西新宿1-2-3", ""))
+
+
+def test_parsed_address_pickle():
+    """
+    pickle で受け渡せることをテスト
+    """
+    result = ParsedAddress("大阪府", "大阪市北区", "梅田1-2-3", "")
+    assert pickle.loads(pickle.dumps(result)) == result
+
+
+def test_parse_address_interns_prefecture_and_city():
+    """
+    都道府県・市区町村の文字列が解析結果の間で共有されることをテスト
+    """
+    parser = AddressParser()
+    first = parser.parse_address("大阪府大阪市北区梅田1-2-3")
+    second = parser.parse_address("大阪府大阪市北区茶屋町1-1")
+    assert first.prefecture is second.prefecture
+    assert first.city is second.city
+
+
+def test_normalize_address_accepts_dict():
+    """
+    normalize_address が辞書を受け取り ParsedAddress を返すことをテスト
+    """
+    result = AddressParser().normalize_address(
+        {"prefecture": "東京都", "city": "新宿区", "town_street": "西新宿一丁目２番", "other": "１０１号室"}
+    )
+    assert result == ParsedAddress("東京都", "新宿区", "西新宿1丁目2番", "101号室")
@@ -0,0 +1,155 @@
+"""
+住所を解析する HTTP サーバーのテスト
+"""
+
+import asyncio
+import http.client
+import json
+import urllib.parse
+
+from address_parser.parser import AddressParser
+from address_parser.server import AddressServer
+
+
+ADDRESSES = [
+    "東京都新宿区西新宿1-2-3",
+    "〒123-4567 東京都新宿区西新宿一丁目２番３号　〇〇ビル101号室",
+    "大阪府大阪市北区梅田1-2-3",
+]
+
+
+def run_with_server(client, **options):
+    """
+    空いているポートでサーバーを起動し、別のスレッドで client(port) を実行する
+    """
+    async def run():
+        async with AddressServer(port=0, **options) as server:
+            result = await asyncio.get_running_loop().run_in_executor(None, client, server.port)
+            return server, result
+
+    return asyncio.run(run())
+
+
+def request(connection, method, path, body=None):
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    return response.status, response.getheader("Connection"), response.read().decode("utf-8")
+
+
+def test_parse_endpoint_with_keep_alive():
+    """
+    /parse の結果が parse_address と一致し、1つの接続で複数の要求を処理することのテスト
+    """
+    parser = AddressParser()
+
+    def client(port):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        results = []
+        for address in ADDRESSES:
+            status, connection_header, body = request(
+                connection, "GET", "/parse?" + urllib.parse.urlencode({"address": address})
+            )
+            assert (status, connection_header) == (200, "keep-alive")
+            results.append(json.loads(body))
+            status, _, body = request(connection, "POST", "/parse", json.dumps({"address": address}).encode("utf-8"))
+            assert status == 200
+            results.append(json.loads(body))
+        sock = connection.sock
+        status, _, _ = request(connection, "GET", "/health")
+        # 同じ接続を使い続けている
+        assert status == 200 and connection.sock is sock
+        return results
+
+    server, results = run_with_server(client, parser=AddressParser(cache_size=100))
+    expected = [dict(parser.parse_address(address)) for address in ADDRESSES for _ in range(2)]
+    assert results == expected
+    assert server.metrics.connections == 1
+    assert server.metrics.requests == {"parse": 6, "health": 1}
+    assert server.parser.cache_stats().hits == 3
+
+
+def test_bulk_endpoint():
+    """
+    /parse/bulk が入力と同じ順序で NDJSON を返し、不正な行はエラーとして処理を続けることのテスト
+    """
+    parser = AddressParser()
+    lines = [json.dumps(address) for address in ADDRESSES * 200]
+    lines[5] = "{不正なJSON"
+    lines[6] = json.dumps({"address": ADDRESSES[0]})
+    lines[7] = json.dumps(123)
+
+    def client(port):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        status, _, body = request(connection, "POST", "/parse/bulk", "\n".join(lines).encode("utf-8"))
+        assert status == 200
+        return [json.loads(line) for line in body.splitlines()]
+
+    server, results = run_with_server(client, batch_size=16)
+    assert len(results) == len(lines)
+    assert "error" in results[5] and "error" in results[7]
+    assert results[6] == dict(parser.parse_address(ADDRESSES[0]))
+    for index in (0, 1, 2, 599):
+        assert results[index] == dict(parser.parse_address(ADDRESSES[index % 3]))
+    assert server.metrics.addresses == len(lines) - 2
+
+
+def test_concurrent_requests_are_batched():
+    """
+    同時に届いた要求が1つのバッチにまとめられ、統計に表れることのテスト
+    """
+    parser = AddressParser()
+
+    def client(port):
+        from concurrent.futures import ThreadPoolExecutor
+
+        def parse(address):
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            results = []
+            for _ in range(20):
+                status, _, body = request(connection, "GET", "/parse?" + urllib.parse.urlencode({"address": address}))
+                assert status == 200
+                results.append(json.loads(body))
+            return results
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(parse, ADDRESSES * 3))
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        _, _, body = request(connection, "GET", "/metrics")
+        return results, json.loads(body)
+
+    server, (results, metrics) = run_with_server(client, parser=AddressParser(cache_size=100), batch_delay=0.001)
+    for address, address_results in zip(ADDRESSES * 3, results):
+        assert address_results == [dict(parser.parse_address(address))] * 20
+    assert metrics["requests"]["parse"] == 180
+    assert metrics["addresses"] == 180
+    assert metrics["connections"]["total"] == 10
+    assert metrics["batches"]["requests"] == 180
+    assert metrics["batches"]["count"] < 180
+    assert metrics["latency"]["parse"]["count"] == 180
+    assert metrics["cache"]["hits"] + metrics["cache"]["misses"] == 180
+
+
+def test_errors():
+    """
+    エラーの応答のテスト
+    """
+    def client(port):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        responses = [
+            request(connection, "GET", "/parse"),
+            request(connection, "POST", "/parse", b"not json"),
+            request(connection, "GET", "/unknown"),
+            request(connection, "GET", "/parse/bulk"),
+        ]
+        connection.request("GET", "/health", headers={"Connection": "close"})
+        response = connection.getresponse()
+        response.read()
+        responses.append((response.status, response.getheader("Connection"), ""))
+        return [(status, connection_header) for status, connection_header, _ in responses]
+
+    server, responses = run_with_server(client)
+    assert responses == [
+        (400, "keep-alive"), (400, "keep-alive"), (404, "keep-alive"), (405, "keep-alive"), (200, "close"),
+    ]
+    assert server.metrics.errors == {400: 2, 404: 1, 405: 1}
+    assert server.metrics.open_connections == 0
@@ -0,0 +1,161 @@
+"""
+辞書のスナップショットのテスト
+"""
+
+import os
+import pickle
+import struct
+
+import pytest
+from address_parser import __version__
+from address_parser.cli import main
+from address_parser.municipality import get_default_index, load_municipalities, municipality_keys
+from address_parser.parser import AddressParser
+from address_parser.postal import PostalIndex, build_postal_table
+from address_parser.snapshot import FORMAT_VERSION, HEADER, Snapshot, build_snapshot, get_shared_snapshot
+from address_parser.tests.synthetic import generate_addresses
+from address_parser.towns import build_town_table
+
+
+KEN_ALL_SAMPLE = os.path.join(os.path.dirname(__file__), "data", "ken_all_sample.csv")
+
+
+@pytest.fixture
+def tables(tmp_path):
+    postal_table = str(tmp_path / "postal.bin")
+    town_table = str(tmp_path / "towns.bin")
+    build_postal_table(KEN_ALL_SAMPLE, postal_table)
+    build_town_table(KEN_ALL_SAMPLE, town_table)
+    return postal_table, town_table
+
+
+@pytest.fixture
+def snapshot(tmp_path, tables):
+    path = str(tmp_path / "dictionary.snap")
+    assert build_snapshot(path, postal_table=tables[0], town_table=tables[1]) == ["cities", "postal", "towns"]
+    snapshot = Snapshot(path)
+    yield snapshot
+    snapshot.close()
+
+
+def test_snapshot_sections(tmp_path, snapshot):
+    """
+    スナップショットのセクションのテスト
+    """
+    assert snapshot.library_version == __version__
+    assert list(snapshot.sections) == ["cities", "postal", "towns"]
+    # セクションは8バイト境界に揃える
+    assert all(start % 8 == 0 for start, _ in snapshot.sections.values())
+
+    # 市区町村のトライのみのスナップショット
+    path = str(tmp_path / "cities.snap")
+    assert build_snapshot(path) == ["cities"]
+    cities_only = Snapshot(path)
+    assert cities_only.postal_index is None and cities_only.town_index is None
+
+
+def test_municipality_index_matches(snapshot):
+    """
+    スナップショットのトライの検索結果が MunicipalityIndex と一致することのテスト
+    """
+    expected = get_default_index()
+    index = snapshot.municipality_index
+    texts = ["東京都新宿区", "東京新宿区", "大阪市北区梅田", "京都府京都市", "北海道音更町", "架空県架空市", "", "都"]
+    for prefecture, name in load_municipalities():
+        for key in municipality_keys(name):
+            texts.append(prefecture + key + "1-2-3")
+            texts.append(key + "1-2-3")
+    for text in texts:
+        assert index.match_prefecture(text) == expected.match_prefecture(text), text
+        prefecture, end = expected.match_prefecture(text)
+        for candidate in (prefecture, "", "架空県"):
+            assert index.match_city(text, candidate, end) == expected.match_city(text, candidate, end), text
+            assert list(index.iter_cities(text, candidate, end)) == list(expected.iter_cities(text, candidate, end))
+    for city in ("府中市", "京都市左京区", "余市郡余市町", "余市町", "架空市"):
+        assert index.city_prefectures(city) == expected.city_prefectures(city), city
+
+
+def test_parser_with_snapshot(snapshot, tables):
+    """
+    スナップショットを使用したパーサーの解析結果が同梱の辞書を使用した場合と一致することのテスト
+    """
+    parser = AddressParser(snapshot=snapshot)
+    assert parser.postal_index is snapshot.postal_index
+    assert parser.town_index is snapshot.town_index
+    expected = AddressParser(postal_index=PostalIndex(tables[0]))
+    for address in generate_addresses(500, seed=11) + ["〒160-0023 西新宿1-2-3", "〒080-0101 音更町大通1-2-3"]:
+        assert parser.parse_address(address) == expected.parse_address(address), address
+        assert parser.scan(address).to_parsed() == expected.parse_address(address), address
+    assert parser.split_town_street(parser.parse_address("東京都新宿区西新宿1-2-3")).known
+
+    # 埋め込んだテーブルは単独のテーブルと同じ結果になる
+    assert snapshot.postal_index.lookup("160-0023") == PostalIndex(tables[0]).lookup("160-0023")
+    # 明示したテーブルが優先される
+    postal_index = PostalIndex(tables[0])
+    assert AddressParser(postal_index=postal_index, snapshot=snapshot).postal_index is postal_index
+
+
+def test_snapshot_pickle(snapshot):
+    """
+    pickle した場合はパスのみを受け渡し、受け取った側で開き直すことのテスト
+    """
+    parser = AddressParser(snapshot=snapshot)
+    parser.parse_address("東京都新宿区西新宿1-2-3")
+    restored = pickle.loads(pickle.dumps(parser))
+    assert restored.snapshot.path == snapshot.path
+    assert restored.parse_address("〒160-0023 西新宿1-2-3") == parser.parse_address("〒160-0023 西新宿1-2-3")
+
+    # close した後に参照した場合は開き直す
+    snapshot.close()
+    assert parser.parse_address("東京都新宿区西新宿1-2-3").city == "新宿区"
+
+
+
+def test_shared_snapshot():
+    """
+    同梱の辞書の共有スナップショットが1回だけ作成され、pickle してもパスで参照できることのテスト
+    """
+    snapshot = get_shared_snapshot()
+    assert get_shared_snapshot() is snapshot
+    assert os.path.exists(snapshot.path)
+    assert list(snapshot.sections) == ["cities"]
+    assert pickle.loads(pickle.dumps(snapshot)).path == snapshot.path
+
+
+def test_snapshot_version_check(tmp_path):
+    """
+    形式やバージョンが異なるスナップショットを読み込めないことのテスト
+    """
+    path = tmp_path / "dictionary.snap"
+    build_snapshot(str(path))
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<I", data, 8, FORMAT_VERSION + 1)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="形式のバージョン"):
+        Snapshot(str(path))
+
+    # 別のバージョンのライブラリで作成したスナップショット
+    struct.pack_into("<I", data, 8, FORMAT_VERSION)
+    struct.pack_into("16s", data, 16, b"0.0.0")
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="バージョン 0.0.0 で作成"):
+        Snapshot(str(path))
+
+    path.write_bytes(b"JPSNAPXX" + bytes(HEADER.size))
+    with pytest.raises(ValueError, match="形式"):
+        Snapshot(str(path))
+
+
+def test_build_snapshot_command(tmp_path, tables, capsys):
+    """
+    build-snapshot コマンドと parse コマンドの --snapshot のテスト
+    """
+    path = str(tmp_path / "dictionary.snap")
+    assert main(["build-snapshot", "-o", path, "--postal-table", tables[0]]) == 0
+    assert "cities, postal" in capsys.readouterr().err
+
+    source = tmp_path / "addresses.csv"
+    source.write_text("住所\n〒160-0023 西新宿1-2-3\n", encoding="utf-8")
+    output = tmp_path / "parsed.csv"
+    assert main([str(source), "-c", "住所", "-o", str(output), "--snapshot", path]) == 0
+    assert output.read_text(encoding="utf-8").splitlines()[1] == "〒160-0023 西新宿1-2-3,東京都,新宿区,西新宿1-2-3,"
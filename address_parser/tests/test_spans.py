@@ -0,0 +1,109 @@
+"""
+住所の各要素の位置を返す走査のテスト
+"""
+
+import pytest
+from address_parser.fuzzy import FuzzyCityMatcher
+from address_parser.parser import AddressParser
+from address_parser.spans import AddressSpans, OffsetMap
+from address_parser.tests.synthetic import generate_addresses
+
+
+# 空白・郵便番号の位置・省略形などの境界となる入力
+EDGE_CASES = [
+    "",
+    "   ",
+    "〒123-4567",
+    "東京都",
+    "東京新宿区西新宿1-2-3",
+    "  東京都　新宿区　西新宿1-2-3　〇〇ビル101号室  ",
+    "東京都〒123-4567新宿区西新宿1-2-3",
+    "東京都新宿区西新宿1-2-3 〒123-4567",
+    "〒123-4567〒765-4321 東京都新宿区西新宿1-2-3",
+    "大阪府大阪市北区梅田1-2-3  Aビル 5F",
+    "大阪市北区梅田1-2-3",
+    "北海道河東郡音更町木野西通1-2-3",
+    "北海道架空郡架空町1-2-3",
+    "東京都西新宿1-2-3",
+    "東京都新宿区\t西新宿1-2-3",
+    "東京都新宿区西新宿1-2-3 101号室",
+    "東京都新宿区西新宿1-2-3 〇〇マンション 101号室",
+    "東京都新宿区西新宿1-2-3 〇〇ビル 〇〇ビル101号室",
+]
+
+
+def test_offset_map():
+    """
+    郵便番号を除去した後の位置から除去前の位置への変換のテスト
+    """
+    # 「東京都〒123-4567新宿区」の 3〜12 を除去した場合
+    offsets = OffsetMap([(3, 12)])
+    assert offsets.span(0, 3) == (0, 3)
+    assert offsets.span(3, 6) == (12, 15)
+    offsets = OffsetMap([(0, 9), (9, 18)])
+    assert offsets.span(0, 2) == (18, 20)
+
+
+def test_scan_spans():
+    """
+    各要素の位置と入力中の表記のテスト
+    """
+    address = "〒123-4567 東京都新宿区西新宿一丁目２番３号　〇〇ビル101号室"
+    spans = AddressParser().scan(address)
+    assert isinstance(spans, AddressSpans)
+    assert spans.spans() == {
+        "postal_code": (0, 9), "prefecture": (10, 13), "city": (13, 16),
+        "town_street": (16, 26), "other": (27, 36),
+    }
+    assert [spans.raw(field) for field in AddressSpans.FIELDS] == [
+        "〒123-4567", "東京都", "新宿区", "西新宿一丁目２番３号", "〇〇ビル101号室",
+    ]
+    # 省略形は入力中の表記の位置を返し、値は正式名とする
+    spans = AddressParser().scan("東京新宿区西新宿1-2-3")
+    assert spans.prefecture == (0, 2)
+    assert spans.to_parsed().prefecture == "東京都"
+    assert spans.other is None and spans.raw("other") == ""
+
+
+def test_scan_materializes_lazily():
+    """
+    値は要求されたときに1回だけ作成されることをテスト
+    """
+    spans = AddressParser().scan("東京都新宿区西新宿1-2-3")
+    assert spans._parsed is None
+    assert spans.to_parsed() is spans.to_parsed()
+
+
+@pytest.mark.parametrize("address", EDGE_CASES)
+def test_scan_matches_parse_address_edge_cases(address):
+    """
+    境界となる入力で scan の値が parse_address と一致することをテスト
+    """
+    parser = AddressParser()
+    assert parser.scan(address).to_parsed() == parser.parse_address(address)
+
+
+def test_scan_matches_parse_address_synthetic():
+    """
+    合成した住所で scan の値が parse_address と一致することをテスト（差分テスト）
+    """
+    parser = AddressParser()
+    for address in generate_addresses(3000, seed=15):
+        spans = parser.scan(address)
+        parsed = spans.to_parsed()
+        assert parsed == parser.parse_address(address), address
+        # 位置は入力中の表記を指す
+        if spans.city:
+            assert parser.normalizer.normalize(spans.raw("city")) == parsed.city
+
+
+def test_scan_with_fuzzy_matcher():
+    """
+    あいまい検索で置き換えた市区町村の位置と値のテスト
+    """
+    parser = AddressParser(fuzzy_matcher=FuzzyCityMatcher())
+    address = "愛知県名古尾市中区栄1-2-3"
+    spans = parser.scan(address)
+    assert spans.raw("city") == "名古尾市中区"
+    assert spans.to_parsed() == parser.parse_address(address)
+    assert spans.to_parsed().city == "名古屋市中区"
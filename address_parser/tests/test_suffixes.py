@@ -0,0 +1,123 @@
+"""
+建物名・部屋番号の接尾辞の検出のテスト
+"""
+
+import functools
+import random
+import re
+
+import pytest
+from address_parser import patterns
+from address_parser.parser import AddressParser
+from address_parser.suffixes import EXTENDED_SUFFIXES_PATH, SuffixAutomaton, load_suffixes
+
+
+@functools.lru_cache(maxsize=None)
+def building_pattern(suffix):
+    """
+    建物名のパターンを返す（例: 〇〇ビル。オートマトンを導入する前の処理）
+    """
+    return re.compile(r'(.+?' + re.escape(suffix) + r')')
+
+
+@functools.lru_cache(maxsize=None)
+def room_pattern(suffix):
+    """
+    部屋番号のパターンを返す（例: 101号室。オートマトンを導入する前の処理）
+    """
+    return re.compile(r'(\d+' + re.escape(suffix) + r')')
+
+
+def regex_find(text, start, end, building_suffixes, room_suffixes):
+    """
+    接尾辞ごとに正規表現で検索する（オートマトンを導入する前の処理）
+    """
+    building = room = None
+    for suffix in building_suffixes:
+        match = building_pattern(suffix).search(text, start, end)
+        if match:
+            building = match.span(1)
+            break
+    for suffix in room_suffixes:
+        match = room_pattern(suffix).search(text, start, end)
+        if match:
+            room = match.span(1)
+            break
+    return building, room
+
+
+def test_find():
+    """
+    建物名と部屋番号の検出のテスト
+    """
+    automaton = SuffixAutomaton(AddressParser.building_suffixes, AddressParser.room_suffixes)
+    assert automaton.find("〇〇ビル101号室") == ((0, 4), (4, 9))
+    assert automaton.find("〇〇マンション 202室") == ((0, 7), (8, 12))
+    assert automaton.find("西新宿1-2-3") == (None, None)
+    # 接尾辞の前に1文字以上必要
+    assert automaton.find("ビル") == (None, None)
+    # 部屋番号は数字の直後の接尾辞のみ
+    assert automaton.find("和室") == (None, None)
+    # 検索範囲の外の数字は含めない
+    assert automaton.find("12号室", 1) == (None, (1, 4))
+
+
+def test_find_priority():
+    """
+    複数の接尾辞が見つかった場合は、位置にかかわらずリストの先頭にある接尾辞を採用することのテスト
+    """
+    automaton = SuffixAutomaton(("マンション", "荘"), ("号室", "室"))
+    assert automaton.find("〇〇荘 〇〇マンション")[0] == (0, 11)
+    assert automaton.find("〇〇荘 〇〇荘")[0] == (0, 3)
+    assert automaton.find("1室 2号室")[1] == (3, 6)
+
+
+@pytest.mark.parametrize("path", [None, EXTENDED_SUFFIXES_PATH])
+def test_matches_regex(path):
+    """
+    ランダムな文字列でオートマトンと正規表現の検出結果が一致することのテスト
+    """
+    if path is None:
+        building_suffixes, room_suffixes = AddressParser.building_suffixes, AddressParser.room_suffixes
+    else:
+        building_suffixes, room_suffixes = load_suffixes(path)
+    automaton = patterns.suffix_automaton(building_suffixes, room_suffixes)
+    alphabet = "ビルマンショアパトハイツコー荘タウスレジデ館棟号室部屋0123456789 \nA"
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 14)))
+        start = rng.randint(0, len(text))
+        end = rng.randint(start, len(text))
+        expected = regex_find(text, start, end, building_suffixes, room_suffixes)
+        assert automaton.find(text, start, end) == expected, (text, start, end)
+
+
+def test_load_suffixes(tmp_path):
+    """
+    接尾辞の辞書の読み込みのテスト
+    """
+    path = tmp_path / "suffixes.tsv"
+    path.write_text("# コメント\nbuilding\tヴィラ\nroom\t号室\n\nbuilding\t荘\n", encoding="utf-8")
+    assert load_suffixes(str(path)) == (("ヴィラ", "荘"), ("号室",))
+
+    path.write_text("floor\t階\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_suffixes(str(path))
+
+    # 同梱の辞書は既定の接尾辞を含む
+    building_suffixes, room_suffixes = load_suffixes(EXTENDED_SUFFIXES_PATH)
+    assert set(AddressParser.building_suffixes) <= set(building_suffixes)
+    assert room_suffixes == AddressParser.room_suffixes
+
+
+def test_parser_with_extended_suffixes():
+    """
+    接尾辞を差し替えたパーサーのテスト
+    """
+    class ExtendedParser(AddressParser):
+        building_suffixes, room_suffixes = load_suffixes(EXTENDED_SUFFIXES_PATH)
+
+    address = "東京都新宿区西新宿1-2-3 〇〇ヴィラ"
+    assert AddressParser().parse_address(address).other == "〇〇ヴィラ"
+    assert ExtendedParser().parse_address(address + " 101号室").other == "〇〇ヴィラ 101号室"
+    assert ExtendedParser().extract_other("〇〇コート", "", "", "") == "〇〇コート"
@@ -0,0 +1,92 @@
+"""
+町域の辞書のテスト
+"""
+
+import os
+import pickle
+
+import pytest
+from address_parser.cli import main
+from address_parser.parser import AddressParser
+from address_parser.towns import TownIndex, TownMatch, build_town_table
+
+
+KEN_ALL_SAMPLE = os.path.join(os.path.dirname(__file__), "data", "ken_all_sample.csv")
+
+
+@pytest.fixture
+def town_index(tmp_path):
+    path = str(tmp_path / "towns.bin")
+    assert build_town_table(KEN_ALL_SAMPLE, path) == 16
+    index = TownIndex(path)
+    yield index
+    index.close()
+
+
+def test_towns(town_index):
+    """
+    市区町村ごとの町域名の検索のテスト
+    """
+    # 高層ビルの階ごとの町域は含めない
+    assert town_index.towns("東京都", "新宿区") == ["新宿", "西新宿"]
+    assert town_index.towns("大阪府", "大阪市北区") == ["曾根崎", "曾根崎新地", "梅田"]
+    # 郡名を省略した表記
+    assert town_index.towns("北海道", "音更町") == town_index.towns("北海道", "河東郡音更町") == ["大通"]
+    # 都道府県が不明な場合は同名の市区町村すべて
+    assert town_index.towns("", "府中市") == ["府中町", "本町", "本町通", "府中町"]
+    assert town_index.towns("東京都", "府中市") == ["府中町"]
+    assert town_index.towns("東京都", "架空市") == []
+    assert town_index.contains("大阪府", "大阪市北区", "曾根崎")
+    assert not town_index.contains("大阪府", "大阪市北区", "曾根")
+
+
+def test_split_town_street(town_index):
+    """
+    町名番地を町域名と番地に分けるテスト
+    """
+    split = town_index.split_town_street
+    assert split("西新宿1-2-3", "東京都", "新宿区") == TownMatch("西新宿", "1-2-3", True)
+    # 最長一致（曾根崎 と 曾根崎新地）
+    assert split("曾根崎新地1-2", "大阪府", "大阪市北区") == TownMatch("曾根崎新地", "1-2", True)
+    assert split("曾根崎2-3", "大阪府", "大阪市北区") == TownMatch("曾根崎", "2-3", True)
+    # 一致しない町域名を飛ばしてより短い町域名に一致する（本町通 と 本町）
+    assert split("本町三丁目5番", "広島県", "府中市") == TownMatch("本町", "三丁目5番", True)
+    # 辞書の町域名の直後が番地の始まりでない場合は一致させない
+    assert split("本町田1-2", "広島県", "府中市") == TownMatch("本町田", "1-2", False)
+    assert split("本町通り1", "広島県", "府中市") == TownMatch("本町通り", "1", False)
+    assert split("本町-5", "広島県", "府中市") == TownMatch("本町", "-5", True)
+    # 町域名が数字を含まない番地で終わる場合や、町域名と番地の間に空白がある場合
+    assert split("大字氷川 123", "東京都", "西多摩郡奥多摩町") == TownMatch("大字氷川", "123", True)
+    # 辞書にない町域名
+    assert split("歌舞伎町1-2-3", "東京都", "新宿区") == TownMatch("歌舞伎町", "1-2-3", False)
+    assert split("架空町三丁目5", "東京都", "架空市") == TownMatch("架空町", "三丁目5", False)
+    assert split("架空町", "東京都", "架空市") == TownMatch("架空町", "", False)
+
+
+def test_lazy_load_and_pickle(town_index):
+    """
+    初回検索時まで開かないこと、pickle してもパスから開き直せることをテスト
+    """
+    assert town_index._mmap is None
+    restored = pickle.loads(pickle.dumps(town_index))
+    assert len(restored) == 16
+    restored.close()
+
+
+def test_parser_split_town_street(town_index):
+    """
+    パーサーの解析結果の町域名の照合のテスト
+    """
+    parser = AddressParser(town_index=town_index)
+    parsed = parser.parse_address("東京都新宿区西新宿一丁目2番3号")
+    assert parser.split_town_street(parsed) == TownMatch("西新宿", "1丁目2番3号", True)
+    with pytest.raises(ValueError):
+        AddressParser().split_town_street(parsed)
+
+
+def test_build_towns_command(tmp_path, capsys):
+    """
+    build-towns コマンドのテスト
+    """
+    assert main(["build-towns", KEN_ALL_SAMPLE, "-o", str(tmp_path / "towns.bin")]) == 0
+    assert "16件" in capsys.readouterr().err
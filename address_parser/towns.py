@@ -0,0 +1,256 @@
+"""
+市区町村ごとの町域名の辞書のモジュール
+
+日本郵便の郵便番号データ（KEN_ALL.CSV 形式）から build_town_table で町域テーブルを作成しておき、
+TownIndex で初回の参照時にメモリマップして参照する（mapped モジュールを参照）。
+約15万件の町域を Python のオブジェクトに展開しないため、ワーカープロセスごとに起動時間や
+メモリ使用量が増えることはない。
+
+バイナリ形式（数値はすべてリトルエンディアンの32ビット符号なし整数）:
+
+    ヘッダー       MAGIC, 市区町村キー数, 町域数, 文字列データのバイト数
+    key_offsets   市区町村キー数 + 1 個。キーは「市区町村名<TAB>都道府県名」の UTF-8（バイト順に昇順）
+    key_ranges    市区町村キー数 × 2 個。キーに対応する町域の範囲（開始, 終了）
+    town_offsets  町域数 + 1 個。町域名は市区町村ごとにまとめ、その中でバイト順に昇順
+    文字列データ   UTF-8（市区町村キー、町域名の順）
+"""
+import array
+import collections
+import struct
+
+from . import patterns
+from .mapped import MappedTable, write_table
+from .municipality import municipality_keys
+from .postal import clean_town, read_ken_all
+
+
+# ファイルの先頭の識別子（形式を変更した場合は末尾の番号を上げる）
+MAGIC = b"JPTOWN01"
+
+# ヘッダーの構造
+HEADER = struct.Struct("<8sIII")
+
+# 住所中で町域名の前に付くことがある接頭辞（KEN_ALL の町域名には含まれない）
+TOWN_PREFIXES = ("大字", "字")
+
+
+class TownMatch(collections.namedtuple("TownMatch", ["town", "block", "known"])):
+    """
+    町名番地を町域名と番地に分けた結果
+
+    Attributes:
+        town (str): 町域名（住所中の表記）
+        block (str): 番地以降（例: 1-2-3、三丁目5番）
+        known (bool): 町域名が市区町村の町域の辞書にあるかどうか
+    """
+
+    __slots__ = ()
+
+
+def build_town_table(source_path, output_path, encoding="cp932"):
+    """
+    KEN_ALL.CSV 形式のファイルから町域テーブルを作成する
+
+    高層ビルの階ごとの郵便番号（「〇〇ビル（１階）」など）と、町域を特定できない行は含めない。
+
+    Args:
+        source_path (str): KEN_ALL.CSV 形式のファイルのパス
+        output_path (str): 作成するテーブルのパス（作成が完了してから置き換える）
+        encoding (str): 入力の文字コード
+
+    Returns:
+        int: 町域の件数
+    """
+    towns_by_city = {}
+    for _, prefecture, city, town in read_ken_all(source_path, encoding):
+        if "（" in town and "階" in town.split("（", 1)[1]:
+            continue
+        town = clean_town(town)
+        if town:
+            towns_by_city.setdefault((prefecture, city), set()).add(town.encode("utf-8"))
+    return write_town_table(towns_by_city, output_path)
+
+
+def write_town_table(towns_by_city, output_path):
+    """
+    市区町村ごとの町域名から町域テーブルを作成する
+
+    Args:
+        towns_by_city (dict): {(都道府県名, 市区町村名): 町域名（UTF-8 のバイト列）の集合}
+        output_path (str): 作成するテーブルのパス
+
+    Returns:
+        int: 町域の件数
+    """
+    town_blob = bytearray()
+    town_offsets = []
+    ranges = {}
+    for city_key in sorted(towns_by_city):
+        start = len(town_offsets)
+        for town in sorted(towns_by_city[city_key]):
+            town_offsets.append(len(town_blob))
+            town_blob.extend(town)
+        ranges[city_key] = (start, len(town_offsets))
+
+    # 郡名を省略した表記（例: 音更町）でも引けるよう、同じ範囲を指すキーを追加する
+    keys = sorted(
+        (f"{key}\t{prefecture}".encode("utf-8"), ranges[prefecture, city])
+        for prefecture, city in ranges
+        for key in municipality_keys(city)
+    )
+    key_blob = bytearray()
+    key_offsets = array.array("I", [0])
+    key_ranges = array.array("I")
+    for key, (start, end) in keys:
+        key_blob.extend(key)
+        key_offsets.append(len(key_blob))
+        key_ranges.extend((start, end))
+
+    # 町域名の位置は市区町村キーの後ろからの位置に直す
+    town_offsets = array.array("I", (offset + len(key_blob) for offset in town_offsets))
+    town_offsets.append(len(key_blob) + len(town_blob))
+
+    header = HEADER.pack(MAGIC, len(keys), len(town_offsets) - 1, len(key_blob) + len(town_blob))
+    write_table(output_path, header, [key_offsets, key_ranges, town_offsets], key_blob + town_blob)
+    return len(town_offsets) - 1
+
+
+class TownIndex(MappedTable):
+    """
+    町域テーブルをメモリマップして検索するインデックス
+
+    ファイルは初回の検索時に開く。市区町村キーと、市区町村ごとの町域名をそれぞれ二分探索する。
+    """
+
+    MAGIC = MAGIC
+    HEADER = HEADER
+    DESCRIPTION = "町域テーブル"
+
+    def __len__(self):
+        self._load()
+        return len(self._town_offsets) - 1
+
+    def _open(self, header):
+        key_count, town_count, blob_size = header
+        self._key_offsets = self._uint32_section(key_count + 1)
+        self._key_ranges = self._uint32_section(key_count * 2)
+        self._town_offsets = self._uint32_section(town_count + 1)
+        self._blob = self._bytes_section(blob_size)
+
+    def _close_sections(self):
+        self._key_offsets = self._key_ranges = self._town_offsets = self._blob = None
+
+    def _key(self, position):
+        return self._blob[self._key_offsets[position]:self._key_offsets[position + 1]].tobytes()
+
+    def _town(self, position):
+        return self._blob[self._town_offsets[position]:self._town_offsets[position + 1]].tobytes()
+
+    def _city_ranges(self, prefecture, city):
+        """
+        市区町村に対応する町域の範囲を返す（都道府県が不明な場合は同名の市区町村すべて）
+        """
+        self._load()
+        prefix = f"{city}\t{prefecture}".encode("utf-8")
+        low, high = 0, len(self._key_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        ranges = []
+        while low < len(self._key_offsets) - 1:
+            key = self._key(low)
+            if key != prefix and (prefecture or not key.startswith(prefix)):
+                break
+            ranges.append((self._key_ranges[low * 2], self._key_ranges[low * 2 + 1]))
+            low += 1
+        return ranges
+
+    def _longest_town(self, text, start, end):
+        """
+        町域の範囲から、text（UTF-8 のバイト列）の先頭に一致する最長の町域名の長さ（バイト数）を返す
+        """
+        query = text
+        while query:
+            # query 以下で最大の町域名を探す
+            low, high = start, end
+            while low < high:
+                middle = (low + high) // 2
+                if self._town(middle) <= query:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low == start:
+                return 0
+            candidate = self._town(low - 1)
+            if query.startswith(candidate):
+                return len(candidate)
+            # 一致しない場合は共通の先頭部分に縮めて探し直す（より短い町域名が一致しうる）
+            common = 0
+            while common < len(candidate) and candidate[common] == query[common]:
+                common += 1
+            query = query[:common]
+        return 0
+
+    def towns(self, prefecture, city):
+        """
+        市区町村の町域名を返す
+
+        Args:
+            prefecture (str): 都道府県名（空文字列の場合は同名の市区町村すべて）
+            city (str): 市区町村名（郡名を省略した表記も可）
+
+        Returns:
+            list: 町域名のリスト（辞書にない市区町村の場合は空のリスト）
+        """
+        return [
+            self._town(position).decode("utf-8")
+            for start, end in self._city_ranges(prefecture, city)
+            for position in range(start, end)
+        ]
+
+    def contains(self, prefecture, city, town):
+        """
+        町域名が市区町村の町域の辞書にあるかどうかを返す
+        """
+        encoded = town.encode("utf-8")
+        return any(
+            self._longest_town(encoded, start, end) == len(encoded)
+            for start, end in self._city_ranges(prefecture, city)
+        )
+
+    def split_town_street(self, town_street, prefecture, city):
+        """
+        町名番地を町域名と番地に分ける
+
+        市区町村の町域名のうち町名番地の先頭に一致し、直後が番地の始まり（数字・漢数字、丁目、空白、
+        ハイフン）または末尾である最長のものを町域名とする（例: 町域名が本町のみの場合、本町田1-2 は
+        本町に一致させない）。辞書にない場合は、最初の数字（または漢数字の丁目）の前までを町域名とする。
+
+        Args:
+            town_street (str): 町名番地（例: 西新宿1-2-3）
+            prefecture (str): 都道府県名
+            city (str): 市区町村名
+
+        Returns:
+            TownMatch: 町域名と番地
+        """
+        ranges = self._city_ranges(prefecture, city) if city else []
+        if ranges:
+            # 「大字」「字」は辞書の町域名に含まれないため、一致しない場合は除いて探し直す
+            for town_prefix in ("",) + TOWN_PREFIXES:
+                if not town_street.startswith(town_prefix):
+                    continue
+                encoded = town_street[len(town_prefix):].encode("utf-8")
+                length = max(self._longest_town(encoded, start, end) for start, end in ranges)
+                while length:
+                    town = town_prefix + encoded[:length].decode("utf-8")
+                    if patterns.TOWN_BOUNDARY.match(town_street, len(town)):
+                        return TownMatch(town, town_street[len(town):].lstrip(), True)
+                    # 直後が番地の始まりでない場合は、より短い町域名を探す
+                    length = max(self._longest_town(encoded[:length - 1], start, end) for start, end in ranges)
+
+        town, block = patterns.TOWN_BLOCK.match(town_street).groups()
+        return TownMatch(town, block or "", False)
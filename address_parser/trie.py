@@ -0,0 +1,116 @@
+"""
+最長一致検索のためのプレフィックス木（トライ）モジュール
+"""
+
+
+# 終端ノードに値を格納するためのキー（1文字のキーと衝突しない）
+_VALUE = None
+
+
+class Trie:
+    """
+    文字単位のプレフィックス木
+
+    検索コストは入力文字列の長さ（と登録キーの最大長）にのみ依存し、
+    登録件数には依存しない。
+    """
+
+    def __init__(self, items=()):
+        """
+        Trieクラスの初期化
+
+        Args:
+            items (iterable): 登録する (キー, 値) の組
+        """
+        self.root = {}
+        self.size = 0
+        for key, value in items:
+            self.insert(key, value)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        node = self._find_node(key)
+        return node is not None and _VALUE in node
+
+    def insert(self, key, value):
+        """
+        キーと値を登録する（同じキーは上書き）
+
+        Args:
+            key (str): 登録するキー
+            value: キーに対応する値
+        """
+        if not key:
+            raise ValueError("空文字列のキーは登録できません")
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        if _VALUE not in node:
+            self.size += 1
+        node[_VALUE] = value
+
+    def get(self, key, default=None):
+        """
+        キーに完全一致する値を返す
+
+        Args:
+            key (str): 検索するキー
+            default: 見つからない場合の戻り値
+
+        Returns:
+            キーに対応する値
+        """
+        node = self._find_node(key)
+        if node is None or _VALUE not in node:
+            return default
+        return node[_VALUE]
+
+    def longest_prefix(self, text, start=0):
+        """
+        text[start:] の先頭に一致する最長のキーを検索する
+
+        Args:
+            text (str): 検索対象の文字列
+            start (int): 検索を開始する位置
+
+        Returns:
+            tuple: (値, 一致したキーの終了位置)。見つからない場合は (None, start)
+        """
+        node = self.root
+        value, end = None, start
+        for position in range(start, len(text)):
+            node = node.get(text[position])
+            if node is None:
+                break
+            if _VALUE in node:
+                value, end = node[_VALUE], position + 1
+        return value, end
+
+    def iter_prefixes(self, text, start=0):
+        """
+        text[start:] の先頭に一致するすべてのキーを短い順に列挙する
+
+        Args:
+            text (str): 検索対象の文字列
+            start (int): 検索を開始する位置
+
+        Yields:
+            tuple: (値, 一致したキーの終了位置)
+        """
+        node = self.root
+        for position in range(start, len(text)):
+            node = node.get(text[position])
+            if node is None:
+                return
+            if _VALUE in node:
+                yield node[_VALUE], position + 1
+
+    def _find_node(self, key):
+        node = self.root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return None
+        return node
@@ -0,0 +1,3 @@
+"""
+日本語住所正規化ツールのベンチマーク
+"""
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+メモリ使用量の計測
+
+解析結果の保持に必要なメモリの比較:
+    従来の解析結果（4キーの辞書、市区町村は解析ごとに新しい文字列）と
+    ParsedAddress（__slots__、都道府県・市区町村はインターン済み）について、
+    解析結果を保持したときのメモリ使用量を tracemalloc で計測し、100万件あたりに換算する。
+
+ワーカープロセスごとのメモリ（--workers を指定した場合）:
+    指定した数のワーカーのプロセスのプールで合成住所を解析し、各ワーカーの RSS・PSS・USS
+    （/proc/self/smaps_rollup。Linux のみ）を、辞書をワーカー間で共有する場合（スナップショットを
+    メモリマップ）と、ワーカーごとにインデックスを作成する場合のそれぞれについて表示する。
+    メモリと引き換えになる解析時間（全ワーカーの合計）と、共有するスナップショットの準備時間
+    （初回は一時ファイルへの書き出しを含む）も表示する。
+
+実行方法:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --workers 1 8 32
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from address_parser import batch
+from address_parser.parser import AddressParser
+from address_parser.result import ParsedAddress
+from address_parser.tests.synthetic import generate_addresses
+
+
+# ベンチマーク用の住所の構成要素
+CITIES = [
+    "東京都新宿区西新宿", "東京都渋谷区道玄坂", "大阪府大阪市北区梅田", "北海道札幌市中央区北1条西",
+    "愛知県名古屋市中村区名駅", "福岡県福岡市博多区博多駅前", "北海道河東郡音更町木野西通",
+]
+
+
+def make_addresses(count):
+    """
+    番地と部屋番号の異なる住所を作成する
+    """
+    return [
+        f"{CITIES[i % len(CITIES)]}{i % 9 + 1}-{i % 30 + 1}-{i % 50 + 1} 〇〇ビル{i % 1000 + 100}号室"
+        for i in range(count)
+    ]
+
+
+def legacy_result(result):
+    """
+    従来の parse_address が返していた形式（辞書、市区町村は新しい文字列）に変換する
+    """
+    return {
+        "prefecture": result["prefecture"],
+        "city": (result["city"] + " ")[:-1],
+        "town_street": result["town_street"],
+        "other": result["other"],
+    }
+
+
+def measure(results_factory):
+    """
+    解析結果のリストを保持するのに必要なメモリ（バイト）を計測する
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = results_factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return after - before
+
+
+def process_memory():
+    """
+    現在のプロセスの RSS・PSS・USS（KiB）を返す（/proc/self/smaps_rollup を読めない場合は None）
+    """
+    try:
+        with open("/proc/self/smaps_rollup", encoding="ascii") as f:
+            fields = {}
+            for line in f:
+                name, _, value = line.partition(":")
+                parts = value.split()
+                if len(parts) == 2 and parts[1] == "kB":
+                    fields[name] = int(parts[0])
+    except OSError:
+        return None
+    return {
+        "rss_kib": fields["Rss"],
+        "pss_kib": fields["Pss"],
+        "uss_kib": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def _measure_chunk(parser, start, addresses):
+    """
+    ワーカーで住所のチャンクを解析し、解析後のワーカーのメモリと解析にかかった時間を返す
+    """
+    started = time.perf_counter()
+    batch.parse_chunk(parser, start, addresses)
+    return os.getpid(), process_memory(), time.perf_counter() - started
+
+
+def measure_workers(addresses, workers, shared_tables=True):
+    """
+    プロセスのプールで住所を解析し、ワーカーごとのメモリを計測する
+
+    workers が1の場合も、呼び出し元のプロセスではなく1つのワーカーのプロセスで解析する。
+
+    Args:
+        addresses (list): 住所文字列のリスト
+        workers (int): ワーカー数
+        shared_tables (bool): 辞書をワーカー間で共有するかどうか（batch.share_tables を参照）
+
+    Returns:
+        dict: ワーカーごとの平均（MiB）と、全ワーカーの PSS の合計（MiB）。計測できない場合は値が None。
+            parse_seconds は全ワーカーの解析時間の合計、prepare_seconds は共有するスナップショットの準備時間
+    """
+    parser = AddressParser()
+    started = time.perf_counter()
+    if shared_tables:
+        parser = batch.share_tables(parser)
+    prepare_seconds = time.perf_counter() - started
+    # すべてのワーカーにチャンクが渡るよう、ワーカー数の4倍のチャンクに分ける
+    chunksize = max(1, len(addresses) // (workers * 4))
+    memory = {}
+    parse_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=workers, initializer=batch._init_worker, initargs=(parser,)) as executor:
+        futures = [
+            executor.submit(batch._run_chunk, _measure_chunk, start, chunk)
+            for start, chunk in batch.iter_chunks(addresses, chunksize)
+        ]
+        for future in futures:
+            pid, usage, seconds = future.result()
+            # ワーカーごとに最後に解析した時点の値を使う
+            memory[pid] = usage
+            parse_seconds += seconds
+
+    result = {
+        "workers": workers, "shared_tables": shared_tables, "measured": len(memory),
+        "parse_seconds": parse_seconds, "prepare_seconds": prepare_seconds,
+    }
+    usages = [usage for usage in memory.values() if usage is not None]
+    for key in ("rss_kib", "pss_kib", "uss_kib"):
+        name = key.replace("_kib", "_mib")
+        result[name] = sum(usage[key] for usage in usages) / len(usages) / 1024 if usages else None
+    result["pss_total_mib"] = sum(usage["pss_kib"] for usage in usages) / 1024 if usages else None
+    return result
+
+
+def report_workers(results):
+    """
+    ワーカーごとのメモリを表示する
+    """
+    print("ワーカーごとの平均と、全ワーカーの PSS の合計（MiB）、全ワーカーの解析時間の合計と準備時間（秒）")
+    print(f"{'workers':>7}  {'tables':<10} {'rss':>8} {'pss':>8} {'uss':>8} {'pss_total':>10} {'parse':>8} {'prepare':>8}")
+    for result in results:
+        tables = "shared" if result["shared_tables"] else "per-worker"
+        times = f"{result['parse_seconds']:8.3f} {result['prepare_seconds']:8.3f}"
+        if result["rss_mib"] is None:
+            print(f"{result['workers']:>7}  {tables:<10} {'-':>8} {'-':>8} {'-':>8} {'-':>10} {times}")
+            continue
+        print(
+            f"{result['workers']:>7}  {tables:<10} {result['rss_mib']:8.1f} {result['pss_mib']:8.1f} "
+            f"{result['uss_mib']:8.1f} {result['pss_total_mib']:10.1f} {times}"
+        )
+
+
+def main():
+    """
+    メイン関数
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--count", type=int, default=100_000, help="解析する住所の件数")
+    arg_parser.add_argument("--workers", type=int, nargs="+",
+                            help="ワーカーごとのメモリを計測するワーカー数（例: 1 8 32）")
+    args = arg_parser.parse_args()
+
+    if args.workers:
+        addresses = generate_addresses(args.count, seed=0)
+        report_workers([
+            measure_workers(addresses, workers, shared_tables)
+            for workers in args.workers for shared_tables in (True, False)
+        ])
+        return
+
+    parser = AddressParser()
+    addresses = make_addresses(args.count)
+    # town_street・other の文字列は両方式で共通のため、解析結果から作成済みのものを使い回し、
+    # 結果のオブジェクトと市区町村の文字列の分だけを比較する
+    parsed = [parser.parse_address(address) for address in addresses]
+
+    legacy = measure(lambda: [legacy_result(result) for result in parsed])
+    slotted = measure(lambda: [ParsedAddress(*result.astuple()) for result in parsed])
+
+    scale = 1_000_000 / args.count
+    print(f"辞書（従来）     : {legacy * scale / 2**20:8.1f} MiB / 100万件")
+    print(f"ParsedAddress    : {slotted * scale / 2**20:8.1f} MiB / 100万件")
+    print(f"削減率           : {1 - slotted / legacy:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文字正規化のマイクロベンチマーク
+
+従来の str.replace ループ（parse_address の記号変換 + normalize_address の
+town_street / other に対する数字・記号変換）と、Normalizer による1回の走査とを
+住所1件あたりのコストで比較する。
+
+実行方法:
+    python -m benchmarks.bench_normalizer
+"""
+
+import argparse
+import timeit
+
+from address_parser.normalizer import DEFAULT_NORMALIZER, ZENKAKU_NUMBERS, ZENKAKU_SYMBOLS
+
+
+# ベンチマーク用の住所リスト（半角・全角・混在）
+ADDRESSES = [
+    "東京都新宿区西新宿1-2-3",
+    "〒123-4567 東京都新宿区西新宿1-2-3",
+    "東京都新宿区西新宿1-2-3 〇〇ビル101号室",
+    "東京都新宿区西新宿一丁目二番三号",
+    "東京都新宿区西新宿１－２－３　〇〇ビル１０１号室",
+    "大阪府大阪市北区梅田１－２－３",
+    "北海道河東郡音更町木野西通1-2-3",
+]
+
+
+def legacy_normalize(address_string):
+    """
+    従来の str.replace ループによる正規化（比較用）
+
+    parse_address で住所全体に記号変換を行い、normalize_address で
+    town_street と other のそれぞれに数字・記号変換を行う流れを再現する。
+    """
+    for zenkaku, hankaku in ZENKAKU_SYMBOLS.items():
+        address_string = address_string.replace(zenkaku, hankaku)
+    parts = address_string.split(" ", 1)
+    normalized = []
+    for part in parts:
+        for zenkaku, hankaku in ZENKAKU_NUMBERS.items():
+            part = part.replace(zenkaku, hankaku)
+        for zenkaku, hankaku in ZENKAKU_SYMBOLS.items():
+            part = part.replace(zenkaku, hankaku)
+        normalized.append(part)
+    return normalized
+
+
+def single_pass_normalize(address_string):
+    """
+    Normalizer による正規化（住所全体 + town_street / other の計3回）
+    """
+    address_string = DEFAULT_NORMALIZER.normalize(address_string)
+    return [DEFAULT_NORMALIZER.normalize(part) for part in address_string.split(" ", 1)]
+
+
+def measure(func, number, repeat):
+    """
+    住所1件あたりの最短実行時間（マイクロ秒）を計測する
+    """
+    def run():
+        for address in ADDRESSES:
+            func(address)
+
+    best = min(timeit.repeat(run, number=number, repeat=repeat))
+    return best / (number * len(ADDRESSES)) * 1e6
+
+
+def main():
+    """
+    メイン関数
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--number", type=int, default=2000, help="1回の計測での繰り返し回数")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="計測回数（最短値を採用）")
+    args = arg_parser.parse_args()
+
+    legacy = measure(legacy_normalize, args.number, args.repeat)
+    single = measure(single_pass_normalize, args.number, args.repeat)
+    print(f"str.replace ループ : {legacy:8.3f} us/住所")
+    print(f"Normalizer        : {single:8.3f} us/住所")
+    print(f"高速化            : {legacy / single:8.2f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+住所解析のスループット・レイテンシのベンチマーク
+
+合成住所を解析し、以下を計測する。
+    - スループット（件/秒）
+    - 1回の呼び出しのレイテンシ（p50 / p99、マイクロ秒）
+    - 段階ごとの平均所要時間（extract_prefecture, extract_city, extract_town_street,
+      extract_other, normalize_address）
+
+--save で結果をJSONに保存し、--compare で保存済みのベースラインと比較する。
+スループット・p50・p99 のいずれかが閾値を超えて悪化した場合は終了コード1を返す。
+
+実行方法:
+    python -m benchmarks.bench_parser --save baseline.json
+    python -m benchmarks.bench_parser --compare baseline.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from address_parser.parser import AddressParser
+from address_parser.tests.synthetic import generate_addresses
+
+
+# 計測する段階（表示名, パーサーのメソッド名）
+STAGES = (
+    ("extract_prefecture", "extract_prefecture"),
+    ("extract_city", "extract_city_span"),
+    ("extract_town_street", "extract_town_street"),
+    ("extract_other", "extract_other"),
+    ("normalize_address", "_normalize_fields"),
+)
+
+# ベースラインとの比較で回帰と判定する指標（指標名, 大きいほど良いかどうか）
+GATED_METRICS = (
+    ("addresses_per_sec", True),
+    ("p50_us", False),
+    ("p99_us", False),
+)
+
+
+def percentile(sorted_values, fraction):
+    """
+    ソート済みの値から百分位数を求める（最近傍法）
+    """
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure_throughput(parser, addresses, repeat):
+    """
+    スループット（件/秒）を計測する（repeat 回のうち最良の値）
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for address in addresses:
+            parser.parse_address(address)
+        best = min(best, time.perf_counter() - start)
+    return len(addresses) / best
+
+
+def measure_latency(parser, addresses):
+    """
+    1回の呼び出しのレイテンシ（p50 / p99、マイクロ秒）を計測する
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    for address in addresses:
+        start = clock()
+        parser.parse_address(address)
+        latencies.append(clock() - start)
+    latencies.sort()
+    return percentile(latencies, 0.50) / 1000, percentile(latencies, 0.99) / 1000
+
+
+def measure_stages(parser, addresses):
+    """
+    段階ごとの平均所要時間（マイクロ秒/件）を計測する
+
+    インスタンスのメソッドを計時用のラッパーに差し替えて計測する
+    （パーサーは作成後に変更できないため、instrumentation.instrument と同様に __dict__ を直接書き換える）。
+    """
+    clock = time.perf_counter_ns
+    totals = {name: 0 for name, _ in STAGES}
+
+    def timed(name, method):
+        def wrapper(*args):
+            start = clock()
+            try:
+                return method(*args)
+            finally:
+                totals[name] += clock() - start
+        return wrapper
+
+    for name, attribute in STAGES:
+        parser.__dict__[attribute] = timed(name, getattr(parser, attribute))
+    try:
+        for address in addresses:
+            parser.parse_address(address)
+    finally:
+        for _, attribute in STAGES:
+            parser.__dict__.pop(attribute)
+    return {name: total / len(addresses) / 1000 for name, total in totals.items()}
+
+
+def run(count, seed, repeat):
+    """
+    ベンチマークを実行し、結果を辞書で返す
+    """
+    addresses = generate_addresses(count, seed)
+    parser = AddressParser()
+    # インデックスの作成などの初回コストを除くため、事前に一度解析する
+    for address in addresses[:100]:
+        parser.parse_address(address)
+
+    p50, p99 = measure_latency(parser, addresses)
+    return {
+        "count": count,
+        "seed": seed,
+        "addresses_per_sec": measure_throughput(parser, addresses, repeat),
+        "p50_us": p50,
+        "p99_us": p99,
+        "stages_us": measure_stages(parser, addresses),
+    }
+
+
+def compare(result, baseline, threshold, metrics=GATED_METRICS):
+    """
+    ベースラインと比較し、閾値を超えて悪化した指標を返す
+
+    Args:
+        result (dict): 今回の結果
+        baseline (dict): ベースラインの結果
+        threshold (float): 許容する悪化の割合（0.1 の場合は10%）
+        metrics (tuple): 比較する (指標名, 大きいほど良いかどうか) のタプル
+
+    Returns:
+        list: (指標名, ベースラインの値, 今回の値, 変化率) のリスト
+    """
+    regressions = []
+    for metric, higher_is_better in metrics:
+        before, after = baseline[metric], result[metric]
+        change = (after - before) / before
+        if (higher_is_better and change < -threshold) or (not higher_is_better and change > threshold):
+            regressions.append((metric, before, after, change))
+    return regressions
+
+
+def report(result, baseline=None):
+    """
+    結果を表示する
+    """
+    def line(label, key, value, unit):
+        text = f"{label:<22}: {value:12.2f} {unit}"
+        if baseline is not None and key in baseline:
+            text += f"  (ベースライン {baseline[key]:.2f}, {(value - baseline[key]) / baseline[key]:+.1%})"
+        print(text)
+
+    print(f"住所 {result['count']} 件 (seed={result['seed']})")
+    line("スループット", "addresses_per_sec", result["addresses_per_sec"], "件/秒")
+    line("レイテンシ p50", "p50_us", result["p50_us"], "us")
+    line("レイテンシ p99", "p99_us", result["p99_us"], "us")
+    stage_baseline = baseline.get("stages_us") if baseline else None
+    for name, value in result["stages_us"].items():
+        text = f"  {name:<20}: {value:12.2f} us/件"
+        if stage_baseline and name in stage_baseline:
+            text += f"  (ベースライン {stage_baseline[name]:.2f})"
+        print(text)
+
+
+def main(argv=None):
+    """
+    メイン関数
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--count", type=int, default=20000, help="解析する合成住所の件数")
+    arg_parser.add_argument("--seed", type=int, default=0, help="合成住所の乱数シード")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="スループット計測の繰り返し回数（最良値を採用）")
+    arg_parser.add_argument("--save", help="結果を保存するJSONファイル")
+    arg_parser.add_argument("--compare", help="比較するベースラインのJSONファイル")
+    arg_parser.add_argument("--threshold", type=float, default=0.10, help="回帰と判定する悪化の割合（既定: 0.10）")
+    args = arg_parser.parse_args(argv)
+
+    result = run(args.count, args.seed, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(result, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold)
+        for metric, before, after, change in regressions:
+            print(f"回帰: {metric} {before:.2f} -> {after:.2f} ({change:+.1%})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
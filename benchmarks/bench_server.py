@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+HTTP サーバーの負荷試験
+
+localhost でサーバー（python -m address_parser serve）を別のプロセスとして起動し、
+以下を計測する（--url を指定した場合は起動済みのサーバーに送る）。
+    - /parse: concurrency 本の keep-alive の接続から合成住所を1件ずつ送ったときのスループットとレイテンシ
+    - /parse/bulk: 合成住所を1回の NDJSON の要求で送ったときのスループット
+    - サーバーの /metrics から、1つのバッチにまとめられた要求の平均件数とキャッシュのヒット率
+
+--save で結果をJSONに保存し、--compare で保存済みのベースラインと比較する。
+いずれかの指標が閾値を超えて悪化した場合は終了コード1を返す。
+
+実行方法:
+    python -m benchmarks.bench_server --concurrency 32 --requests 200
+    python -m benchmarks.bench_server --url http://127.0.0.1:8080 --save server.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+
+from address_parser.tests.synthetic import generate_addresses
+from benchmarks.bench_parser import compare
+
+
+# ベースラインとの比較で回帰と判定する指標（指標名, 大きいほど良いかどうか）
+GATED_METRICS = (
+    ("requests_per_sec", True),
+    ("latency_p50_ms", False),
+    ("latency_p99_ms", False),
+    ("bulk_addresses_per_sec", True),
+)
+
+
+@contextlib.contextmanager
+def start_server(options=()):
+    """
+    空いているポートでサーバーを別のプロセスとして起動し、URL を返す
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "address_parser", "serve", "--port", "0"] + list(options),
+        cwd=root, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        # 「http://127.0.0.1:ポート/ で待ち受けています」の行を待つ
+        line = process.stderr.readline()
+        if not line.startswith("http://"):
+            raise RuntimeError(f"サーバーを起動できませんでした: {line}{process.stderr.read()}")
+        yield line.split()[0].rstrip("/")
+    finally:
+        process.terminate()
+        process.wait()
+        process.stderr.close()
+
+
+async def http_request(reader, writer, method, path, body=b""):
+    """
+    keep-alive の接続で要求を1件送り、応答の本文を返す（chunked の応答にも対応する）
+    """
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+        while True:
+            size = int(await reader.readline(), 16)
+            chunks.append(await reader.readexactly(size + 2))
+            if size == 0:
+                break
+        body = b"".join(chunk[:-2] for chunk in chunks)
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+    if status != 200:
+        raise RuntimeError(f"{method} {path}: {status} {body.decode('utf-8')}")
+    return body
+
+
+async def load(url, addresses, concurrency, requests):
+    """
+    /parse と /parse/bulk に負荷をかけ、結果を辞書で返す
+    """
+    parts = urllib.parse.urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies = []
+
+    async def client(offset):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in range(requests):
+                address = addresses[(offset * requests + i) % len(addresses)]
+                path = "/parse?" + urllib.parse.urlencode({"address": address})
+                start = time.perf_counter()
+                await http_request(reader, writer, "GET", path)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        body = "\n".join(json.dumps(address, ensure_ascii=False) for address in addresses).encode("utf-8")
+        bulk_start = time.perf_counter()
+        results = await http_request(reader, writer, "POST", "/parse/bulk", body)
+        bulk_elapsed = time.perf_counter() - bulk_start
+        if results.count(b"\n") != len(addresses):
+            raise RuntimeError("一括解析の結果の件数が入力と一致しません")
+        metrics = json.loads(await http_request(reader, writer, "GET", "/metrics"))
+    finally:
+        writer.close()
+
+    latencies.sort()
+    cache = metrics.get("cache")
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "requests_per_sec": len(latencies) / elapsed,
+        "latency_p50_ms": statistics.median(latencies) * 1000,
+        "latency_p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "bulk_addresses": len(addresses),
+        "bulk_addresses_per_sec": len(addresses) / bulk_elapsed,
+        "mean_batch_size": metrics["batches"]["mean_size"],
+        "cache_hit_rate": cache["hits"] / max(1, cache["hits"] + cache["misses"]) if cache else None,
+    }
+
+
+def report(result, baseline=None):
+    """
+    結果を表示する
+    """
+    print(f"接続 {result['concurrency']} 本 × keep-alive で {result['requests']} 件")
+    lines = [
+        ("requests_per_sec", "件/秒"),
+        ("latency_p50_ms", "ms"),
+        ("latency_p99_ms", "ms"),
+        ("bulk_addresses_per_sec", "件/秒"),
+        ("mean_batch_size", "件"),
+    ]
+    for metric, unit in lines:
+        text = f"{metric:<24}: {result[metric]:12.2f} {unit}"
+        if baseline is not None and metric in baseline:
+            text += f"  (ベースライン {baseline[metric]:.2f}, {(result[metric] - baseline[metric]) / baseline[metric]:+.1%})"
+        print(text)
+    if result["cache_hit_rate"] is not None:
+        print(f"{'cache_hit_rate':<24}: {result['cache_hit_rate']:12.1%}")
+
+
+def main(argv=None):
+    """
+    メイン関数
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--url", help="起動済みのサーバーの URL（省略時は localhost で起動する）")
+    arg_parser.add_argument("--concurrency", type=int, default=16, help="同時に開く接続の数")
+    arg_parser.add_argument("--requests", type=int, default=200, help="1つの接続から送る /parse の要求の数")
+    arg_parser.add_argument("--count", type=int, default=5000, help="合成住所の種類数（一括解析の件数）")
+    arg_parser.add_argument("--seed", type=int, default=0, help="合成住所の乱数シード")
+    arg_parser.add_argument("--workers", type=int, default=1, help="起動するサーバーの解析スレッドの数")
+    arg_parser.add_argument("--save", help="結果を保存するJSONファイル")
+    arg_parser.add_argument("--compare", help="比較するベースラインのJSONファイル")
+    arg_parser.add_argument("--threshold", type=float, default=0.20, help="回帰と判定する悪化の割合（既定: 0.20）")
+    args = arg_parser.parse_args(argv)
+
+    addresses = generate_addresses(args.count, args.seed)
+    if args.url:
+        result = asyncio.run(load(args.url, addresses, args.concurrency, args.requests))
+    else:
+        with start_server(["--workers", str(args.workers)]) as url:
+            result = asyncio.run(load(url, addresses, args.concurrency, args.requests))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(result, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold, GATED_METRICS)
+        for metric, before, after, change in regressions:
+            print(f"回帰: {metric} {before:.2f} -> {after:.2f} ({change:+.1%})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
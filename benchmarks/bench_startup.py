@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+起動時間のベンチマーク
+
+新しいプロセスで以下を計測する（それぞれ repeat 回の中央値、ミリ秒）。
+    - import_ms: address_parser.parser の import にかかる時間
+    - first_parse_ms: 同梱の辞書を使用した初回の parse_address にかかる時間（インデックスの作成を含む）
+    - first_parse_snapshot_ms: 辞書のスナップショットを使用した初回の parse_address にかかる時間
+    - process_ms / process_snapshot_ms: プロセスの起動から初回の解析を終えて終了するまでの時間
+
+--save で結果をJSONに保存し、--compare で保存済みのベースラインと比較する。
+いずれかの指標が閾値を超えて悪化した場合は終了コード1を返す。
+
+実行方法:
+    python -m benchmarks.bench_startup --save startup.json
+    python -m benchmarks.bench_startup --compare startup.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from address_parser.snapshot import build_snapshot
+from benchmarks.bench_parser import compare
+
+
+# ベースラインとの比較で回帰と判定する指標（指標名, 大きいほど良いかどうか）
+GATED_METRICS = (
+    ("import_ms", False),
+    ("first_parse_ms", False),
+    ("first_parse_snapshot_ms", False),
+    ("process_ms", False),
+    ("process_snapshot_ms", False),
+)
+
+# 初回の解析に使用する住所
+ADDRESS = "東京都新宿区西新宿1-2-3 〇〇ビル101号室"
+
+# 子プロセスで実行する計測用のスクリプト（引数: スナップショットのパス（空文字列の場合は使用しない）, 住所）
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from address_parser.parser import AddressParser
+imported = time.perf_counter()
+snapshot = None
+if sys.argv[1]:
+    from address_parser.snapshot import Snapshot
+    snapshot = Snapshot(sys.argv[1])
+AddressParser(snapshot=snapshot).parse_address(sys.argv[2])
+parsed = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_parse_ms": (parsed - imported) * 1000}))
+"""
+
+
+def measure_process(snapshot_path):
+    """
+    新しいプロセスで import と初回の解析にかかる時間を計測する
+
+    Returns:
+        dict: import_ms, first_parse_ms, process_ms
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT, snapshot_path or "", ADDRESS],
+        cwd=root, check=True, capture_output=True, text=True,
+    ).stdout
+    elapsed = time.perf_counter() - start
+    result = json.loads(output)
+    result["process_ms"] = elapsed * 1000
+    return result
+
+
+def run(repeat, snapshot_path=None):
+    """
+    ベンチマークを実行し、結果を辞書で返す
+
+    Args:
+        repeat (int): 各計測の繰り返し回数（中央値を採用）
+        snapshot_path (str): 使用するスナップショット（None の場合は同梱の辞書から一時的に作成する）
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if snapshot_path is None:
+            snapshot_path = os.path.join(temp_dir, "dictionary.snap")
+            build_snapshot(snapshot_path)
+        default = [measure_process(None) for _ in range(repeat)]
+        snapshot = [measure_process(snapshot_path) for _ in range(repeat)]
+
+    def median(results, key):
+        return statistics.median(result[key] for result in results)
+
+    return {
+        "repeat": repeat,
+        "import_ms": median(default + snapshot, "import_ms"),
+        "first_parse_ms": median(default, "first_parse_ms"),
+        "first_parse_snapshot_ms": median(snapshot, "first_parse_ms"),
+        "process_ms": median(default, "process_ms"),
+        "process_snapshot_ms": median(snapshot, "process_ms"),
+    }
+
+
+def report(result, baseline=None):
+    """
+    結果を表示する
+    """
+    print(f"起動時間（{result['repeat']} 回の中央値）")
+    for metric, _ in GATED_METRICS:
+        text = f"{metric:<24}: {result[metric]:10.2f} ms"
+        if baseline is not None and metric in baseline:
+            text += f"  (ベースライン {baseline[metric]:.2f}, {(result[metric] - baseline[metric]) / baseline[metric]:+.1%})"
+        print(text)
+
+
+def main(argv=None):
+    """
+    メイン関数
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=5, help="各計測の繰り返し回数（中央値を採用）")
+    arg_parser.add_argument("--snapshot", help="使用するスナップショット（省略時は同梱の辞書から作成する）")
+    arg_parser.add_argument("--save", help="結果を保存するJSONファイル")
+    arg_parser.add_argument("--compare", help="比較するベースラインのJSONファイル")
+    arg_parser.add_argument("--threshold", type=float, default=0.20, help="回帰と判定する悪化の割合（既定: 0.20）")
+    args = arg_parser.parse_args(argv)
+
+    result = run(args.repeat, args.snapshot)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(result, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold, GATED_METRICS)
+        for metric, before, after, change in regressions:
+            print(f"回帰: {metric} {before:.2f} -> {after:.2f} ({change:+.1%})", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())